@@ -45,9 +45,10 @@ class LaureateRegistrationSerializer(serializers.ModelSerializer):
         
         # Auto-create INACTIVE laureate profile (needs admin approval)
         from laureates.models import Laureate
+        from laureates.student_ids import allocate_student_id
         Laureate.objects.create(
             user=user,
-            student_id=f"LAU{user.id:06d}",
+            student_id=allocate_student_id(),
             institution="",
             field_of_study="",
             graduation_year=2025,
@@ -1,6 +1,6 @@
 # administration/admin.py
 from django.contrib import admin
-from .models import ActivityLog, Report
+from .models import ActivityLog, Report, PortfolioStat, ReportJob, CohortSnapshot
 
 @admin.register(ActivityLog)
 class ActivityLogAdmin(admin.ModelAdmin):
@@ -16,4 +16,26 @@ class ReportAdmin(admin.ModelAdmin):
     list_filter = ['report_type', 'created_at']
     search_fields = ['title', 'generated_by__username']
     ordering = ['-created_at']
-    readonly_fields = ['created_at']
\ No newline at end of file
+    readonly_fields = ['created_at']
+@admin.register(PortfolioStat)
+class PortfolioStatAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'status', 'count', 'amount', 'updated_at']
+    list_filter = ['kind']
+    readonly_fields = ['kind', 'status', 'count', 'amount', 'updated_at']
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'report_type', 'status', 'progress', 'attempts', 'requested_by', 'created_at']
+    list_filter = ['status', 'report_type']
+    search_fields = ['requested_by__username']
+    ordering = ['-created_at']
+    list_select_related = ['requested_by']
+    readonly_fields = ['report', 'worker', 'started_at', 'finished_at', 'updated_at', 'created_at']
+
+
+@admin.register(CohortSnapshot)
+class CohortSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['id', 'as_of', 'loan_count', 'duration_ms', 'created_at']
+    ordering = ['-created_at']
+    readonly_fields = ['cohorts', 'totals', 'as_of', 'loan_count', 'duration_ms', 'created_at']
@@ -0,0 +1,134 @@
+# administration/analytics.py
+import time
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+from django.utils import timezone
+from loans.models import Loan
+from payments.models import ARREARS_STATUSES, Payment
+from .models import CohortSnapshot
+
+DIMENSIONS = ('institution', 'field_of_study', 'graduation_year', 'vintage')
+LOAN_COLUMNS = ['loan_id', 'amount', 'start_date', 'status', 'institution', 'field_of_study', 'graduation_year']
+PAYMENT_COLUMNS = ['loan_id', 'amount', 'status', 'due_date', 'paid_date']
+FETCH_CHUNK_SIZE = 10000
+# Snapshots older than this are flagged stale when served
+SNAPSHOT_MAX_AGE = timedelta(hours=24)
+SNAPSHOTS_KEPT = 30
+DAYS_PER_MONTH = 30.4375
+
+
+def load_loans():
+    """One row per loan with the laureate attributes cohorts are cut by"""
+    rows = Loan.objects.values_list(
+        'id', 'amount', 'start_date', 'status',
+        'laureate__institution', 'laureate__field_of_study', 'laureate__graduation_year'
+    ).order_by().iterator(chunk_size=FETCH_CHUNK_SIZE)
+    loans = pd.DataFrame.from_records(list(rows), columns=LOAN_COLUMNS)
+    loans['amount'] = loans['amount'].astype(float)
+    loans['start_date'] = pd.to_datetime(loans['start_date'])
+    loans['vintage'] = loans['start_date'].dt.year.astype('Int64')
+    return loans
+
+
+def load_payments():
+    rows = Payment.objects.values_list(*PAYMENT_COLUMNS).order_by().iterator(chunk_size=FETCH_CHUNK_SIZE)
+    payments = pd.DataFrame.from_records(list(rows), columns=PAYMENT_COLUMNS)
+    payments['amount'] = payments['amount'].astype(float)
+    payments['due_date'] = pd.to_datetime(payments['due_date'])
+    payments['paid_date'] = pd.to_datetime(payments['paid_date'])
+    return payments
+
+
+def loan_metrics(loans, payments, today):
+    """Amounts due, paid and in arrears to date, and months to completion, per loan"""
+    today = pd.Timestamp(today)
+    status = payments['status']
+    amount = payments['amount']
+    completed = status == 'completed'
+    # Same definition of arrears as Payment.objects.in_arrears()
+    in_arrears = status.isin(ARREARS_STATUSES) | ((status == 'pending') & (payments['due_date'] < today))
+    amounts = pd.DataFrame({
+        'loan_id': payments['loan_id'],
+        'due': np.where(payments['due_date'] <= today, amount, 0.0),
+        'paid': np.where(completed, amount, 0.0),
+        'arrears': np.where(in_arrears, amount, 0.0),
+    }).groupby('loan_id').sum()
+    last_paid = payments.loc[completed].groupby('loan_id')['paid_date'].max().rename('last_paid')
+
+    loans = loans.join(amounts, on='loan_id').join(last_paid, on='loan_id')
+    loans[['due', 'paid', 'arrears']] = loans[['due', 'paid', 'arrears']].fillna(0.0)
+    loans['completed'] = loans['status'] == 'completed'
+    loans['months_to_completion'] = ((loans['last_paid'] - loans['start_date']).dt.days / DAYS_PER_MONTH).where(
+        loans['completed']
+    )
+    return loans
+
+
+def summarize(groups):
+    """Cohort metrics of grouped per-loan metrics"""
+    summary = groups.agg(
+        loans=('loan_id', 'size'),
+        amount=('amount', 'sum'),
+        due=('due', 'sum'),
+        paid=('paid', 'sum'),
+        arrears=('arrears', 'sum'),
+        completed=('completed', 'sum'),
+        median_months_to_completion=('months_to_completion', 'median'),
+        mean_months_to_completion=('months_to_completion', 'mean'),
+    )
+    due = summary['due'].where(summary['due'] > 0)
+    summary['repayment_rate'] = summary['paid'] / due
+    summary['arrears_ratio'] = summary['arrears'] / due
+    summary['completion_rate'] = summary['completed'] / summary['loans'].where(summary['loans'] > 0)
+    return summary
+
+
+def records(frame):
+    """JSON-ready rows: NaN as None, numpy scalars as Python numbers"""
+    frame = frame.round(4).astype(object).where(frame.notna(), None)
+    return [
+        {key: value.item() if isinstance(value, np.generic) else value for key, value in row.items()}
+        for row in frame.to_dict('records')
+    ]
+
+
+def compute_cohorts(today=None):
+    """({dimension: rows}, totals, loan count) over the whole portfolio"""
+    today = today or timezone.now().date()
+    loans = loan_metrics(load_loans(), load_payments(), today)
+
+    cohorts = {}
+    for dimension in DIMENSIONS:
+        grouped = summarize(loans.groupby(dimension, dropna=False))
+        cohorts[dimension] = records(grouped.reset_index().sort_values('loans', ascending=False))
+
+    # The whole portfolio as a single group
+    totals = records(summarize(loans.groupby(lambda index: 'total')))
+    return cohorts, totals[0] if totals else {}, len(loans)
+
+
+def build_cohort_snapshot():
+    """Compute the cohorts and store them as a new snapshot, keeping the latest SNAPSHOTS_KEPT"""
+    started = time.monotonic()
+    today = timezone.now().date()
+    cohorts, totals, loan_count = compute_cohorts(today)
+    snapshot = CohortSnapshot.objects.create(
+        cohorts=cohorts,
+        totals=totals,
+        as_of=today,
+        loan_count=loan_count,
+        duration_ms=int((time.monotonic() - started) * 1000),
+    )
+    stale = CohortSnapshot.objects.values_list('id', flat=True)[SNAPSHOTS_KEPT:]
+    CohortSnapshot.objects.filter(id__in=list(stale)).delete()
+    return snapshot
+
+
+def latest_cohort_snapshot():
+    """The newest snapshot, or None; building one is left to the refresh action and the nightly command"""
+    return CohortSnapshot.objects.first()
+
+
+def is_stale(snapshot, max_age=SNAPSHOT_MAX_AGE):
+    return snapshot.created_at < timezone.now() - max_age
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AdministrationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'administration'
+
+    def ready(self):
+        # Keep the dashboard tallies and cached trends in step with laureate, loan and payment writes
+        from . import signals
+        signals.connect()
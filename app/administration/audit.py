@@ -0,0 +1,206 @@
+# administration/audit.py
+import atexit
+import logging
+import threading
+import time
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from .models import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+AUDITED_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+METHOD_ACTIONS = {'POST': 'create', 'PUT': 'update', 'PATCH': 'update', 'DELETE': 'delete'}
+# Custom viewset actions (url_name suffix) logged under a more specific action
+VIEW_ACTIONS = {
+    'mark-paid': 'payment',
+    'bulk-mark-paid': 'payment',
+    'reconcile': 'payment',
+    'mark-missed': 'status_change',
+    'toggle-status': 'status_change',
+    'approve-application': 'approve',
+    'reject-application': 'reject',
+}
+# Custom create actions whose response names the new object's ID other than `id`
+OBJECT_ID_KEYS = {
+    'create-single-laureate': 'laureate_id',
+}
+LOGIN_URL_NAME = 'get_token'
+
+
+class AuditBuffer:
+    """
+    In-process queue of unsaved ActivityLog rows, written with bulk_create.
+
+    Flushed when it holds `size` entries, when the oldest entry is
+    `interval` seconds old (checked on add and by a daemon thread), and
+    at interpreter exit so a worker shutting down loses nothing. A flush
+    due inside a transaction waits until it commits.
+    """
+
+    def __init__(self, size, interval):
+        self.size = size
+        self.interval = interval
+        self.entries = []
+        self.oldest = None
+        self.lock = threading.Lock()
+        self.flusher = None
+
+    def add(self, entry):
+        with self.lock:
+            self.entries.append(entry)
+            if self.oldest is None:
+                self.oldest = time.monotonic()
+            due = len(self.entries) >= self.size or time.monotonic() - self.oldest >= self.interval
+        self.start_flusher()
+        if not due:
+            return
+        if connection.in_atomic_block:
+            # Not inside the caller's transaction: a failing insert would break it and
+            # the batch would be held up (or rolled back) with it. If it rolls back, the
+            # entries stay queued for the next flush.
+            transaction.on_commit(self.flush)
+        else:
+            self.flush()
+
+    def take(self):
+        with self.lock:
+            entries, self.entries, self.oldest = self.entries, [], None
+        return entries
+
+    def flush(self):
+        entries = self.take()
+        if not entries:
+            return 0
+        try:
+            ActivityLog.objects.bulk_create(entries)
+        except Exception:
+            # Auditing must never fail the request that triggered the flush
+            logger.exception("Could not write %d activity log entries", len(entries))
+            return 0
+        return len(entries)
+
+    def start_flusher(self):
+        if self.flusher is None or not self.flusher.is_alive():
+            self.flusher = threading.Thread(target=self.flush_periodically, name='audit-flusher', daemon=True)
+            self.flusher.start()
+
+    def flush_periodically(self):
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                due = self.oldest is not None and time.monotonic() - self.oldest >= self.interval
+            if due:
+                self.flush()
+                # The thread has its own connection; don't hold it open between flushes
+                connections.close_all()
+
+
+buffer = AuditBuffer(
+    size=getattr(settings, 'AUDIT_BUFFER_SIZE', 50),
+    interval=getattr(settings, 'AUDIT_FLUSH_INTERVAL', 5),
+)
+atexit.register(buffer.flush)
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR')
+
+
+def audit(user, action, model_name, object_id=None, description='', ip_address=None):
+    """Queue an activity log entry; it is written with the next batch"""
+    buffer.add(ActivityLog(
+        user=user if user is not None and user.is_authenticated else None,
+        action=action,
+        model_name=model_name,
+        object_id=object_id,
+        description=description,
+        ip_address=ip_address,
+        # Set here: bulk_create at flush time would otherwise stamp the batch time
+        timestamp=timezone.now(),
+    ))
+
+
+def audit_request(request, action, model_name, object_id=None, description=''):
+    """Queue an entry for a view that describes its own action, and skip the automatic one"""
+    getattr(request, '_request', request)._audited = True
+    audit(request.user, action, model_name, object_id, description, client_ip(request))
+
+
+class AuditMiddleware:
+    """Record every successful mutating API call in the activity log"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            request.method in AUDITED_METHODS
+            and request.path.startswith('/api/')
+            and response.status_code < 400
+            and not getattr(request, '_audited', False)
+        ):
+            self.record(request, response)
+        return response
+
+    def record(self, request, response):
+        match = request.resolver_match
+        url_name = match.url_name if match else ''
+        data = getattr(response, 'data', None)
+
+        if url_name == LOGIN_URL_NAME:
+            user_id = data.get('user_info', {}).get('user_id') if isinstance(data, dict) else None
+            buffer.add(ActivityLog(
+                user_id=user_id, action='login', model_name='User', object_id=user_id,
+                description="Logged in", ip_address=client_ip(request), timestamp=timezone.now()
+            ))
+            return
+
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return
+        action = self.action_name(request.method, url_name or '')
+        object_id = match.kwargs.get('pk') if match else None
+        if object_id is None and isinstance(data, dict):
+            object_id = data.get(self.object_id_key(url_name or ''))
+        try:
+            object_id = int(object_id) if object_id is not None else None
+        except (TypeError, ValueError):
+            object_id = None
+
+        audit(
+            user, action, self.model_name(match), object_id,
+            f"{request.method} {request.path} -> {response.status_code}", client_ip(request)
+        )
+
+    @staticmethod
+    def action_name(method, url_name):
+        for suffix, action in VIEW_ACTIONS.items():
+            if url_name.endswith(f'-{suffix}'):
+                return action
+        # Custom POST actions (mark_paid, cancel...) act on existing objects
+        if method == 'POST' and url_name and not url_name.endswith('-list') and 'create' not in url_name:
+            return 'update'
+        return METHOD_ACTIONS[method]
+
+    @staticmethod
+    def object_id_key(url_name):
+        for suffix, key in OBJECT_ID_KEYS.items():
+            if url_name.endswith(f'-{suffix}'):
+                return key
+        return 'id'
+
+    @staticmethod
+    def model_name(match):
+        """Model behind a DRF viewset route, or the URL name for plain views"""
+        view_class = getattr(match.func, 'cls', None) if match else None
+        queryset = getattr(view_class, 'queryset', None)
+        if queryset is not None:
+            return queryset.model.__name__
+        serializer_class = getattr(view_class, 'serializer_class', None)
+        model = getattr(getattr(serializer_class, 'Meta', None), 'model', None)
+        if model is not None:
+            return model.__name__
+        return (match.url_name or '')[:50] if match else ''
@@ -0,0 +1,209 @@
+# administration/jobs.py
+import hashlib
+import json
+import logging
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from .models import Report, ReportJob
+from .reports import REPORT_BUILDERS
+from .storage import delete_report_file
+from .versioning import get_data_version
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY = timedelta(seconds=30)
+# A running job whose heartbeat is older than this belonged to a dead worker
+STALE_AFTER = timedelta(minutes=10)
+HEARTBEAT_INTERVAL = timedelta(minutes=1)
+# Reports computed as of the current date, which is part of their cache key
+DATE_RELATIVE_REPORTS = {'overdue', 'aging', 'cohorts'}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def enqueue_report(report_type, requested_by, parameters=None):
+    if report_type not in REPORT_BUILDERS:
+        raise ValueError(f"No generator for report type {report_type!r}")
+    return ReportJob.objects.create(
+        report_type=report_type,
+        requested_by=requested_by,
+        parameters=parameters or {},
+    )
+
+
+def report_cache_key(report_type, parameters):
+    request = [report_type, parameters]
+    if report_type in DATE_RELATIVE_REPORTS:
+        request.append(timezone.now().date())
+    encoded = json.dumps(request, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def request_report(report_type, requested_by, parameters=None):
+    """
+    Job for a report request, and whether it was served from cache.
+
+    A report built for the same request from the current data version
+    is reused through an already completed job; anything else is queued.
+    """
+    parameters = parameters or {}
+    report = Report.objects.filter(
+        cache_key=report_cache_key(report_type, parameters), data_version=get_data_version()
+    ).order_by('-created_at').first()
+    if report is None:
+        return enqueue_report(report_type, requested_by, parameters), False
+    now = timezone.now()
+    job = ReportJob.objects.create(
+        report_type=report_type, requested_by=requested_by, parameters=parameters,
+        status='completed', progress=100, report=report, started_at=now, finished_at=now,
+    )
+    return job, True
+
+
+def cancel_job(job):
+    """Cancel a queued or running job; a running one stops at its next progress update"""
+    return ReportJob.objects.filter(
+        pk=job.pk, status__in=['queued', 'running']
+    ).update(status='cancelled', finished_at=timezone.now(), updated_at=timezone.now()) > 0
+
+
+def wait_for_job(job, timeout, poll_interval=0.5):
+    """Re-read a job until it is no longer queued or running, or timeout seconds pass"""
+    deadline = time.monotonic() + timeout
+    while job.status in ('queued', 'running') and time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        job.refresh_from_db()
+    return job
+
+
+def claim_next_job(worker):
+    """Atomically move the oldest due job to running, or return None"""
+    now = timezone.now()
+    due = ReportJob.objects.filter(status='queued', run_after__lte=now).order_by('run_after', 'id')
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = due.select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            ReportJob.objects.filter(pk=job.pk).update(
+                status='running', worker=worker, started_at=now, updated_at=now, progress=0
+            )
+    else:
+        # No SKIP LOCKED (SQLite): compare-and-set on the status instead
+        for job in due[:10]:
+            if ReportJob.objects.filter(pk=job.pk, status='queued').update(
+                status='running', worker=worker, started_at=now, updated_at=now, progress=0
+            ):
+                break
+        else:
+            return None
+    job.refresh_from_db()
+    return job
+
+
+def record_failure(job, error, **conditions):
+    """Count a failed attempt: queue the job again with backoff, or fail it once out of attempts"""
+    attempts = job.attempts + 1
+    now = timezone.now()
+    if attempts < job.max_attempts:
+        # Back off 30s, 60s, 120s... between attempts
+        changes = {'status': 'queued', 'run_after': now + RETRY_DELAY * 2 ** (attempts - 1), 'worker': ''}
+    else:
+        changes = {'status': 'failed', 'finished_at': now}
+    updated = ReportJob.objects.filter(pk=job.pk, status='running', **conditions).update(
+        attempts=attempts, error=error, updated_at=now, **changes
+    )
+    return changes['status'] if updated else None
+
+
+def requeue_stale_jobs(stale_after=STALE_AFTER):
+    """
+    Recover jobs left running by a worker that stopped heartbeating.
+
+    A lost run counts as an attempt, so a job that keeps killing its
+    worker fails after max_attempts instead of being retried forever.
+    Returns the number of jobs (requeued, failed).
+    """
+    cutoff = timezone.now() - stale_after
+    outcomes = [
+        # Only if still stale: the worker may have come back since the read
+        record_failure(job, f"Worker {job.worker} stopped heartbeating", updated_at__lt=cutoff)
+        for job in ReportJob.objects.filter(status='running', updated_at__lt=cutoff)
+    ]
+    return outcomes.count('queued'), outcomes.count('failed')
+
+
+@contextmanager
+def heartbeat(job, interval=HEARTBEAT_INTERVAL):
+    """
+    Keep a running job's heartbeat fresh from a side thread.
+
+    Builders report progress between steps, but a single large aggregate
+    or file write can outlast STALE_AFTER on its own.
+    """
+    stopped = threading.Event()
+
+    def beat():
+        try:
+            while not stopped.wait(interval.total_seconds()):
+                try:
+                    ReportJob.objects.filter(pk=job.pk, status='running').update(updated_at=timezone.now())
+                except DatabaseError:
+                    logger.warning("Heartbeat of report job #%s failed", job.pk, exc_info=True)
+        finally:
+            # The thread has its own connection
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f"report-job-{job.pk}-heartbeat", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def run_job(job):
+    """Build the report of a claimed job, recording progress, retries and cancellation"""
+    def progress(percent):
+        # Also the heartbeat; zero rows means the job was cancelled meanwhile
+        if not ReportJob.objects.filter(pk=job.pk, status='running').update(
+            progress=min(int(percent), 100), updated_at=timezone.now()
+        ):
+            raise JobCancelled
+
+    fields = {}
+    try:
+        # Read before the data: a write landing mid-build only makes the report look older
+        data_version = get_data_version()
+        with heartbeat(job):
+            fields = REPORT_BUILDERS[job.report_type](job.parameters, progress)
+        with transaction.atomic():
+            report = Report.objects.create(
+                report_type=job.report_type, generated_by_id=job.requested_by_id,
+                cache_key=report_cache_key(job.report_type, job.parameters), data_version=data_version,
+                **fields
+            )
+            # The job may have been cancelled while the report was built
+            if not ReportJob.objects.filter(pk=job.pk, status='running').update(
+                status='completed', progress=100, report=report, error='',
+                finished_at=timezone.now(), updated_at=timezone.now()
+            ):
+                raise JobCancelled
+    except JobCancelled:
+        delete_report_file(fields.get('file_path'))
+        logger.info("Report job #%s cancelled", job.pk)
+    except Exception:
+        delete_report_file(fields.get('file_path'))
+        logger.exception("Report job #%s failed", job.pk)
+        record_failure(job, traceback.format_exc())
+    job.refresh_from_db()
+    return job
@@ -0,0 +1,33 @@
+# administration/management/commands/archive_activity_logs.py
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from administration.retention import ArchiveError, archive_activity_logs, ensure_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming activity log partitions, then archive months older than the retention "
+        "period to compressed JSON Lines on the persistent volume and drop them (run daily)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, help="Months to keep (default: ACTIVITY_LOG_RETENTION_MONTHS)")
+        parser.add_argument('--output-dir', help="Archive directory under PERSISTENT_STORAGE_ROOT (default: ACTIVITY_LOG_ARCHIVE_DIR)")
+        parser.add_argument('--dry-run', action='store_true', help="List what would be archived without changing anything")
+
+    def handle(self, *args, **options):
+        if not options['dry_run']:
+            for name in ensure_partitions():
+                self.stdout.write(f"Created partition {name}")
+
+        try:
+            archived = archive_activity_logs(
+                retention_months=options['months'], directory=options['output_dir'], dry_run=options['dry_run']
+            )
+        except (ImproperlyConfigured, ArchiveError) as error:
+            raise CommandError(str(error))
+        for start, rows, path in archived:
+            target = path or ("would be archived" if options['dry_run'] else "nothing to keep")
+            self.stdout.write(f"{start:%Y-%m}: {rows} entries -> {target}")
+        action = "would be archived" if options['dry_run'] else "archived"
+        self.stdout.write(self.style.SUCCESS(f"{len(archived)} months {action}"))
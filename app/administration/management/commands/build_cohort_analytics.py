@@ -0,0 +1,16 @@
+# administration/management/commands/build_cohort_analytics.py
+from django.core.management.base import BaseCommand
+from administration.analytics import build_cohort_snapshot
+
+
+class Command(BaseCommand):
+    help = "Compute cohort repayment analytics over the whole portfolio and store them as a snapshot (run nightly)"
+
+    def handle(self, *args, **options):
+        snapshot = build_cohort_snapshot()
+        totals = snapshot.totals
+        self.stdout.write(
+            f"{snapshot.loan_count} loans, repayment rate {totals.get('repayment_rate')}, "
+            f"arrears ratio {totals.get('arrears_ratio')}"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Snapshot #{snapshot.id} built in {snapshot.duration_ms} ms"))
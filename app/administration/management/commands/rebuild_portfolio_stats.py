@@ -0,0 +1,17 @@
+# administration/management/commands/rebuild_portfolio_stats.py
+from django.core.management.base import BaseCommand
+from administration.portfolio import rebuild_portfolio_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard tallies (PortfolioStat) from the laureate, loan and payment tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without saving")
+
+    def handle(self, *args, **options):
+        drifted = rebuild_portfolio_stats(dry_run=options['dry_run'])
+        for kind, status, (old_count, old_amount), (count, amount) in drifted:
+            self.stdout.write(f"{kind} {status}: count {old_count} -> {count}, amount {old_amount} -> {amount}")
+        action = "would be corrected" if options['dry_run'] else "corrected"
+        self.stdout.write(self.style.SUCCESS(f"{len(drifted)} tallies drifted and {action}"))
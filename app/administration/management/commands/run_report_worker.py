@@ -0,0 +1,53 @@
+# administration/management/commands/run_report_worker.py
+import os
+import signal
+import socket
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from administration.jobs import claim_next_job, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Process queued report jobs (runs until stopped, or until the queue is empty with --once)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit once no job is due")
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help="Seconds to wait between polls of an empty queue (default 2)")
+        parser.add_argument('--max-jobs', type=int, default=0,
+                            help="Exit after this many jobs, 0 for no limit")
+
+    def handle(self, *args, **options):
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.stdout.write(f"Report worker {worker} started")
+
+        processed = 0
+        while not self.stopping:
+            close_old_connections()
+            requeued, failed = requeue_stale_jobs()
+            if requeued or failed:
+                self.stdout.write(self.style.WARNING(
+                    f"Stale jobs: {requeued} requeued, {failed} failed after their last attempt"
+                ))
+            job = claim_next_job(worker)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            job = run_job(job)
+            processed += 1
+            self.stdout.write(f"Job #{job.id} ({job.report_type}): {job.status}")
+            if options['max_jobs'] and processed >= options['max_jobs']:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f"Report worker {worker} stopped after {processed} jobs"))
+
+    def stop(self, signum, frame):
+        # Finish the current job, then exit
+        self.stopping = True
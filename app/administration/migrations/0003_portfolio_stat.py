@@ -0,0 +1,50 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:19
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_portfolio_stats(apps, schema_editor):
+    Laureate = apps.get_model('laureates', 'Laureate')
+    Loan = apps.get_model('loans', 'Loan')
+    Payment = apps.get_model('payments', 'Payment')
+    PortfolioStat = apps.get_model('administration', 'PortfolioStat')
+    stats = [
+        PortfolioStat(kind='laureate', status='active' if row['is_active'] else 'inactive', count=row['count'])
+        for row in Laureate.objects.values('is_active').annotate(count=Count('id')).order_by()
+    ]
+    for kind, model in (('loan', Loan), ('payment', Payment)):
+        stats += [
+            PortfolioStat(kind=kind, status=row['status'], count=row['count'], amount=row['amount'] or 0)
+            for row in model.objects.values('status').annotate(count=Count('id'), amount=Sum('amount')).order_by()
+        ]
+    PortfolioStat.objects.bulk_create(stats)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0002_activitylog_user_nullable'),
+        ('laureates', '0002_laureate_access_indexes'),
+        ('loans', '0003_loan_access_indexes'),
+        ('payments', '0004_payment_access_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PortfolioStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('laureate', 'Laureate'), ('loan', 'Loan'), ('payment', 'Payment')], max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('count', models.BigIntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['kind', 'status'],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'status'), name='portfolio_stat_kind_status_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_portfolio_stats, migrations.RunPython.noop),
+    ]
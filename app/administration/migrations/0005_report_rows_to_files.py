@@ -0,0 +1,65 @@
+import csv
+import gzip
+import os
+import uuid
+from django.conf import settings
+from django.db import migrations
+
+# Frozen copies of the report code as of this migration, which must not follow later changes
+OVERDUE_HEADER = ['Payment ID', 'Laureate Name', 'Amount', 'Due Date', 'Days Overdue', 'Loan ID']
+REPORTS_DIR = 'reports'
+
+
+def overdue_rows(parameters):
+    for payment in parameters.get('overdue_payments', []):
+        yield [
+            payment.get('payment_id', ''),
+            payment.get('laureate_name', ''),
+            payment.get('amount', 0),
+            payment.get('due_date', ''),
+            payment.get('days_overdue', 0),
+            payment.get('loan_id', '')
+        ]
+
+
+def write_report_file(rows):
+    """Write rows to a gzip CSV under MEDIA_ROOT/reports; (relative path, row count)"""
+    relative_path = os.path.join(REPORTS_DIR, f"overdue_{uuid.uuid4().hex}.csv.gz")
+    path = os.path.join(settings.MEDIA_ROOT, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    count = 0
+    with gzip.open(f"{path}.part", 'wt', encoding='utf-8', newline='') as output:
+        writer = csv.writer(output)
+        writer.writerow(OVERDUE_HEADER)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    os.replace(f"{path}.part", path)
+    return relative_path, count
+
+
+def move_report_rows_to_files(apps, schema_editor):
+    """Write the rows embedded in legacy overdue reports to files, keeping only summary metrics"""
+    Report = apps.get_model('administration', 'Report')
+    legacy = Report.objects.filter(report_type='overdue', file_path='', parameters__has_key='overdue_payments')
+    for report in legacy.iterator(chunk_size=50):
+        rows = report.parameters.get('overdue_payments') or []
+        relative_path, count = write_report_file(overdue_rows(report.parameters))
+        report.parameters = {
+            'row_count': count,
+            'total_amount': float(sum(row.get('amount', 0) for row in rows)),
+        }
+        report.file_path = relative_path
+        report.save(update_fields=['parameters', 'file_path'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0004_report_job'),
+    ]
+
+    operations = [
+        # The files are moved into the database by 0011_report_file
+        migrations.RunPython(move_report_rows_to_files, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,110 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:30
+
+from datetime import datetime, timezone
+from django.conf import settings
+from django.db import migrations, models
+
+TABLE = 'administration_activitylog'
+UNPARTITIONED = f'{TABLE}_unpartitioned'
+MONTHS_AHEAD = 2
+
+
+def next_month(start):
+    return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+
+
+def partition_activity_log(apps, schema_editor):
+    """
+    Rebuild the activity log as a table partitioned by month on "timestamp".
+
+    PostgreSQL only: other databases keep the plain table, and the archive
+    command deletes old rows there instead of dropping partitions. The
+    primary key has to include the partition key, so it becomes
+    (id, timestamp); ids still come from a single sequence. The table's
+    other indexes and its foreign key are recreated under their original
+    names, so they are where Django's migration state expects them.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    if schema_editor.collect_sql:
+        # sqlmigrate runs operations wrapped in SeparateDatabaseAndState; only describe this one
+        schema_editor.collected_sql.append(f'-- Partition "{TABLE}" by month (runs at migrate time only)')
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN("timestamp"), COALESCE(MAX(id), 0) FROM "{TABLE}"')
+        oldest, max_id = cursor.fetchone()
+        # Definitions read before the rename still name the original table
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s "
+            "AND indexname <> %s ORDER BY indexname",
+            [TABLE, f'{TABLE}_pkey']
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f' ORDER BY conname",
+            [TABLE]
+        )
+        foreign_keys = cursor.fetchall()
+
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{UNPARTITIONED}"')
+        cursor.execute(f'ALTER TABLE "{UNPARTITIONED}" ALTER COLUMN id DROP IDENTITY IF EXISTS')
+        cursor.execute(f'ALTER TABLE "{UNPARTITIONED}" ALTER COLUMN id DROP DEFAULT')
+        cursor.execute(f'DROP SEQUENCE IF EXISTS "{TABLE}_id_seq"')
+
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{UNPARTITIONED}" INCLUDING DEFAULTS) PARTITION BY RANGE ("timestamp")'
+        )
+        cursor.execute(f'CREATE SEQUENCE "{TABLE}_id_seq" START WITH {max_id + 1} OWNED BY "{TABLE}".id')
+        cursor.execute(f'ALTER TABLE "{TABLE}" ALTER COLUMN id SET DEFAULT nextval(\'"{TABLE}_id_seq"\')')
+
+        # A default partition catches rows outside the monthly ones instead of failing the insert
+        cursor.execute(f'CREATE TABLE "{TABLE}_default" PARTITION OF "{TABLE}" DEFAULT')
+        now = datetime.now(timezone.utc)
+        start = datetime((oldest or now).year, (oldest or now).month, 1, tzinfo=timezone.utc)
+        last = datetime(now.year, now.month, 1, tzinfo=timezone.utc)
+        for _ in range(MONTHS_AHEAD):
+            last = next_month(last)
+        while start <= last:
+            end = next_month(start)
+            cursor.execute(
+                f'CREATE TABLE "{TABLE}_y{start.year}m{start.month:02d}" PARTITION OF "{TABLE}" '
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+            start = end
+
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{UNPARTITIONED}"')
+        # Frees the index and constraint names for the new table
+        cursor.execute(f'DROP TABLE "{UNPARTITIONED}"')
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_pkey" PRIMARY KEY (id, "timestamp")')
+        # Created on the parent, they cascade to every partition, present and future
+        for definition in indexes:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{name}" {definition}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0006_activitylog_queued_timestamp'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Database only: the model is unchanged, as the ORM uses the partitioned table as before.
+        # Django 5.1 cannot describe a composite primary key, so the state keeps `id` as the
+        # primary key; it stays unique, coming from one sequence. A later migration that alters
+        # `id` on this table needs hand-written SQL. Reversing leaves the partitioned table.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(partition_activity_log, migrations.RunPython.noop)],
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['-timestamp', '-id'], name='activitylog_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['user', '-timestamp'], name='activitylog_user_time_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0007_activitylog_partitioning'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CohortSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cohorts', models.JSONField(default=dict)),
+                ('totals', models.JSONField(default=dict)),
+                ('as_of', models.DateField()),
+                ('loan_count', models.PositiveIntegerField(default=0)),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0008_cohort_snapshot'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='report',
+            name='report_type',
+            field=models.CharField(choices=[('financial', 'Financial Report'), ('laureate', 'Laureate Report'), ('loan', 'Loan Report'), ('payment', 'Payment Report'), ('overdue', 'Overdue Report'), ('aging', 'Aging Report')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='reportjob',
+            name='report_type',
+            field=models.CharField(choices=[('financial', 'Financial Report'), ('laureate', 'Laureate Report'), ('loan', 'Loan Report'), ('payment', 'Payment Report'), ('overdue', 'Overdue Report'), ('aging', 'Aging Report')], max_length=20),
+        ),
+    ]
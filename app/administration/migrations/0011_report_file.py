@@ -0,0 +1,39 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:57
+
+import os
+from django.conf import settings
+from django.db import migrations, models
+
+
+def load_report_files(apps, schema_editor):
+    """Copy report files still present under MEDIA_ROOT into the database"""
+    Report = apps.get_model('administration', 'Report')
+    ReportFile = apps.get_model('administration', 'ReportFile')
+    for name in Report.objects.exclude(file_path='').values_list('file_path', flat=True).iterator():
+        path = os.path.join(settings.MEDIA_ROOT, name)
+        if not os.path.exists(path) or ReportFile.objects.filter(name=name).exists():
+            continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        ReportFile.objects.create(name=name, data=data, size=len(data))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0010_report_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=500, unique=True)),
+                ('data', models.BinaryField()),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(load_report_files, migrations.RunPython.noop),
+    ]
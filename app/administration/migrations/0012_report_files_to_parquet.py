@@ -0,0 +1,76 @@
+# Generated by Django 5.1.3 on 2026-10-17 21:10
+
+import csv
+import gzip
+import io
+import os
+import uuid
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations
+
+# Frozen copy of the overdue report columns as of this migration, the only report type stored as a file
+OVERDUE_COLUMNS = [
+    ('Payment ID', 'int'), ('Laureate Name', 'str'), ('Amount', 'decimal'),
+    ('Due Date', 'str'), ('Days Overdue', 'int'), ('Loan ID', 'int'),
+]
+ROW_GROUP_SIZE = 10000
+
+
+def write_parquet(data, directory):
+    """Rewrite one gzip CSV report file as Parquet under directory; its file name"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {'int': pa.int64(), 'str': pa.string(), 'decimal': pa.decimal128(38, 2)}
+    parse = {'int': lambda value: int(value) if value else None, 'str': str,
+             'decimal': lambda value: Decimal(value) if value else None}
+    schema = pa.schema([(name, types[kind]) for name, kind in OVERDUE_COLUMNS])
+
+    name = f"overdue_{uuid.uuid4().hex}.parquet"
+    path = os.path.join(directory, name)
+    reader = csv.reader(io.TextIOWrapper(gzip.GzipFile(fileobj=io.BytesIO(data)), encoding='utf-8', newline=''))
+    next(reader, None)
+    with pq.ParquetWriter(f"{path}.part", schema) as writer:
+        group = []
+        for row in reader:
+            group.append([parse[kind](value) for (column, kind), value in zip(OVERDUE_COLUMNS, row)])
+            if len(group) >= ROW_GROUP_SIZE:
+                writer.write_table(pa.Table.from_pylist([dict(zip(schema.names, row)) for row in group], schema=schema))
+                group = []
+        writer.write_table(pa.Table.from_pylist([dict(zip(schema.names, row)) for row in group], schema=schema))
+    os.replace(f"{path}.part", path)
+    return name
+
+
+def report_files_to_parquet(apps, schema_editor):
+    """Move report files out of the database to Parquet files on the persistent volume"""
+    Report = apps.get_model('administration', 'Report')
+    ReportFile = apps.get_model('administration', 'ReportFile')
+    if not ReportFile.objects.exists():
+        return
+    directory = getattr(settings, 'REPORT_FILES_DIR', None)
+    if not directory:
+        raise RuntimeError(
+            "Report files are stored in the database: set PERSISTENT_STORAGE_ROOT to a mounted volume "
+            "so they can be moved there before migrating"
+        )
+    os.makedirs(directory, exist_ok=True)
+    for report_file in ReportFile.objects.iterator(chunk_size=1):
+        name = write_parquet(bytes(report_file.data), directory)
+        Report.objects.filter(file_path=report_file.name).update(file_path=name)
+        report_file.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0011_report_file'),
+    ]
+
+    operations = [
+        migrations.RunPython(report_files_to_parquet, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name='ReportFile',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-17 20:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0013_cohorts_report_type'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activitylog',
+            name='action',
+            field=models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete'), ('login', 'Login'), ('logout', 'Logout'), ('payment', 'Payment'), ('status_change', 'Status Change'), ('approve', 'Approve'), ('reject', 'Reject'), ('generate', 'Generate Report')], max_length=20),
+        ),
+    ]
@@ -1,5 +1,6 @@
 # administration/models.py
 from django.db import models
+from django.utils import timezone
 from accounts.models import User
 
 class ActivityLog(models.Model):
@@ -11,21 +12,32 @@ class ActivityLog(models.Model):
         ('logout', 'Logout'),
         ('payment', 'Payment'),
         ('status_change', 'Status Change'),
+        ('approve', 'Approve'),
+        ('reject', 'Reject'),
+        ('generate', 'Generate Report'),
     ]
     
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Empty for system jobs such as the nightly overdue sweep
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     action = models.CharField(max_length=20, choices=ACTION_CHOICES)
     model_name = models.CharField(max_length=50)
     object_id = models.IntegerField(null=True, blank=True)
     description = models.TextField()
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the entry is queued, not when the audit buffer is flushed
+    timestamp = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # Newest-first listing and date range filters
+            models.Index(fields=['-timestamp', '-id'], name='activitylog_timestamp_idx'),
+            models.Index(fields=['user', '-timestamp'], name='activitylog_user_time_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.user.username} - {self.action} - {self.model_name}"
+        username = self.user.username if self.user else 'system'
+        return f"{username} - {self.action} - {self.model_name}"
 
 class Report(models.Model):
     REPORT_TYPES = [
@@ -34,6 +46,8 @@ class Report(models.Model):
         ('loan', 'Loan Report'),
         ('payment', 'Payment Report'),
         ('overdue', 'Overdue Report'),
+        ('aging', 'Aging Report'),
+        ('cohorts', 'Cohort Analytics'),
     ]
     
     title = models.CharField(max_length=200)
@@ -43,11 +57,105 @@ class Report(models.Model):
     date_to = models.DateField()
     parameters = models.JSONField(default=dict)
     file_path = models.CharField(max_length=500, blank=True)
+    # Identify the request and the state of the data the report was built from, see jobs.request_report
+    cache_key = models.CharField(max_length=64, blank=True)
+    data_version = models.BigIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['cache_key', 'data_version'], name='report_cache_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.created_at.date()}"
 
+
+class PortfolioStat(models.Model):
+    """Running count and amount of laureates, loans or payments in one status"""
+    KIND_CHOICES = [
+        ('laureate', 'Laureate'),
+        ('loan', 'Loan'),
+        ('payment', 'Payment'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20)
+    count = models.BigIntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['kind', 'status']
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'status'], name='portfolio_stat_kind_status_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} {self.status}: {self.count}"
+
+class ReportJob(models.Model):
+    """A report generation request, run by the run_report_worker command"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    report_type = models.CharField(max_length=20, choices=Report.REPORT_TYPES)
+    parameters = models.JSONField(default=dict)
+    requested_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='report_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    progress = models.PositiveSmallIntegerField(default=0)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    error = models.TextField(blank=True)
+    report = models.ForeignKey(Report, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    worker = models.CharField(max_length=100, blank=True)
+    # Earliest time the job may be claimed; pushed back between retries
+    run_after = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Heartbeat while running, so jobs of a dead worker can be requeued
+    updated_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Claiming the next due job
+            models.Index(fields=['status', 'run_after'], name='reportjob_status_run_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_report_type_display()} job #{self.id} - {self.status}"
+
+
+class DataVersion(models.Model):
+    """Counter bumped after every committed loan or payment write, see administration.versioning"""
+    name = models.CharField(max_length=50, unique=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class CohortSnapshot(models.Model):
+    """Cohort repayment analytics of the whole portfolio, computed by build_cohort_analytics"""
+    # {dimension: [{<dimension>: value, 'loans': ..., 'repayment_rate': ...}, ...]}
+    cohorts = models.JSONField(default=dict)
+    totals = models.JSONField(default=dict)
+    as_of = models.DateField()
+    loan_count = models.PositiveIntegerField(default=0)
+    duration_ms = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Cohort snapshot {self.as_of} ({self.loan_count} loans)"
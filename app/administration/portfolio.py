@@ -0,0 +1,207 @@
+# administration/portfolio.py
+from collections import defaultdict
+from decimal import Decimal
+from functools import partial
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Sum, F
+from django.utils import timezone
+from .models import PortfolioStat
+from .trends import TREND_FIELDS, trend_key
+from .versioning import bump_data_version
+
+# Fields whose change moves an instance between tallies
+TRACKED_FIELDS = {
+    'laureate': ('is_active',),
+    'loan': ('status', 'amount'),
+    'payment': ('status', 'amount'),
+}
+
+
+def stat_key(instance):
+    """(kind, status, amount) an instance contributes, or None if it isn't tallied or isn't fully loaded"""
+    kind = instance._meta.model_name
+    fields = TRACKED_FIELDS.get(kind)
+    if fields is None or instance.get_deferred_fields().intersection(fields):
+        return None
+    if kind == 'laureate':
+        return kind, 'active' if instance.is_active else 'inactive', Decimal('0.00')
+    return kind, instance.status, Decimal(instance.amount or 0)
+
+
+def remember_state(instance):
+    """Keep the tally an instance counts towards, to diff against on its next write"""
+    instance._portfolio_state = stat_key(instance)
+
+
+def remember_loaded_state(instance):
+    """Keep the tally and trend a loaded instance counts towards, noting if .only()/.defer() left them out"""
+    remember_state(instance)
+    instance._trend_state = trend_key(instance)
+    kind = instance._meta.model_name
+    watched = set(TRACKED_FIELDS.get(kind, ())) | set(TREND_FIELDS.get(kind, ()))
+    instance._state_deferred = bool(watched.intersection(instance.get_deferred_fields()))
+
+
+class LoadedStateMixin:
+    """
+    Model mixin remembering the state each instance was loaded from the
+    database with, which administration.signals diffs writes against.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        remember_loaded_state(instance)
+        return instance
+
+
+def apply_deltas(deltas):
+    """Add {(kind, status): [count, amount]} deltas to the tally rows with in-place increments"""
+    now = timezone.now()
+    for (kind, status), (count, amount) in deltas.items():
+        if not count and not amount:
+            continue
+        rows = PortfolioStat.objects.filter(kind=kind, status=status)
+        if rows.update(count=F('count') + count, amount=F('amount') + amount, updated_at=now):
+            continue
+        try:
+            with transaction.atomic():
+                PortfolioStat.objects.create(kind=kind, status=status, count=count, amount=amount)
+        except IntegrityError:
+            # Another writer created the row first
+            rows.update(count=F('count') + count, amount=F('amount') + amount, updated_at=now)
+
+
+def record_changes(removed=(), added=()):
+    """
+    Move instances' (kind, status, amount) keys out of and into the tallies.
+
+    The deltas of one call are summed and applied by their own on_commit
+    callback, straight away in autocommit mode: writers don't queue on the
+    tally rows while they hold their own locks, and Django drops the
+    callback along with a rolled back transaction or savepoint, leaving
+    the tallies alone.
+    """
+    deltas = defaultdict(lambda: [0, Decimal('0.00')])
+    for sign, keys in ((-1, removed), (1, added)):
+        for key in keys:
+            if key is None:
+                continue
+            kind, status, amount = key
+            deltas[kind, status][0] += sign
+            deltas[kind, status][1] += sign * amount
+    if deltas:
+        transaction.on_commit(partial(apply_deltas, dict(deltas)))
+
+
+def record_created(instances):
+    """Count instances inserted without save(), e.g. by bulk_create"""
+    instances = list(instances)
+    record_changes(added=[stat_key(instance) for instance in instances])
+    for instance in instances:
+        remember_state(instance)
+    if instances:
+        bump_data_version(instances[0]._meta.model_name)
+
+
+def record_saved(instances):
+    """Count instances written without save(), e.g. by bulk_update, against the state they were loaded in"""
+    instances = list(instances)
+    record_changes(
+        removed=[getattr(instance, '_portfolio_state', None) for instance in instances],
+        added=[stat_key(instance) for instance in instances],
+    )
+    for instance in instances:
+        remember_state(instance)
+    if instances:
+        bump_data_version(instances[0]._meta.model_name)
+
+
+def update_status(queryset, status, **fields):
+    """
+    queryset.update(status=...) that keeps the tallies in step.
+
+    Locks and reads the affected rows first so the delta matches exactly
+    what the UPDATE changes. Returns the number of rows updated.
+    """
+    kind = queryset.model._meta.model_name
+    with transaction.atomic():
+        rows = list(queryset.exclude(status=status).select_for_update().values_list('id', 'status', 'amount'))
+        if not rows:
+            return 0
+        updated = queryset.model.objects.filter(id__in=[row[0] for row in rows]).update(status=status, **fields)
+        record_changes(
+            removed=[(kind, old_status, amount) for _, old_status, amount in rows],
+            added=[(kind, status, amount) for _, _, amount in rows],
+        )
+        bump_data_version(kind)
+    return updated
+
+
+def compute_portfolio_stats():
+    """Tallies recomputed from the source tables, {(kind, status): (count, amount)}"""
+    from laureates.models import Laureate
+    from loans.models import Loan
+    from payments.models import Payment
+    totals = {}
+    for row in Laureate.objects.values('is_active').annotate(count=Count('id')).order_by():
+        totals['laureate', 'active' if row['is_active'] else 'inactive'] = (row['count'], Decimal('0.00'))
+    for kind, model in (('loan', Loan), ('payment', Payment)):
+        for row in model.objects.values('status').annotate(count=Count('id'), amount=Sum('amount')).order_by():
+            totals[kind, row['status']] = (row['count'], row['amount'] or Decimal('0.00'))
+    return totals
+
+
+def rebuild_portfolio_stats(dry_run=False):
+    """
+    Replace every tally with freshly computed totals.
+
+    Returns the drifted tallies as (kind, status, stored, computed) with
+    (count, amount) pairs; nothing is written when dry_run is set.
+    """
+    with transaction.atomic():
+        totals = compute_portfolio_stats()
+        current = {
+            (stat.kind, stat.status): stat
+            for stat in PortfolioStat.objects.select_for_update()
+        }
+        drifted = []
+        for kind, status in sorted(set(totals) | set(current)):
+            computed = totals.get((kind, status), (0, Decimal('0.00')))
+            stat = current.get((kind, status))
+            stored = (stat.count, stat.amount) if stat else (0, Decimal('0.00'))
+            if stat is not None and stored == computed:
+                continue
+            drifted.append((kind, status, stored, computed))
+            if dry_run:
+                continue
+            if stat is None:
+                PortfolioStat.objects.create(kind=kind, status=status, count=computed[0], amount=computed[1])
+            else:
+                stat.count, stat.amount = computed
+                stat.save(update_fields=['count', 'amount', 'updated_at'])
+    return drifted
+
+
+class PortfolioStats:
+    """Every tally, read in one query"""
+
+    def __init__(self):
+        self.tallies = {
+            (kind, status): (count, amount)
+            for kind, status, count, amount in PortfolioStat.objects.values_list('kind', 'status', 'count', 'amount')
+        }
+
+    def count(self, kind, status):
+        return self.tallies.get((kind, status), (0, 0))[0]
+
+    def amount(self, kind, status):
+        return self.tallies.get((kind, status), (0, Decimal('0.00')))[1]
+
+    def overdue_payments(self, today=None):
+        """Swept overdue payments plus the pending ones that fell due since the last sweep"""
+        from payments.models import Payment
+        today = today or timezone.now().date()
+        # Bounded by the nightly sweep and served by the partial pending index
+        unswept = Payment.objects.filter(status='pending', due_date__lt=today).count()
+        return self.count('payment', 'overdue') + unswept
@@ -0,0 +1,225 @@
+# administration/reports.py
+from datetime import timedelta
+from decimal import Decimal
+from django.db.models import Sum, Count, Case, When, Q, F, DecimalField, Value
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from loans.models import Loan
+from payments.models import Payment
+from .analytics import build_cohort_snapshot
+from .storage import ReportFileWriter
+
+OVERDUE_CHUNK_SIZE = 2000
+OVERDUE_HEADER = ['Payment ID', 'Laureate Name', 'Amount', 'Due Date', 'Days Overdue', 'Loan ID']
+
+
+def build_financial_report(parameters, progress):
+    """Loan, collection and arrears totals over a date range"""
+    date_from = parse_date(parameters['date_from'])
+    date_to = parse_date(parameters['date_to'])
+
+    financial_data = {
+        'total_loans': Loan.objects.filter(
+            created_at__date__range=[date_from, date_to]
+        ).aggregate(
+            count=Count('id'),
+            total_amount=Sum('amount')
+        ),
+    }
+    progress(33)
+    financial_data['total_payments'] = Payment.objects.filter(
+        paid_date__range=[date_from, date_to],
+        status='completed'
+    ).aggregate(
+        count=Count('id'),
+        total_amount=Sum('amount'),
+        principal_amount=Sum('principal_amount'),
+        interest_amount=Sum('interest_amount')
+    )
+    progress(66)
+    financial_data['overdue_payments'] = Payment.objects.filter(
+        due_date__range=[date_from, date_to],
+        status__in=['overdue', 'missed']
+    ).aggregate(
+        count=Count('id'),
+        total_amount=Sum('amount')
+    )
+
+    # Convert Decimal values to float for JSON serialization
+    for key in financial_data:
+        for field, value in financial_data[key].items():
+            if isinstance(value, Decimal):
+                financial_data[key][field] = float(value)
+
+    return {
+        'title': f"Financial Report {date_from} to {date_to}",
+        'date_from': date_from,
+        'date_to': date_to,
+        'parameters': financial_data,
+    }
+
+
+def build_overdue_report(parameters, progress):
+    """Every overdue or missed payment with its laureate, written to a compressed file"""
+    today = timezone.now().date()
+    overdue_payments = Payment.objects.filter(
+        status__in=['overdue', 'missed']
+    ).select_related('loan__laureate__user').order_by('due_date', 'id')
+    total = overdue_payments.count()
+
+    total_amount = Decimal('0.00')
+    with ReportFileWriter('overdue', OVERDUE_HEADER) as output:
+        for payment in overdue_payments.iterator(chunk_size=OVERDUE_CHUNK_SIZE):
+            output.writerow([
+                payment.id,
+                payment.loan.laureate.user.get_full_name(),
+                payment.amount,
+                payment.due_date.isoformat(),
+                payment.days_overdue,
+                payment.loan_id
+            ])
+            total_amount += payment.amount
+            if output.rows % OVERDUE_CHUNK_SIZE == 0:
+                progress(99 * output.rows // total)
+
+    return {
+        'title': f"Overdue Payments Report - {today}",
+        'date_from': today - timedelta(days=365),
+        'date_to': today,
+        # Only summary metrics stay in the database; the rows live in the file
+        'parameters': {'row_count': output.rows, 'total_amount': float(total_amount)},
+        'file_path': output.relative_path,
+    }
+
+
+# (key, label, oldest due date offset in days or None, newest due date offset in days or None)
+AGING_BUCKETS = [
+    ('current', 'Current', 0, None),
+    ('days_1_30', '1-30 days', 30, 1),
+    ('days_31_60', '31-60 days', 60, 31),
+    ('days_61_90', '61-90 days', 90, 61),
+    ('days_90_plus', '90+ days', None, 91),
+]
+AGING_BREAKDOWNS = [
+    ('by_institution', 'Institution', 'loan__laureate__institution'),
+    ('by_loan_status', 'Loan Status', 'loan__status'),
+]
+
+
+def aging_aggregates(today):
+    """
+    Conditional count/amount per bucket, for .aggregate() or .annotate().
+
+    Buckets compare due_date with fixed dates rather than computing days
+    overdue per row, so the database does all the work off the due date
+    index.
+    """
+    aggregates = {}
+    for key, label, oldest, newest in AGING_BUCKETS:
+        condition = Q()
+        if oldest is not None:
+            condition &= Q(due_date__gte=today - timedelta(days=oldest))
+        if newest is not None:
+            condition &= Q(due_date__lte=today - timedelta(days=newest))
+        aggregates[f'{key}_count'] = Count(Case(When(condition, then=Value(1))))
+        aggregates[f'{key}_amount'] = Sum(
+            Case(When(condition, then=F('amount')), default=Value(0), output_field=DecimalField())
+        )
+    aggregates['total_count'] = Count('id')
+    aggregates['total_amount'] = Sum('amount')
+    return aggregates
+
+
+def _json_amounts(row):
+    return {key: float(value) if isinstance(value, Decimal) else (value or 0) for key, value in row.items()}
+
+
+def build_aging_report(parameters, progress):
+    """Unpaid payments bucketed by days past due, overall, per institution and per loan status"""
+    today = timezone.now().date()
+    # Everything scheduled and not yet paid; "current" is the part not yet due
+    unpaid = Payment.objects.exclude(status='completed').order_by()
+    aggregates = aging_aggregates(today)
+
+    aging_data = {
+        'as_of': today.isoformat(),
+        'totals': _json_amounts(unpaid.aggregate(**aggregates)),
+    }
+    for step, (key, label, field) in enumerate(AGING_BREAKDOWNS, start=1):
+        progress(100 * step // (len(AGING_BREAKDOWNS) + 1))
+        aging_data[key] = [
+            {'group': row.pop(field), **_json_amounts(row)}
+            for row in unpaid.values(field).annotate(**aggregates).order_by(field)
+        ]
+
+    return {
+        'title': f"Delinquency Aging Report - {today}",
+        'date_from': today,
+        'date_to': today,
+        'parameters': aging_data,
+    }
+
+
+def build_cohort_report(parameters, progress):
+    """Cohort analytics over the whole portfolio, stored as the latest CohortSnapshot"""
+    snapshot = build_cohort_snapshot()
+    return {
+        'title': f"Cohort Analytics - {snapshot.as_of}",
+        'date_from': snapshot.as_of,
+        'date_to': snapshot.as_of,
+        # The breakdowns live in the snapshot, served by GET cohorts
+        'parameters': {'snapshot_id': snapshot.id, 'loan_count': snapshot.loan_count, 'totals': snapshot.totals},
+    }
+
+
+FINANCIAL_HEADER = ['Metric', 'Count', 'Total Amount']
+
+
+def financial_rows(parameters):
+    loans = parameters.get('total_loans', {})
+    payments = parameters.get('total_payments', {})
+    overdue = parameters.get('overdue_payments', {})
+    yield ['Total Loans', loans.get('count', 0), loans.get('total_amount', 0)]
+    yield ['Total Payments', payments.get('count', 0), payments.get('total_amount', 0)]
+    yield ['Principal Repaid', '', payments.get('principal_amount', 0)]
+    yield ['Interest Collected', '', payments.get('interest_amount', 0)]
+    yield ['Overdue Payments', overdue.get('count', 0), overdue.get('total_amount', 0)]
+
+
+def overdue_rows(parameters):
+    """Rows of overdue reports generated before they were stored as files"""
+    for payment in parameters.get('overdue_payments', []):
+        yield [
+            payment.get('payment_id', ''),
+            payment.get('laureate_name', ''),
+            payment.get('amount', 0),
+            payment.get('due_date', ''),
+            payment.get('days_overdue', 0),
+            payment.get('loan_id', '')
+        ]
+
+
+AGING_HEADER = ['Breakdown', 'Group'] + [
+    f'{label} {measure}' for key, label, oldest, newest in AGING_BUCKETS for measure in ('Count', 'Amount')
+] + ['Total Count', 'Total Amount']
+
+
+def aging_rows(parameters):
+    def values(row):
+        cells = []
+        for key, label, oldest, newest in AGING_BUCKETS:
+            cells += [row.get(f'{key}_count', 0), row.get(f'{key}_amount', 0)]
+        return cells + [row.get('total_count', 0), row.get('total_amount', 0)]
+
+    yield ['All', 'All'] + values(parameters.get('totals', {}))
+    for key, label, field in AGING_BREAKDOWNS:
+        for row in parameters.get(key, []):
+            yield [label, row.get('group') or '-'] + values(row)
+
+
+REPORT_BUILDERS = {
+    'financial': build_financial_report,
+    'overdue': build_overdue_report,
+    'aging': build_aging_report,
+    'cohorts': build_cohort_report,
+}
@@ -0,0 +1,212 @@
+# administration/retention.py
+import gzip
+import json
+import os
+import re
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import ActivityLog
+from .storage import persistent_directory
+
+TABLE = ActivityLog._meta.db_table
+DEFAULT_PARTITION = f'{TABLE}_default'
+PARTITION_NAME = re.compile(rf'^{TABLE}_y(\d{{4}})m(\d{{2}})$')
+# Monthly partitions kept created ahead of time, so new rows never land in the default one
+PARTITIONS_AHEAD = 2
+EXPORT_CHUNK_SIZE = 2000
+ARCHIVE_FIELDS = ['id', 'timestamp', 'user_id', 'user__username', 'action', 'model_name',
+                  'object_id', 'description', 'ip_address']
+
+
+class ArchiveError(Exception):
+    """An archive could not be confirmed, so its month was left in place"""
+
+
+def month_start(value):
+    """First instant (UTC) of the month containing value"""
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(start, months):
+    index = start.year * 12 + start.month - 1 + months
+    return start.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(start):
+    return f'{TABLE}_y{start.year}m{start.month:02d}'
+
+
+def is_partitioned():
+    """Whether the activity log is a native (PostgreSQL) partitioned table"""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def month_partitions():
+    """{month start: partition name} of the existing monthly partitions"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s AND pg_table_is_visible(p.oid)",
+            [TABLE]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = {}
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions[datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc)] = name
+    return partitions
+
+
+def create_partition(start):
+    """
+    Add the partition of one month.
+
+    Rows of that month already caught by the default partition are moved
+    into it first; PostgreSQL refuses to attach a range the default
+    partition still holds rows for.
+    """
+    name = partition_name(start)
+    bounds = (start.isoformat(), add_months(start, 1).isoformat())
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE "{name}" (LIKE "{TABLE}" INCLUDING DEFAULTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+            f'WHERE "timestamp" >= %s AND "timestamp" < %s RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved',
+            bounds
+        )
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{name}" '
+            f"FOR VALUES FROM ('{bounds[0]}') TO ('{bounds[1]}')"
+        )
+    return name
+
+
+def ensure_partitions(months_ahead=PARTITIONS_AHEAD):
+    """Create the partitions of the current and next months that are missing"""
+    if not is_partitioned():
+        return []
+    existing = month_partitions()
+    current = month_start(timezone.now())
+    months = [add_months(current, offset) for offset in range(months_ahead + 1)]
+    return [create_partition(start) for start in months if start not in existing]
+
+
+def export_month(start, directory):
+    """Write the entries of one month to a gzip JSON Lines file; (path, rows)"""
+    entries = ActivityLog.objects.filter(
+        timestamp__gte=start, timestamp__lt=add_months(start, 1)
+    ).order_by('timestamp', 'id').values(*ARCHIVE_FIELDS)
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'activitylog_{start:%Y_%m}.jsonl.gz')
+    temp_path = f'{path}.part'
+    rows = 0
+    try:
+        with open(temp_path, 'wb') as raw:
+            with gzip.open(raw, 'wt', encoding='utf-8') as output:
+                for entry in entries.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+                    entry['username'] = entry.pop('user__username')
+                    output.write(json.dumps(entry, cls=DjangoJSONEncoder))
+                    output.write('\n')
+                    rows += 1
+            raw.flush()
+            os.fsync(raw.fileno())
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    if not rows:
+        os.remove(temp_path)
+        return None, 0
+    # Re-running after a failed purge rewrites the same file with the same rows
+    os.replace(temp_path, path)
+    directory_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(directory_fd)
+    finally:
+        os.close(directory_fd)
+    return path, rows
+
+
+def archived_rows(path):
+    """Entries readable back from an archive file"""
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as archive:
+            return sum(1 for line in archive if json.loads(line))
+    except (OSError, EOFError, ValueError) as error:
+        raise ArchiveError(f"Archive {path} is unreadable: {error}") from error
+
+
+def purge_month(start, partitions, archived):
+    """
+    Remove one month of entries: drop its partition, or delete its rows.
+
+    Refuses unless the month still holds exactly the archived number of entries.
+    """
+    with transaction.atomic():
+        entries = ActivityLog.objects.filter(timestamp__gte=start, timestamp__lt=add_months(start, 1))
+        rows = entries.count()
+        if rows != archived:
+            raise ArchiveError(f"{start:%Y-%m} holds {rows} entries but {archived} were archived")
+        name = partitions.get(start)
+        if name:
+            with connection.cursor() as cursor:
+                cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+                cursor.execute(f'DROP TABLE "{name}"')
+        # Portable path, and rows of that month left in a default partition
+        entries.delete()
+
+
+def archive_activity_logs(retention_months=None, directory=None, dry_run=False):
+    """
+    Export every whole month older than the retention period to
+    compressed JSON Lines on the persistent volume, read each archive
+    back, then drop the month from the database.
+
+    Returns (month start, rows, archive path) per archived month.
+    """
+    if retention_months is None:
+        retention_months = settings.ACTIVITY_LOG_RETENTION_MONTHS
+    directory = persistent_directory(directory or settings.ACTIVITY_LOG_ARCHIVE_DIR)
+    cutoff = add_months(month_start(timezone.now()), -retention_months)
+
+    partitions = month_partitions() if is_partitioned() else {}
+    months = {start for start in partitions if start < cutoff}
+    # Months that still hold rows, found by hopping along the timestamp index
+    start = None
+    while True:
+        entries = ActivityLog.objects.filter(timestamp__lt=cutoff)
+        if start is not None:
+            entries = entries.filter(timestamp__gte=add_months(start, 1))
+        oldest = entries.order_by('timestamp').values_list('timestamp', flat=True).first()
+        if oldest is None:
+            break
+        start = month_start(oldest)
+        months.add(start)
+
+    archived = []
+    for start in sorted(months):
+        if dry_run:
+            rows = ActivityLog.objects.filter(timestamp__gte=start, timestamp__lt=add_months(start, 1)).count()
+            archived.append((start, rows, None))
+            continue
+        path, rows = export_month(start, directory)
+        if path and archived_rows(path) != rows:
+            raise ArchiveError(f"Archive {path} does not hold the {rows} entries written")
+        purge_month(start, partitions, rows)
+        archived.append((start, rows, path))
+    return archived
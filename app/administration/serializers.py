@@ -1,9 +1,9 @@
 # administration/serializers.py
 from rest_framework import serializers
-from .models import ActivityLog, Report
+from .models import ActivityLog, Report, ReportJob, CohortSnapshot
 
 class ActivityLogSerializer(serializers.ModelSerializer):
-    user_name = serializers.CharField(source='user.get_full_name', read_only=True)
+    user_name = serializers.CharField(source='user.get_full_name', read_only=True, allow_null=True)
     
     class Meta:
         model = ActivityLog
@@ -19,7 +19,30 @@ class ReportSerializer(serializers.ModelSerializer):
                  'date_from', 'date_to', 'parameters', 'file_path', 'created_at']
         read_only_fields = ['generated_by_name', 'created_at']
 
+class ReportListSerializer(serializers.ModelSerializer):
+    generated_by_name = serializers.CharField(source='generated_by.get_full_name', read_only=True)
+    
+    class Meta:
+        model = Report
+        fields = ['id', 'title', 'report_type', 'generated_by_name', 
+                 'date_from', 'date_to', 'file_path', 'created_at']
+
 class ReportCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Report
-        fields = ['title', 'report_type', 'date_from', 'date_to', 'parameters']
\ No newline at end of file
+        fields = ['title', 'report_type', 'date_from', 'date_to', 'parameters']
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    requested_by_name = serializers.CharField(source='requested_by.get_full_name', read_only=True)
+    
+    class Meta:
+        model = ReportJob
+        fields = ['id', 'report_type', 'parameters', 'status', 'progress', 'attempts', 'max_attempts',
+                 'error', 'report', 'requested_by_name', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+
+class CohortSnapshotSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CohortSnapshot
+        fields = ['id', 'as_of', 'loan_count', 'duration_ms', 'totals', 'cohorts', 'created_at']
+        read_only_fields = fields
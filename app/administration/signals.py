@@ -0,0 +1,67 @@
+# administration/signals.py
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from laureates.models import Laureate
+from loans.models import Loan
+from payments.models import Payment
+from .models import Report
+from .portfolio import stat_key, record_changes
+from .storage import delete_report_file
+from .trends import trend_key, invalidate_trends
+from .versioning import bump_data_version
+
+# Their state as loaded is remembered by portfolio.LoadedStateMixin
+TALLIED_MODELS = (Laureate, Loan, Payment)
+
+
+def load_missing_state(sender, instance, **kwargs):
+    # Instances loaded with .only()/.defer() have no remembered state; read it back before overwriting
+    if instance._state.adding or not getattr(instance, '_state_deferred', False):
+        return
+    stored = sender.objects.filter(pk=instance.pk).first()
+    instance._portfolio_state = stat_key(stored) if stored else None
+    instance._trend_state = trend_key(stored) if stored else None
+    instance._state_deferred = False
+
+
+def record_save(sender, instance, created, **kwargs):
+    # A partly loaded instance doesn't hold every tracked field; read back what was written
+    written = instance
+    if instance.get_deferred_fields():
+        written = sender.objects.filter(pk=instance.pk).first() or instance
+    previous = None if created else getattr(instance, '_portfolio_state', None)
+    current = stat_key(written)
+    if previous != current:
+        record_changes(removed=[previous], added=[current])
+    instance._portfolio_state = current
+
+    previous_trend = None if created else getattr(instance, '_trend_state', None)
+    current_trend = trend_key(written)
+    if previous_trend != current_trend:
+        invalidate_trends(state[0] for state in (previous_trend, current_trend) if state)
+    instance._trend_state = current_trend
+    instance._state_deferred = False
+    bump_data_version(sender._meta.model_name)
+
+
+def record_delete(sender, instance, **kwargs):
+    record_changes(removed=[getattr(instance, '_portfolio_state', None) or stat_key(instance)])
+    trend = getattr(instance, '_trend_state', None) or trend_key(instance)
+    if trend:
+        invalidate_trends([trend[0]])
+    bump_data_version(sender._meta.model_name)
+
+
+def remove_report_file(sender, instance, **kwargs):
+    # Also sent for queryset and admin bulk deletes; the file goes once the delete commits
+    if instance.file_path:
+        transaction.on_commit(partial(delete_report_file, instance.file_path))
+
+
+def connect():
+    for model in TALLIED_MODELS:
+        pre_save.connect(load_missing_state, sender=model, dispatch_uid=f'portfolio_pre_save_{model.__name__}')
+        post_save.connect(record_save, sender=model, dispatch_uid=f'portfolio_save_{model.__name__}')
+        post_delete.connect(record_delete, sender=model, dispatch_uid=f'portfolio_delete_{model.__name__}')
+    post_delete.connect(remove_report_file, sender=Report, dispatch_uid='report_file_delete')
@@ -0,0 +1,133 @@
+# administration/storage.py
+import os
+import uuid
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from foundation_academy.exports import PARQUET_ROW_GROUP_SIZE, parquet_schema
+
+READ_CHUNK_SIZE = 64 * 1024
+READ_BATCH_SIZE = 2000
+
+
+def persistent_directory(directory):
+    """
+    Resolved path of a directory on the persistent volume.
+
+    Refuses anything outside PERSISTENT_STORAGE_ROOT: the container
+    filesystem is replaced on every deploy.
+    """
+    root = settings.PERSISTENT_STORAGE_ROOT
+    if not root:
+        raise ImproperlyConfigured("PERSISTENT_STORAGE_ROOT is not set; mount a volume and point it there")
+    root = os.path.realpath(root)
+    if not os.path.isdir(root):
+        raise ImproperlyConfigured(f"PERSISTENT_STORAGE_ROOT {root} does not exist; is the volume mounted?")
+    if not directory:
+        raise ImproperlyConfigured("No directory configured on the persistent volume")
+    directory = os.path.realpath(directory)
+    if os.path.commonpath([root, directory]) != root:
+        raise ImproperlyConfigured(f"{directory} is not on the persistent volume ({root})")
+    return directory
+
+
+def report_file_path(relative_path):
+    """Absolute path of a report file (Report.file_path) under REPORT_FILES_DIR"""
+    return os.path.join(persistent_directory(settings.REPORT_FILES_DIR), relative_path)
+
+
+class ReportFileWriter:
+    """
+    Write report rows to a Parquet file on the persistent volume.
+
+    Rows are written one row group at a time, column types inferred from
+    the first group, into a temporary file that is only moved into place
+    on a clean exit, so readers never see a partial report.
+    """
+
+    def __init__(self, prefix, header, row_group_size=PARQUET_ROW_GROUP_SIZE):
+        self.relative_path = f"{prefix}_{uuid.uuid4().hex}.parquet"
+        self.header = header
+        self.row_group_size = row_group_size
+        self.rows = 0
+
+    def __enter__(self):
+        self.path = report_file_path(self.relative_path)
+        self.temp_path = f"{self.path}.part"
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.group = []
+        self.writer = None
+        return self
+
+    def writerow(self, row):
+        self.group.append(row)
+        self.rows += 1
+        if len(self.group) >= self.row_group_size:
+            self._write_group()
+
+    def _write_group(self):
+        columns = [list(column) for column in zip(*self.group)] or [[] for name in self.header]
+        if self.writer is None:
+            self.schema = parquet_schema(self.header, columns)
+            self.writer = pq.ParquetWriter(self.temp_path, self.schema)
+        self.writer.write_table(pa.Table.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, self.schema)], schema=self.schema
+        ))
+        self.group = []
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            try:
+                if exc_type is None and (self.group or self.writer is None):
+                    self._write_group()
+            finally:
+                if self.writer is not None:
+                    self.writer.close()
+            if exc_type is None:
+                with open(self.temp_path, 'rb') as written:
+                    os.fsync(written.fileno())
+                os.replace(self.temp_path, self.path)
+        finally:
+            if os.path.exists(self.temp_path):
+                os.remove(self.temp_path)
+        return False
+
+
+def report_file_exists(relative_path):
+    return os.path.exists(report_file_path(relative_path))
+
+
+def read_report_file(relative_path, chunk_size=READ_CHUNK_SIZE):
+    """Yield the stored Parquet bytes of a report file"""
+    with pa.memory_map(report_file_path(relative_path)) as source:
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def read_report_rows(relative_path, batch_size=READ_BATCH_SIZE):
+    """(header, rows) of a report file, rows read from the memory-mapped file batch by batch"""
+    source = pa.memory_map(report_file_path(relative_path))
+    parquet = pq.ParquetFile(source)
+    header = parquet.schema_arrow.names
+
+    def rows():
+        try:
+            for batch in parquet.iter_batches(batch_size=batch_size):
+                for row in zip(*(column.to_pylist() for column in batch.columns)):
+                    yield list(row)
+        finally:
+            source.close()
+    return header, rows()
+
+
+def delete_report_file(relative_path):
+    if not relative_path:
+        return
+    try:
+        os.remove(report_file_path(relative_path))
+    except FileNotFoundError:
+        pass
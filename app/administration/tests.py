@@ -1,3 +1,201 @@
-from django.test import TestCase
+import threading
+import unittest
+from datetime import date, timedelta
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import User
+from laureates.models import Laureate
+from loans.models import Loan
+from .audit import buffer
+from .jobs import claim_next_job, requeue_stale_jobs
+from .models import ActivityLog, ReportJob
+from .portfolio import PortfolioStats
+from .versioning import get_data_version
 
-# Create your tests here.
+
+class TransactionDeltaTests(TestCase):
+    """Tally and data version changes only land once the writes that made them commit"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='laureate', email='laureate@example.com', password='pw')
+        cls.laureate = Laureate.objects.create(user=user, student_id='S00001', graduation_year=2020)
+
+    def create_loan(self, amount=1000):
+        return Loan.objects.create(
+            laureate=self.laureate, amount=amount, start_date=date(2024, 1, 1), end_date=date(2025, 1, 1),
+            monthly_payment=100,
+        )
+
+    def active_loans(self):
+        stats = PortfolioStats()
+        return stats.count('loan', 'active'), stats.amount('loan', 'active')
+
+    def test_commit(self):
+        version = get_data_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.create_loan(1000)
+                loan = self.create_loan(500)
+                loan.status = 'suspended'
+                loan.save()
+                # Nothing is applied before the commit
+                self.assertEqual(self.active_loans(), (0, 0))
+        self.assertEqual(self.active_loans(), (1, 1000))
+        self.assertEqual(PortfolioStats().count('loan', 'suspended'), 1)
+        # Three writes, one commit
+        self.assertEqual(get_data_version(), version + 1)
+
+    def test_rollback(self):
+        version = get_data_version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    self.create_loan()
+                    raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.active_loans(), (0, 0))
+        self.assertEqual(get_data_version(), version)
+
+    def test_nested_savepoints(self):
+        version = get_data_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                kept = self.create_loan(1000)
+                with self.assertRaises(RuntimeError):
+                    with transaction.atomic():
+                        self.create_loan(300)
+                        kept.status = 'completed'
+                        kept.save()
+                        raise RuntimeError
+                with transaction.atomic():
+                    self.create_loan(200)
+        self.assertEqual(self.active_loans(), (2, 1200))
+        self.assertEqual(PortfolioStats().count('loan', 'completed'), 0)
+        self.assertEqual(get_data_version(), version + 1)
+
+    def test_rolled_back_savepoint_alone(self):
+        version = get_data_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                with self.assertRaises(RuntimeError):
+                    with transaction.atomic():
+                        self.create_loan()
+                        raise RuntimeError
+        self.assertEqual(self.active_loans(), (0, 0))
+        self.assertEqual(get_data_version(), version)
+
+
+class ClaimJobTests(TestCase):
+    """Each due job is claimed by one worker, oldest first"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', email='admin@example.com', password='pw')
+
+    def queue(self, **fields):
+        return ReportJob.objects.create(report_type='overdue', requested_by=self.admin, **fields)
+
+    def test_claims_oldest_due_job_once(self):
+        now = timezone.now()
+        newer = self.queue(run_after=now - timedelta(minutes=1))
+        older = self.queue(run_after=now - timedelta(minutes=5))
+        self.queue(run_after=now + timedelta(minutes=5))
+        self.queue(status='running')
+
+        job = claim_next_job('worker-1')
+        self.assertEqual(job.pk, older.pk)
+        self.assertEqual((job.status, job.worker), ('running', 'worker-1'))
+        self.assertIsNotNone(job.started_at)
+        self.assertEqual(claim_next_job('worker-2').pk, newer.pk)
+        # The remaining job isn't due yet
+        self.assertIsNone(claim_next_job('worker-1'))
+
+    def test_requeue_stale_jobs(self):
+        stale = timezone.now() - timedelta(hours=1)
+        requeued = self.queue(status='running', worker='worker-1')
+        failed = self.queue(status='running', worker='worker-1', attempts=2)
+        fresh = self.queue(status='running', worker='worker-2')
+        ReportJob.objects.filter(pk__in=[requeued.pk, failed.pk]).update(updated_at=stale)
+
+        self.assertEqual(requeue_stale_jobs(), (1, 1))
+        requeued.refresh_from_db()
+        failed.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual((requeued.status, requeued.attempts, requeued.worker), ('queued', 1, ''))
+        self.assertGreater(requeued.run_after, timezone.now())
+        self.assertEqual(failed.status, 'failed')
+        self.assertEqual(fresh.status, 'running')
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', "SKIP LOCKED needs PostgreSQL")
+class SkipLockedClaimTests(TransactionTestCase):
+    """A job locked by another worker's claim is skipped rather than waited on"""
+
+    def test_locked_job_is_skipped(self):
+        admin = User.objects.create_user(username='admin', email='admin@example.com', password='pw')
+        now = timezone.now()
+        locked = ReportJob.objects.create(report_type='overdue', requested_by=admin, run_after=now - timedelta(minutes=5))
+        free = ReportJob.objects.create(report_type='overdue', requested_by=admin, run_after=now - timedelta(minutes=1))
+        holding = threading.Event()
+        release = threading.Event()
+
+        def hold_lock():
+            try:
+                with transaction.atomic():
+                    list(ReportJob.objects.select_for_update().filter(pk=locked.pk))
+                    holding.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        try:
+            self.assertTrue(holding.wait(10))
+            self.assertEqual(claim_next_job('worker-1').pk, free.pk)
+            self.assertIsNone(claim_next_job('worker-1'))
+        finally:
+            release.set()
+            thread.join()
+        # Once the lock is released the skipped job is claimable again
+        self.assertEqual(claim_next_job('worker-2').pk, locked.pk)
+
+
+class AuditMiddlewareTests(TestCase):
+    """Mutating API calls are logged against the object they created or acted on"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        buffer.take()
+
+    def logged(self):
+        buffer.flush()
+        return ActivityLog.objects.get()
+
+    def test_create_single_laureate(self):
+        response = self.client.post('/api/laureates/laureates/create_single/', {
+            'username': 'ada', 'email': 'ada@example.com', 'first_name': 'Ada', 'last_name': 'Lovelace',
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        entry = self.logged()
+        self.assertEqual((entry.action, entry.model_name), ('create', 'Laureate'))
+        self.assertEqual(entry.object_id, response.data['laureate_id'])
+
+    def test_report_generation(self):
+        response = self.client.post('/api/admin/reports/generate_overdue/', HTTP_ACCEPT='application/json; version=2')
+        self.assertEqual(response.status_code, 202)
+        entry = self.logged()
+        self.assertEqual((entry.action, entry.model_name), ('generate', 'ReportJob'))
+        self.assertEqual(entry.object_id, response.data['id'])
+        self.assertEqual(entry.description, f"Requested Overdue Report (job #{entry.object_id})")
+
+    def test_cohort_refresh(self):
+        response = self.client.post('/api/admin/analytics/cohorts/refresh/')
+        self.assertEqual(response.status_code, 202)
+        entry = self.logged()
+        self.assertEqual((entry.action, entry.model_name, entry.object_id), ('generate', 'ReportJob', response.data['id']))
@@ -0,0 +1,131 @@
+# administration/trends.py
+from datetime import datetime, time, timedelta
+from dateutil.relativedelta import relativedelta
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+TRENDS_CACHE_KEY = 'trends:{}:{}'
+DEFAULT_MONTHS = 13
+MAX_MONTHS = 120
+
+# Bucket function, label format and step of each supported granularity
+GRANULARITIES = {
+    'month': (TruncMonth, '%Y-%m', relativedelta(months=1)),
+    'week': (TruncWeek, '%Y-%m-%d', timedelta(weeks=1)),
+}
+
+
+def period_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def period_starts(today, months, granularity):
+    """Start date of every period from `months` calendar months back through the current one"""
+    step = GRANULARITIES[granularity][2]
+    start = period_start(today.replace(day=1) - relativedelta(months=months - 1), granularity)
+    starts = []
+    while start <= today:
+        starts.append(start)
+        start += step
+    return starts
+
+
+def _as_datetime(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def compute_trends(start, end, granularity):
+    """Loans created and amounts collected per period in [start, end), two GROUP BY queries"""
+    from loans.models import Loan
+    from payments.models import Payment
+    trunc = GRANULARITIES[granularity][0]
+    # Plain range on created_at so its index applies, unlike created_at__date
+    loans = Loan.objects.filter(
+        created_at__gte=_as_datetime(start), created_at__lt=_as_datetime(end)
+    ).annotate(period=trunc('created_at')).values('period').annotate(count=Count('id')).order_by()
+    payments = Payment.objects.filter(
+        status='completed', paid_date__gte=start, paid_date__lt=end
+    ).annotate(period=trunc('paid_date')).values('period').annotate(amount=Sum('amount')).order_by()
+
+    totals = {}
+    for row in loans:
+        period = row['period']
+        period = timezone.localtime(period).date() if isinstance(period, datetime) else period
+        totals.setdefault(period, {'count': 0, 'amount': 0.0})['count'] = row['count']
+    for row in payments:
+        totals.setdefault(row['period'], {'count': 0, 'amount': 0.0})['amount'] = float(row['amount'] or 0)
+    return totals
+
+
+def get_trends(months=DEFAULT_MONTHS, granularity='month', today=None):
+    """
+    Per-period trend rows, zero-filled.
+
+    Closed periods are cached with no expiry and dropped by
+    invalidate_trends() when a write lands in them, so a call normally
+    only queries the current period.
+    """
+    today = today or timezone.localdate()
+    starts = period_starts(today, months, granularity)
+    label_format, step = GRANULARITIES[granularity][1:]
+    closed = starts[:-1]
+    keys = {start: TRENDS_CACHE_KEY.format(granularity, start.isoformat()) for start in closed}
+    cached = cache.get_many(keys.values())
+
+    missing = [start for start in closed if keys[start] not in cached]
+    computed = compute_trends(missing[0] if missing else starts[-1], starts[-1] + step, granularity)
+    cache.set_many({
+        keys[start]: computed.get(start, {'count': 0, 'amount': 0.0}) for start in missing
+    }, timeout=None)
+
+    rows = []
+    for start in starts:
+        values = cached.get(keys[start]) if start in keys else None
+        if values is None:
+            values = computed.get(start, {'count': 0, 'amount': 0.0})
+        rows.append((start.strftime(label_format), values))
+    return rows
+
+
+# Fields a cached period is computed from
+TREND_FIELDS = {
+    'loan': ('created_at',),
+    'payment': ('status', 'paid_date', 'amount'),
+}
+
+
+def trend_key(instance):
+    """(date, amount) an instance contributes to the trends, or None"""
+    kind = instance._meta.model_name
+    fields = TREND_FIELDS.get(kind)
+    if fields is None or instance.get_deferred_fields().intersection(fields):
+        return None
+    if kind == 'loan':
+        return (instance.created_at, None) if instance.created_at else None
+    if instance.status != 'completed':
+        return None
+    return instance.paid_date, instance.amount
+
+
+def invalidate_trends(days):
+    """Drop the cached periods containing these dates after a backdated write"""
+    today = timezone.localdate()
+    keys = set()
+    for day in days:
+        if day is None:
+            continue
+        if isinstance(day, datetime):
+            day = timezone.localtime(day).date()
+        for granularity in GRANULARITIES:
+            start = period_start(day, granularity)
+            # The current period is never cached
+            if start < period_start(today, granularity):
+                keys.add(TRENDS_CACHE_KEY.format(granularity, start.isoformat()))
+    if keys:
+        # After commit, so a concurrent read can't re-cache the old figures
+        transaction.on_commit(lambda: cache.delete_many(keys))
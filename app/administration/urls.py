@@ -1,12 +1,14 @@
 # administration/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import DashboardViewSet, ActivityLogViewSet, ReportViewSet
+from .views import DashboardViewSet, ActivityLogViewSet, ReportViewSet, ReportJobViewSet, AnalyticsViewSet
 
 router = DefaultRouter()
 router.register(r'dashboard', DashboardViewSet, basename='dashboard')
 router.register(r'activity-logs', ActivityLogViewSet)
 router.register(r'reports', ReportViewSet)
+router.register(r'report-jobs', ReportJobViewSet)
+router.register(r'analytics', AnalyticsViewSet, basename='analytics')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -0,0 +1,48 @@
+# administration/versioning.py
+import threading
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import DataVersion
+
+LOAN_DATA = 'loans'
+# Models whose writes change what reports are computed from
+VERSIONED_MODELS = ('loan', 'payment')
+
+# Per thread: whether the transaction that committed last has moved the counter yet
+_commit = threading.local()
+
+
+def _increment():
+    if not DataVersion.objects.filter(name=LOAN_DATA).update(version=F('version') + 1, updated_at=timezone.now()):
+        DataVersion.objects.get_or_create(name=LOAN_DATA, defaults={'version': 1})
+
+
+def _increment_once():
+    if getattr(_commit, 'counted', False):
+        return
+    _commit.counted = True
+    _increment()
+
+
+def bump_data_version(model_name=None):
+    """
+    Mark loan and payment data as changed.
+
+    The counter moves once per transaction, after it commits: writers
+    don't queue on the counter row, and a rolled back write leaves it
+    alone. Every write registers the callback, so one outside a rolled
+    back savepoint still counts; the first to run after the commit moves
+    the counter and the rest find it done.
+    """
+    if model_name is not None and model_name not in VERSIONED_MODELS:
+        return
+    if not transaction.get_connection().in_atomic_block:
+        _increment()
+        return
+    _commit.counted = False
+    transaction.on_commit(_increment_once)
+
+
+def get_data_version():
+    return DataVersion.objects.filter(name=LOAN_DATA).values_list('version', flat=True).first() or 0
@@ -3,20 +3,70 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
 from django.db.models import Sum, Count, Avg
 from django.utils import timezone
-from datetime import timedelta
+from django.utils.dateparse import parse_date
+from datetime import datetime, time, timedelta
 from accounts.permissions import IsAdminUser
 from laureates.models import Laureate
 from loans.models import Loan
 from payments.models import Payment
-from .models import ActivityLog, Report
-from .serializers import ActivityLogSerializer, ReportSerializer, ReportCreateSerializer
+from .models import ActivityLog, Report, ReportJob
+from .serializers import (
+    ActivityLogSerializer, ReportSerializer, ReportListSerializer, ReportCreateSerializer, ReportJobSerializer,
+    CohortSnapshotSerializer
+)
+from .jobs import request_report, cancel_job, wait_for_job
+from .reports import FINANCIAL_HEADER, OVERDUE_HEADER, AGING_HEADER, financial_rows, overdue_rows, aging_rows
+from .storage import report_file_exists, read_report_file, read_report_rows
+from .portfolio import PortfolioStats
+from .trends import GRANULARITIES, DEFAULT_MONTHS, MAX_MONTHS, get_trends
+from .analytics import DIMENSIONS, is_stale, latest_cohort_snapshot
+from .audit import audit_request
 
-from django.http import StreamingHttpResponse
-import csv
-from io import StringIO
 from django.core.exceptions import ObjectDoesNotExist
+from foundation_academy.pagination import KeysetPagination
+from foundation_academy.exports import EXPORT_RENDERERS, CONTENT_TYPES, download_response, export_response
+
+class ActivityLogPagination(KeysetPagination):
+    ordering = ('-timestamp', '-id')
+    page_size = 50
+
+
+RECENT_ACTIVITY_SIZE = 20
+# How long a version 1 generate_* request waits for the worker before
+# answering with the queued job instead of the report
+LEGACY_REPORT_WAIT = 10
+
+
+def audit_report_request(request, job, cached):
+    """Log a report request as a generation of its job, whatever the response carries"""
+    audit_request(
+        request, 'generate', 'ReportJob', job.id,
+        f"Requested {job.get_report_type_display()} (job #{job.id})" + (" (served from cache)" if cached else "")
+    )
+
+
+def report_job_response(request, job, cached):
+    """
+    Response for a generate_* request: the job, 200 when served from cache, else 202.
+
+    Version 1 clients (the shipped UI) expect the report itself, so they get
+    it with 201 if the worker finishes within LEGACY_REPORT_WAIT seconds.
+    """
+    audit_report_request(request, job, cached)
+    if request.version == '1':
+        job = wait_for_job(job, LEGACY_REPORT_WAIT)
+        if job.status == 'completed':
+            return Response(ReportSerializer(job.report).data, status=status.HTTP_201_CREATED)
+        if job.status in ('failed', 'cancelled'):
+            return Response(
+                {"error": job.error or f"Report generation {job.status}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+    return Response(ReportJobSerializer(job).data, status=status.HTTP_200_OK if cached else status.HTTP_202_ACCEPTED)
+
 
 class DashboardViewSet(viewsets.ViewSet):
     """Admin dashboard data - superuser only"""
@@ -27,86 +77,71 @@ class DashboardViewSet(viewsets.ViewSet):
         """Dashboard statistics for admins only"""
         today = timezone.now().date()
         
+        portfolio = PortfolioStats()
+        
         stats = {
-            'totalLaureates': Laureate.objects.filter(is_active=True).count(),
-            'activeLoans': Loan.objects.filter(status='active').count(),
-            'overduePayments': Payment.objects.filter(
-                status__in=['pending', 'overdue'],
-                due_date__lt=today
-            ).count(),
-            'totalAmount': Loan.objects.filter(status='active').aggregate(
-                total=Sum('amount')
-            )['total'] or 0,
-            'totalCollected': Payment.objects.filter(status='completed').aggregate(
-                total=Sum('amount')
-            )['total'] or 0,
-            'pendingAmount': Payment.objects.filter(status='pending').aggregate(
-                total=Sum('amount')
-            )['total'] or 0,
+            'totalLaureates': portfolio.count('laureate', 'active'),
+            'activeLoans': portfolio.count('loan', 'active'),
+            'overduePayments': portfolio.overdue_payments(today),
+            'totalAmount': portfolio.amount('loan', 'active'),
+            'totalCollected': portfolio.amount('payment', 'completed'),
+            'pendingAmount': portfolio.amount('payment', 'pending'),
         }
         
         return Response(stats)
     
     @action(detail=False, methods=['get'])
     def recent_activity(self, request):
-        """Get recent activity logs"""
-        activities = ActivityLog.objects.all()[:20]
+        """
+        Get recent activity logs (?page_size, then follow `next` for older
+        entries); API version 1 clients get the latest entries as a list
+        """
+        if request.version == '1':
+            activities = ActivityLog.objects.select_related('user')[:RECENT_ACTIVITY_SIZE]
+            return Response(ActivityLogSerializer(activities, many=True).data)
+        paginator = ActivityLogPagination()
+        paginator.page_size = RECENT_ACTIVITY_SIZE
+        activities = paginator.paginate_queryset(ActivityLog.objects.select_related('user'), request, view=self)
         serializer = ActivityLogSerializer(activities, many=True)
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def monthly_trends(self, request):
-        """Get monthly trends for charts"""
-        # Get data for the last 12 months
-        end_date = timezone.now().date()
-        start_date = end_date - timedelta(days=365)
-        
-        # Monthly loan creation trends
-        loans_by_month = []
-        payments_by_month = []
-        current_date = start_date.replace(day=1)
-        
-        while current_date <= end_date:
-            next_month = current_date.replace(month=current_date.month + 1) if current_date.month < 12 else current_date.replace(year=current_date.year + 1, month=1)
-            
-            loans_count = Loan.objects.filter(
-                created_at__date__gte=current_date,
-                created_at__date__lt=next_month
-            ).count()
-            
-            payments_amount = Payment.objects.filter(
-                paid_date__gte=current_date,
-                paid_date__lt=next_month,
-                status='completed'
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            
-            loans_by_month.append({
-                'month': current_date.strftime('%Y-%m'),
-                'count': loans_count
-            })
-            
-            payments_by_month.append({
-                'month': current_date.strftime('%Y-%m'),
-                'amount': float(payments_amount)
-            })
-            
-            current_date = next_month
+        """Loans created and payments collected per month (or ?granularity=week) for charts"""
+        granularity = request.query_params.get('granularity', 'month')
+        if granularity not in GRANULARITIES:
+            return Response(
+                {"error": f"granularity must be one of: {', '.join(GRANULARITIES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            months = int(request.query_params.get('months', DEFAULT_MONTHS))
+        except ValueError:
+            return Response({"error": "months must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        months = max(1, min(months, MAX_MONTHS))
         
+        rows = get_trends(months, granularity)
         trends = {
-            'loans_created': loans_by_month,
-            'payments_collected': payments_by_month,
+            'loans_created': [{granularity: label, 'count': values['count']} for label, values in rows],
+            'payments_collected': [{granularity: label, 'amount': values['amount']} for label, values in rows],
         }
         
         return Response(trends)
 
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
 class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
     """Activity logs - Admin only"""
     queryset = ActivityLog.objects.all()
     serializer_class = ActivityLogSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
+    pagination_class = ActivityLogPagination
     
     def get_queryset(self):
-        queryset = ActivityLog.objects.all()
+        # user_name is read from the joined user instead of one query per row
+        queryset = ActivityLog.objects.select_related('user')
         
         # Filter by action
         action = self.request.query_params.get('action', None)
@@ -118,17 +153,29 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
         if user_id:
             queryset = queryset.filter(user_id=user_id)
         
-        # Filter by date range
-        date_from = self.request.query_params.get('date_from', None)
-        date_to = self.request.query_params.get('date_to', None)
+        # Filter by date range, as timestamp bounds so the index (and partition pruning) applies
+        date_from = self.parse_date_param('date_from')
+        date_to = self.parse_date_param('date_to')
         
         if date_from:
-            queryset = queryset.filter(timestamp__date__gte=date_from)
+            queryset = queryset.filter(timestamp__gte=day_start(date_from))
         if date_to:
-            queryset = queryset.filter(timestamp__date__lte=date_to)
+            queryset = queryset.filter(timestamp__lt=day_start(date_to + timedelta(days=1)))
         
         return queryset
 
+    def parse_date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: "Expected a YYYY-MM-DD date"})
+        return parsed
+
 class ReportViewSet(viewsets.ModelViewSet):
     """Reports management - Admin only"""
     queryset = Report.objects.all()
@@ -138,10 +185,15 @@ class ReportViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == 'create':
             return ReportCreateSerializer
+        if self.action == 'list':
+            return ReportListSerializer
         return ReportSerializer
     
     def get_queryset(self):
-        queryset = Report.objects.all()
+        queryset = Report.objects.select_related('generated_by')
+        if self.action == 'list':
+            # Legacy reports kept their rows in parameters; the list never needs them
+            queryset = queryset.defer('parameters')
         
         # Filter by report type
         report_type = self.request.query_params.get('type', None)
@@ -155,7 +207,7 @@ class ReportViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['post'])
     def generate_financial(self, request):
-        """Generate financial report"""
+        """Queue a financial report; poll the returned job for progress (already completed when served from cache)"""
         date_from = request.data.get('date_from')
         date_to = request.data.get('date_to')
         if not date_from or not date_to:
@@ -163,136 +215,156 @@ class ReportViewSet(viewsets.ModelViewSet):
                 {"error": "date_from and date_to are required"},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        try:
+            valid = parse_date(date_from) and parse_date(date_to)
+        except ValueError:
+            valid = False
+        if not valid:
+            return Response(
+                {"error": "date_from and date_to must be YYYY-MM-DD dates"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Generate financial report data
-        financial_data = {
-            'total_loans': Loan.objects.filter(
-                created_at__date__range=[date_from, date_to]
-            ).aggregate(
-                count=Count('id'),
-                total_amount=Sum('amount')
-            ),
-            'total_payments': Payment.objects.filter(
-                paid_date__range=[date_from, date_to],
-                status='completed'
-            ).aggregate(
-                count=Count('id'),
-                total_amount=Sum('amount')
-            ),
-            'overdue_payments': Payment.objects.filter(
-                due_date__range=[date_from, date_to],
-                status__in=['overdue', 'missed']
-            ).aggregate(
-                count=Count('id'),
-                total_amount=Sum('amount')
-            ),
-        }
-
-        # Convert Decimal values to float for JSON serialization
-        for key in financial_data:
-            if financial_data[key]['total_amount'] is not None:
-                financial_data[key]['total_amount'] = float(financial_data[key]['total_amount'])
-
-        # Create report record without file_path
-        report = Report.objects.create(
-            title=f"Financial Report {date_from} to {date_to}",
-            report_type='financial',
-            generated_by=request.user,
-            date_from=date_from,
-            date_to=date_to,
-            parameters=financial_data,
-            file_path=''  # Optional: leave empty or omit if not needed
-        )
-        serializer = ReportSerializer(report)
-        return Response(serializer.data)
+        job, cached = request_report('financial', request.user, {'date_from': date_from, 'date_to': date_to})
+        return report_job_response(request, job, cached)
     
     @action(detail=False, methods=['post'])
     def generate_overdue(self, request):
-        """Generate overdue payments report"""
-        overdue_payments = Payment.objects.filter(
-            status__in=['overdue', 'missed']
-        ).select_related('loan__laureate__user')
-        overdue_data = []
-        for payment in overdue_payments:
-            overdue_data.append({
-                'payment_id': payment.id,
-                'laureate_name': payment.loan.laureate.user.get_full_name(),
-                'amount': float(payment.amount),  # Convert Decimal to float
-                'due_date': payment.due_date.isoformat(),  # Convert date to ISO string
-                'days_overdue': payment.days_overdue,
-                'loan_id': payment.loan.id
-            })
-
-        # Create report record
-        report = Report.objects.create(
-            title=f"Overdue Payments Report - {timezone.now().date()}",
-            report_type='overdue',
-            generated_by=request.user,
-            date_from=timezone.now().date() - timedelta(days=365),
-            date_to=timezone.now().date(),
-            parameters={'overdue_payments': overdue_data}
-        )
-        serializer = ReportSerializer(report)
-        return Response(serializer.data)
+        """Queue an overdue payments report; poll the returned job for progress"""
+        job, cached = request_report('overdue', request.user)
+        return report_job_response(request, job, cached)
+    
+    @action(detail=False, methods=['post'])
+    def generate_aging(self, request):
+        """Queue a delinquency aging report; poll the returned job for progress"""
+        job, cached = request_report('aging', request.user)
+        return report_job_response(request, job, cached)
         
 
-    @action(detail=True, methods=['get'])
+    @action(detail=True, methods=['get'], renderer_classes=EXPORT_RENDERERS)
     def download(self, request, pk=None):
-        """Download a report as a CSV file"""
+        """Stream a report as CSV (?compress=gzip for .csv.gz), ?format=xlsx or ?format=parquet"""
         try:
             report = self.get_object()
-            report_type = report.report_type
-            parameters = report.parameters
-
-            # Create a StringIO buffer to write CSV data
-            buffer = StringIO()
-            writer = csv.writer(buffer)
+        except ObjectDoesNotExist:
+            return Response(
+                {"error": "Report not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
 
-            if report_type == 'financial':
-                # Write CSV headers and data for financial report
-                writer.writerow(['Metric', 'Count', 'Total Amount'])
-                writer.writerow(['Total Loans', 
-                            parameters.get('total_loans', {}).get('count', 0),
-                            parameters.get('total_loans', {}).get('total_amount', 0)])
-                writer.writerow(['Total Payments', 
-                            parameters.get('total_payments', {}).get('count', 0),
-                            parameters.get('total_payments', {}).get('total_amount', 0)])
-                writer.writerow(['Overdue Payments', 
-                            parameters.get('overdue_payments', {}).get('count', 0),
-                            parameters.get('overdue_payments', {}).get('total_amount', 0)])
-                filename = f"financial_report_{report.date_from}_to_{report.date_to}.csv"
+        file_format = request.query_params.get('format', 'csv')
+        compress = request.query_params.get('compress') == 'gzip'
 
-            elif report_type == 'overdue':
-                # Write CSV headers and data for overdue report
-                writer.writerow(['Payment ID', 'Laureate Name', 'Amount', 'Due Date', 'Days Overdue', 'Loan ID'])
-                for payment in parameters.get('overdue_payments', []):
-                    writer.writerow([
-                        payment.get('payment_id', ''),
-                        payment.get('laureate_name', ''),
-                        payment.get('amount', 0),
-                        payment.get('due_date', ''),
-                        payment.get('days_overdue', 0),
-                        payment.get('loan_id', '')
-                    ])
-                filename = f"overdue_report_{report.created_at.strftime('%Y%m%d_%H%M%S')}.csv"
+        if report.report_type == 'financial':
+            filename = f"financial_report_{report.date_from}_to_{report.date_to}"
+        elif report.report_type == 'overdue':
+            filename = f"overdue_report_{report.created_at.strftime('%Y%m%d_%H%M%S')}"
+        elif report.report_type == 'aging':
+            filename = f"aging_report_{report.date_to}"
+        else:
+            return Response(
+                {"error": f"Download not supported for report type: {report.report_type}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-            else:
+        if report.file_path:
+            if not report_file_exists(report.file_path):
                 return Response(
-                    {"error": f"Download not supported for report type: {report_type}"},
-                    status=status.HTTP_400_BAD_REQUEST
+                    {"error": "Report file is missing"},
+                    status=status.HTTP_404_NOT_FOUND
                 )
+            # Stored files are Parquet: sent as-is, or re-encoded batch by batch
+            if file_format == 'parquet':
+                return download_response(read_report_file(report.file_path), f"{filename}.parquet", CONTENT_TYPES['parquet'])
+            header, rows = read_report_rows(report.file_path)
+        elif report.report_type == 'financial':
+            header, rows = FINANCIAL_HEADER, financial_rows(report.parameters)
+        elif report.report_type == 'aging':
+            header, rows = AGING_HEADER, aging_rows(report.parameters)
+        else:
+            header, rows = OVERDUE_HEADER, overdue_rows(report.parameters)
+        return export_response(header, rows, filename, file_format=file_format, compress=compress)
 
-            # Prepare streaming response
-            buffer.seek(0)
-            response = StreamingHttpResponse(
-                buffer,
-                content_type='text/csv'
+class ReportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Report generation jobs - Admin only"""
+    queryset = ReportJob.objects.all()
+    serializer_class = ReportJobSerializer
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    
+    def get_queryset(self):
+        queryset = ReportJob.objects.select_related('requested_by')
+        
+        job_status = self.request.query_params.get('status', None)
+        if job_status:
+            queryset = queryset.filter(status=job_status)
+        
+        return queryset
+    
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancel a queued or running job"""
+        job = self.get_object()
+        if not cancel_job(job):
+            return Response(
+                {"error": f"Cannot cancel a {job.status} job"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        job.refresh_from_db()
+        return Response(ReportJobSerializer(job).data)
+    
+    @action(detail=True, methods=['post'])
+    def retry(self, request, pk=None):
+        """Queue a failed or cancelled job again"""
+        job = self.get_object()
+        if not ReportJob.objects.filter(pk=job.pk, status__in=['failed', 'cancelled']).update(
+            status='queued', attempts=0, error='', progress=0, worker='',
+            run_after=timezone.now(), finished_at=None
+        ):
+            return Response(
+                {"error": f"Cannot retry a {job.status} job"},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
+        job.refresh_from_db()
+        return Response(ReportJobSerializer(job).data)
 
-        except ObjectDoesNotExist:
+
+class AnalyticsViewSet(viewsets.ViewSet):
+    """Portfolio analytics - Admin only"""
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    
+    @action(detail=False, methods=['get'])
+    def cohorts(self, request):
+        """
+        Repayment rate, arrears ratio and time to completion by institution,
+        field of study, graduation year and loan vintage.
+        
+        Served from the latest snapshot, flagged `stale` when older than a
+        day; POST cohorts/refresh queues a rebuild. ?dimension= keeps a single
+        breakdown.
+        """
+        dimension = request.query_params.get('dimension')
+        if dimension and dimension not in DIMENSIONS:
             return Response(
-                {"error": "Report not found"},
+                {"error": f"dimension must be one of: {', '.join(DIMENSIONS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        snapshot = latest_cohort_snapshot()
+        if snapshot is None:
+            return Response(
+                {"error": "No cohort analytics built yet; POST to cohorts/refresh to build them"},
                 status=status.HTTP_404_NOT_FOUND
-            )
\ No newline at end of file
+            )
+        
+        data = CohortSnapshotSerializer(snapshot).data
+        data['stale'] = is_stale(snapshot)
+        if dimension:
+            data['cohorts'] = {dimension: data['cohorts'].get(dimension, [])}
+        return Response(data)
+    
+    @action(detail=False, methods=['post'], url_path='cohorts/refresh')
+    def refresh_cohorts(self, request):
+        """Queue a rebuild of the cohorts over the whole portfolio; poll the returned job, then GET cohorts"""
+        job, cached = request_report('cohorts', request.user)
+        audit_report_request(request, job, cached)
+        return Response(ReportJobSerializer(job).data, status=status.HTTP_200_OK if cached else status.HTTP_202_ACCEPTED)
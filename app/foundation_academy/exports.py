@@ -0,0 +1,280 @@
+# foundation_academy/exports.py
+import csv
+import zipfile
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import islice
+from xml.sax.saxutils import escape
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+# Bytes gathered before a chunk is handed to the response
+CHUNK_SIZE = 64 * 1024
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'gzip': 'application/gzip',
+    'parquet': 'application/vnd.apache.parquet',
+}
+# Rows per Parquet row group; each group is written and sent as it fills
+PARQUET_ROW_GROUP_SIZE = 10000
+
+
+class Echo:
+    """File-like object whose write() just returns the line, for streaming csv.writer output"""
+    def write(self, value):
+        return value
+
+
+def csv_stream(header, rows):
+    """Yield CSV as UTF-8 byte chunks, starting with the header as soon as iteration begins"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header).encode()
+    chunk = []
+    size = 0
+    for row in rows:
+        line = writer.writerow(row).encode()
+        chunk.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield b''.join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield b''.join(chunk)
+
+
+def gzip_stream(chunks, level=6):
+    """Compress a byte stream on the fly into a .gz file"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+class _Drain:
+    """Write-only sink that zipfile (or pyarrow) writes into and the generator empties"""
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="xl/workbook.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+    '</Relationships>'
+)
+
+
+def _xlsx_cell(value):
+    if value is None or value == '':
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c><v>{value}</v></c>'
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    return f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return '<row>' + ''.join(_xlsx_cell(value) for value in values) + '</row>'
+
+
+def xlsx_stream(header, rows, sheet_name='Sheet1'):
+    """
+    Yield an .xlsx workbook with one sheet, row by row.
+
+    Cells use inline strings so no shared-string table has to be held in
+    memory, and the zip is written to an unseekable sink in deflated
+    chunks; memory stays flat whatever the row count.
+    """
+    sink = _Drain()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', XLSX_ROOT_RELS)
+        archive.writestr('xl/workbook.xml', XLSX_WORKBOOK.format(escape(sheet_name[:31])))
+        archive.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS)
+        yield sink.take()
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(header).encode())
+            size = 0
+            for row in rows:
+                line = _xlsx_row(row).encode()
+                sheet.write(line)
+                size += len(line)
+                if size >= CHUNK_SIZE:
+                    size = 0
+                    data = sink.take()
+                    if data:
+                        yield data
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.take()
+
+
+def parquet_schema(header, columns):
+    """
+    Arrow schema inferred from columns of Python values.
+
+    Decimals are widened so later rows fit, and empty columns are typed
+    as strings.
+    """
+    import pyarrow as pa
+
+    def column_type(field_type):
+        if pa.types.is_null(field_type):
+            return pa.string()
+        if pa.types.is_decimal(field_type):
+            return pa.decimal128(38, field_type.scale)
+        return field_type
+
+    return pa.schema([(name, column_type(pa.array(column).type)) for name, column in zip(header, columns)])
+
+
+def parquet_stream(header, rows, row_group_size=PARQUET_ROW_GROUP_SIZE):
+    """
+    Return a generator of a Parquet file, one row group at a time.
+
+    Column types are inferred from the first row group and later groups
+    are converted to them. pyarrow is optional: ImportError is raised
+    here, before any byte is produced, so the caller can still answer
+    with an error.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    def row_groups():
+        """Rows regrouped as columns, row_group_size rows at a time"""
+        remaining = iter(rows)
+        while True:
+            group = list(islice(remaining, row_group_size))
+            if not group:
+                return
+            yield [list(column) for column in zip(*group)]
+
+    def stream():
+        sink = _Drain()
+        writer = None
+        for columns in row_groups():
+            if writer is None:
+                schema = parquet_schema(header, columns)
+                writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema)
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema
+            ))
+            yield sink.take()
+        if writer is None:
+            writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), pa.schema([(name, pa.string()) for name in header]))
+        writer.close()
+        yield sink.take()
+
+    return stream()
+
+
+def download_response(stream, filename, content_type):
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def export_response(header, rows, filename, file_format='csv', compress=False):
+    """
+    Streamed download of rows as CSV (optionally gzipped), XLSX or Parquet.
+
+    filename is given without extension. Parquet needs pyarrow and raises
+    ImportError without it.
+    """
+    if file_format == 'parquet':
+        return download_response(parquet_stream(header, rows), f"{filename}.parquet", CONTENT_TYPES['parquet'])
+    if file_format == 'xlsx':
+        return download_response(
+            xlsx_stream(header, rows, sheet_name=filename), f"{filename}.xlsx", CONTENT_TYPES['xlsx']
+        )
+    if compress:
+        return download_response(
+            gzip_stream(csv_stream(header, rows)), f"{filename}.csv.gz", CONTENT_TYPES['gzip']
+        )
+    return download_response(csv_stream(header, rows), f"{filename}.csv", CONTENT_TYPES['csv'])
+
+
+class DownloadRenderer(BaseRenderer):
+    """
+    Lets ?format=csv|xlsx|parquet pass DRF content negotiation on download actions.
+
+    The action streams the file itself; only error responses (plain data)
+    reach render(), and those are sent as JSON.
+    """
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        return JSONRenderer().render(data, renderer_context=renderer_context)
+
+
+class CSVDownloadRenderer(DownloadRenderer):
+    media_type = CONTENT_TYPES['csv']
+    format = 'csv'
+
+
+class XLSXDownloadRenderer(DownloadRenderer):
+    media_type = CONTENT_TYPES['xlsx']
+    format = 'xlsx'
+
+
+class ParquetDownloadRenderer(DownloadRenderer):
+    media_type = CONTENT_TYPES['parquet']
+    format = 'parquet'
+
+
+DOWNLOAD_RENDERERS = [JSONRenderer, CSVDownloadRenderer, XLSXDownloadRenderer]
+# For exports that also offer ?format=parquet
+EXPORT_RENDERERS = DOWNLOAD_RENDERERS + [ParquetDownloadRenderer]
@@ -67,6 +67,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'administration.audit.AuditMiddleware',
 ]
 
 ROOT_URLCONF = 'foundation_academy.urls'
@@ -165,6 +166,12 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,  # Show 20 loans per page
+    # Clients send `Accept: application/json; version=2` for the paginated and
+    # queued responses; without it they get the version 1 shapes the
+    # committed bundle in dist/ was built against
+    'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.AcceptHeaderVersioning',
+    'DEFAULT_VERSION': '1',
+    'ALLOWED_VERSIONS': ('1', '2'),
 }
 
 
@@ -178,9 +185,30 @@ SIMPLE_JWT = {
 
 
 
+# Activity log entries are buffered per process and written in batches
+AUDIT_BUFFER_SIZE = 50
+AUDIT_FLUSH_INTERVAL = 5  # seconds
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Mounted volume that survives redeploys, unlike MEDIA_ROOT inside the container.
+# Railway sets RAILWAY_VOLUME_MOUNT_PATH once a volume is attached to the service.
+# Left unset, the commands that write there refuse to run.
+PERSISTENT_STORAGE_ROOT = os.environ.get('PERSISTENT_STORAGE_ROOT') or os.environ.get('RAILWAY_VOLUME_MOUNT_PATH')
+
+# Whole months of activity log older than this are moved out by archive_activity_logs
+ACTIVITY_LOG_RETENTION_MONTHS = 12
+ACTIVITY_LOG_ARCHIVE_DIR = (
+    os.path.join(PERSISTENT_STORAGE_ROOT, 'archives', 'activity_logs') if PERSISTENT_STORAGE_ROOT else None
+)
+
+# Parquet rows of generated reports, named by Report.file_path
+REPORT_FILES_DIR = os.path.join(PERSISTENT_STORAGE_ROOT, 'reports') if PERSISTENT_STORAGE_ROOT else None
+
+# Seconds between checks for laureate changes by the per-process autocomplete index
+LAUREATE_AUTOCOMPLETE_REFRESH = 5
+
 
 
 STATIC_URL = '/static/'
@@ -224,4 +252,12 @@ CORS_ALLOWED_ORIGINS = [
 
 ]
 
-AUTH_USER_MODEL = 'accounts.User'
\ No newline at end of file
+AUTH_USER_MODEL = 'accounts.User'
+
+# Shared across gunicorn workers so cache invalidation reaches every process
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+    }
+}
\ No newline at end of file
@@ -35,6 +35,7 @@ export const en = {
   basicLoanDetails: "Basic loan details and terms",
   laureate: "Laureate",
   selectLaureate: "Select a laureate",
+  searchLaureatePlaceholder: "Type a name, email or student ID",
   loadingLaureates: "Loading laureates...",
   noActiveLaureates: "No active laureates found",
   noActiveLaureatesError: "No active laureates available. Please ensure laureates are approved first.",
@@ -320,6 +321,8 @@ export const en = {
   paymentsRequireAttention: "Payments that require immediate attention",
   loadingOverduePayments: "Loading overdue payments...",
   noOverduePayments: "No overdue payments found",
+  exportCSV: "Export CSV",
+  loadMore: "Load more",
   paymentId: "Payment ID",
   laureate: "Laureate",
   amount: "Amount",
@@ -384,6 +387,12 @@ export const en = {
   overdueReport: "Overdue Report",
   generateOverdueReportDesc: "Generate report of all overdue payments",
   overdueReportInfo: "This report includes all payments that are currently overdue, with details about amounts, dates, and laureate information.",
+  agingReport: "Aging Report",
+  generateAgingReportDesc: "Unpaid amounts by days past due",
+  agingReportInfo: "Counts and amounts of unpaid payments in the current, 1-30, 31-60, 61-90 and 90+ days past due buckets, per institution and per loan status.",
+  generateAgingReport: "Generate Aging Report",
+  agingReportSuccess: "Aging report generated successfully!",
+  failedToGenerateAgingReport: "Failed to generate aging report. Please try again.",
   recentReports: "Recent Reports",
   previouslyGeneratedReports: "Previously generated reports",
   loadingReports: "Loading reports...",
@@ -406,12 +415,16 @@ export const en = {
   reportDownloadedSuccess: "Report downloaded successfully!",
   failedToGenerateFinancialReport: "Failed to generate financial report. Please try again.",
   failedToGenerateOverdueReport: "Failed to generate overdue report. Please try again.",
+  reportQueued: "Report queued...",
+  reportCancelled: "Report generation cancelled",
+  cancelReport: "Cancel report",
   failedToDownloadReport: "Failed to download report. Please try again.",
   reportTypeFinancial: "Financial",
   reportTypeLaureate: "Laureate",
   reportTypeLoan: "Loan",
   reportTypePayment: "Payment",
   reportTypeOverdue: "Overdue",
+  reportTypeAging: "Aging",
   by: "by",
 
 
@@ -885,6 +898,12 @@ export const fr = {
   overdueReport: "Rapport des paiements en retard",
   generateOverdueReportDesc: "Générer un rapport de tous les paiements en retard",
   overdueReportInfo: "Ce rapport inclut tous les paiements actuellement en retard, avec des détails sur les montants, les dates et les informations sur les lauréats.",
+  agingReport: "Rapport d'ancienneté des impayés",
+  generateAgingReportDesc: "Montants impayés par nombre de jours de retard",
+  agingReportInfo: "Nombre et montant des paiements impayés par tranche (à échoir, 1-30, 31-60, 61-90 et plus de 90 jours de retard), par établissement et par statut de prêt.",
+  generateAgingReport: "Générer le rapport d'ancienneté",
+  agingReportSuccess: "Rapport d'ancienneté généré avec succès !",
+  failedToGenerateAgingReport: "Échec de la génération du rapport d'ancienneté. Veuillez réessayer.",
   recentReports: "Rapports récents",
   previouslyGeneratedReports: "Rapports précédemment générés",
   loadingReports: "Chargement des rapports...",
@@ -907,12 +926,16 @@ export const fr = {
   reportDownloadedSuccess: "Rapport téléchargé avec succès !",
   failedToGenerateFinancialReport: "Échec de la génération du rapport financier. Veuillez réessayer.",
   failedToGenerateOverdueReport: "Échec de la génération du rapport des paiements en retard. Veuillez réessayer.",
+  reportQueued: "Rapport en file d'attente...",
+  reportCancelled: "Génération du rapport annulée",
+  cancelReport: "Annuler le rapport",
   failedToDownloadReport: "Échec du téléchargement du rapport. Veuillez réessayer.",
   reportTypeFinancial: "Financier",
   reportTypeLaureate: "Lauréat",
   reportTypeLoan: "Prêt",
   reportTypePayment: "Paiement",
   reportTypeOverdue: "En retard",
+  reportTypeAging: "Ancienneté",
   by: "par",
   paymentManagement: "Gestion des paiements",
   paymentManagementLoan: "Gestion des paiements - Prêt #{loanId}",
@@ -965,6 +988,8 @@ export const fr = {
   paymentsRequireAttention: "Paiements nécessitant une attention immédiate",
   loadingOverduePayments: "Chargement des paiements en retard...",
   noOverduePayments: "Aucun paiement en retard trouvé",
+  exportCSV: "Exporter en CSV",
+  loadMore: "Charger plus",
   paymentId: "Identifiant du paiement",
   laureate: "Lauréat",
   amount: "Montant",
@@ -1088,6 +1113,7 @@ export const fr = {
   basicLoanDetails: "Détails de base du prêt et conditions",
   laureate: "Lauréat",
   selectLaureate: "Sélectionner un lauréat",
+  searchLaureatePlaceholder: "Saisissez un nom, un e-mail ou un numéro d'étudiant",
   loadingLaureates: "Chargement des lauréats...",
   noActiveLaureates: "Aucun lauréat actif trouvé",
   noActiveLaureatesError: "Aucun lauréat actif disponible. Veuillez d'abord vous assurer que les lauréats sont approuvés.",
@@ -8,6 +8,8 @@ const baseApiUrl = window.location.origin;
 // Create the axios instance - Remove i18n stuff since we're not using it
 const api = axios.create({
   baseURL: baseApiUrl,
+  // API version 2: paginated lists and queued report generation
+  headers: { Accept: 'application/json; version=2' },
 });
 
 // Add request interceptor
@@ -42,8 +42,8 @@ function AdminDashboard() {
 
   const fetchRecentActivity = async () => {
     try {
-      const response = await api.get('/api/admin/dashboard/recent_activity/');
-      setRecentActivity(response.data.slice(0, 5));
+      const response = await api.get('/api/admin/dashboard/recent_activity/', { params: { page_size: 5 } });
+      setRecentActivity(response.data.results);
     } catch (error) {
       console.error('Error fetching recent activity:', error);
     } finally {
@@ -15,10 +15,11 @@ import { formatCurrency } from '@/utils/currency';
 function LoanCreateForm() {
   const navigate = useNavigate();
   const [loading, setLoading] = useState(false);
-  const [laureatesLoading, setLaureatesLoading] = useState(true);
+  const [laureatesLoading, setLaureatesLoading] = useState(false);
   const [error, setError] = useState('');
   const [success, setSuccess] = useState('');
   const [laureates, setLaureates] = useState([]);
+  const [laureateSearch, setLaureateSearch] = useState('');
   const [formData, setFormData] = useState({
     laureate_id: '',
     amount: '',
@@ -31,16 +32,28 @@ function LoanCreateForm() {
   });
 
   useEffect(() => {
-    fetchActivelaureates();
     const today = new Date().toISOString().split('T')[0];
     setFormData(prev => ({ ...prev, start_date: today }));
   }, []);
 
-  const fetchActivelaureates = async () => {
+  // Typeahead: ask the autocomplete index once typing pauses
+  useEffect(() => {
+    const timer = setTimeout(() => fetchActivelaureates(laureateSearch), 200);
+    return () => clearTimeout(timer);
+  }, [laureateSearch]);
+
+  const fetchActivelaureates = async (query) => {
+    if (!query.trim()) {
+      setLaureates([]);
+      setLaureatesLoading(false);
+      return;
+    }
+    setLaureatesLoading(true);
     try {
-      const response = await api.get('/api/laureates/laureates/?active=true');
-      console.log('Laureates response:', response.data);
-      const data = response.data?.results || response.data || [];
+      const response = await api.get('/api/laureates/laureates/autocomplete/', {
+        params: { q: query, active: true, limit: 20 }
+      });
+      const data = response.data || [];
       setLaureates(Array.isArray(data) ? data : []);
     } catch (error) {
       console.error('Error fetching laureates:', error);
@@ -206,6 +219,12 @@ function LoanCreateForm() {
             <CardContent className="space-y-4">
               <div className="space-y-2">
                 <Label htmlFor="laureate_id">{intl.formatMessage({ id: 'laureate' })} *</Label>
+                <Input
+                  id="laureate_search"
+                  value={laureateSearch}
+                  onChange={(e) => setLaureateSearch(e.target.value)}
+                  placeholder={intl.formatMessage({ id: 'searchLaureatePlaceholder' })}
+                />
                 <Select
                   value={formData.laureate_id}
                   onValueChange={(value) => {
@@ -235,7 +254,7 @@ function LoanCreateForm() {
                     {intl.formatMessage({ id: 'loadingLaureates' })}
                   </p>
                 )}
-                {!laureatesLoading && laureates.length === 0 && (
+                {!laureatesLoading && laureateSearch.trim() && laureates.length === 0 && (
                   <p className="text-xs text-red-500">
                     {intl.formatMessage({ id: 'noActiveLaureatesError' })}
                   </p>
@@ -9,7 +9,8 @@ import {
   Calendar,
   DollarSign,
   User,
-  RefreshCw
+  RefreshCw,
+  Download
 } from 'lucide-react';
 import { intl } from '@/i18n';
 import api from '@/login/api';
@@ -18,6 +19,10 @@ import { formatCurrency } from '@/utils/currency';
 
 function OverdueManagement() {
   const [overduePayments, setOverduePayments] = useState([]);
+  const [summary, setSummary] = useState({ count: 0, total_amount: 0, laureate_count: 0 });
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [exporting, setExporting] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [refreshing, setRefreshing] = useState(false);
@@ -40,6 +45,10 @@ function OverdueManagement() {
       const paymentsArray = Array.isArray(data) ? data : [];
       
       setOverduePayments(paymentsArray);
+      setNextPage(response.data?.next || null);
+      if (response.data?.summary) {
+        setSummary(response.data.summary);
+      }
       console.log('Set overdue payments:', paymentsArray);
       
     } catch (error) {
@@ -50,6 +59,44 @@ function OverdueManagement() {
     }
   };
 
+  const handleLoadMore = async () => {
+    if (!nextPage) return;
+    try {
+      setLoadingMore(true);
+      const response = await api.get(nextPage);
+      setOverduePayments(prev => [...prev, ...(response.data?.results || [])]);
+      setNextPage(response.data?.next || null);
+    } catch (error) {
+      console.error('Error loading more overdue payments:', error);
+      setError(intl.formatMessage({ id: 'failedToLoadOverduePayments' }) || 'Failed to load overdue payments');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const handleExport = async () => {
+    try {
+      setExporting(true);
+      const response = await api.get('/api/payments/payments/overdue/', {
+        params: { export: 'csv' },
+        responseType: 'blob',
+      });
+      const url = window.URL.createObjectURL(new Blob([response.data]));
+      const link = document.createElement('a');
+      link.href = url;
+      link.setAttribute('download', `overdue_payments_${new Date().toISOString().slice(0, 10)}.csv`);
+      document.body.appendChild(link);
+      link.click();
+      link.parentNode.removeChild(link);
+      window.URL.revokeObjectURL(url);
+    } catch (error) {
+      console.error('Error exporting overdue payments:', error);
+      setError(intl.formatMessage({ id: 'failedToLoadOverduePayments' }) || 'Failed to load overdue payments');
+    } finally {
+      setExporting(false);
+    }
+  };
+
   const handleRefresh = async () => {
     setRefreshing(true);
     await fetchOverduePayments();
@@ -168,10 +215,16 @@ Scholarship Administration Team`;
             </p>
           </div>
         </div>
-        <Button onClick={handleRefresh} disabled={refreshing} variant="outline">
-          <RefreshCw className={`h-4 w-4 mr-2 ${refreshing ? 'animate-spin' : ''}`} />
-          {intl.formatMessage({ id: 'refresh' }) || 'Refresh'}
-        </Button>
+        <div className="flex space-x-2">
+          <Button onClick={handleExport} disabled={exporting} variant="outline">
+            {exporting ? <Loader2 className="h-4 w-4 mr-2 animate-spin" /> : <Download className="h-4 w-4 mr-2" />}
+            {intl.formatMessage({ id: 'exportCSV' }) || 'Export CSV'}
+          </Button>
+          <Button onClick={handleRefresh} disabled={refreshing} variant="outline">
+            <RefreshCw className={`h-4 w-4 mr-2 ${refreshing ? 'animate-spin' : ''}`} />
+            {intl.formatMessage({ id: 'refresh' }) || 'Refresh'}
+          </Button>
+        </div>
       </div>
 
       {/* Error Alert */}
@@ -192,7 +245,7 @@ Scholarship Administration Team`;
                   <p className="text-sm font-medium text-muted-foreground">
                     {intl.formatMessage({ id: 'overduePayments' }) || 'Overdue Payments'}
                   </p>
-                  <p className="text-2xl font-bold text-red-600">{overduePayments.length}</p>
+                  <p className="text-2xl font-bold text-red-600">{summary.count}</p>
                 </div>
                 <AlertTriangle className="h-8 w-8 text-red-500" />
               </div>
@@ -206,7 +259,7 @@ Scholarship Administration Team`;
                     {intl.formatMessage({ id: 'totalOverdueAmount' }) || 'Total Amount'}
                   </p>
                   <p className="text-2xl font-bold text-red-600">
-{formatCurrency(overduePayments.reduce((sum, p) => sum + parseFloat(p.amount || 0), 0))}                  </p>
+{formatCurrency(summary.total_amount || 0)}                  </p>
                 </div>
                 <DollarSign className="h-8 w-8 text-red-500" />
               </div>
@@ -220,7 +273,7 @@ Scholarship Administration Team`;
                     {intl.formatMessage({ id: 'affectedLaureates' }) || 'Affected Laureates'}
                   </p>
                   <p className="text-2xl font-bold text-red-600">
-                    {new Set(overduePayments.map(p => p.laureate_name)).size}
+                    {summary.laureate_count}
                   </p>
                 </div>
                 <User className="h-8 w-8 text-red-500" />
@@ -235,7 +288,7 @@ Scholarship Administration Team`;
         <CardHeader>
           <CardTitle className="flex items-center">
             <AlertTriangle className="h-5 w-5 text-red-500 mr-2" />
-            {intl.formatMessage({ id: 'overduePayments' }) || 'Overdue Payments'} ({overduePayments.length})
+            {intl.formatMessage({ id: 'overduePayments' }) || 'Overdue Payments'} ({overduePayments.length}/{summary.count})
           </CardTitle>
           <CardDescription>
             {intl.formatMessage({ id: 'paymentsRequireAttention' }) || 'Payments that require immediate attention'}
@@ -346,6 +399,14 @@ Scholarship Administration Team`;
                   ))}
                 </tbody>
               </table>
+              {nextPage && (
+                <div className="p-4 text-center">
+                  <Button variant="outline" onClick={handleLoadMore} disabled={loadingMore}>
+                    {loadingMore && <Loader2 className="h-4 w-4 mr-2 animate-spin" />}
+                    {intl.formatMessage({ id: 'loadMore' }) || 'Load more'}
+                  </Button>
+                </div>
+              )}
             </div>
           )}
         </CardContent>
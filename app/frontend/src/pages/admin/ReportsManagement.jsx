@@ -18,6 +18,8 @@ import {
 import { intl } from '@/i18n'; // Import intl from the i18n module
 import api from '@/login/api';
 
+const JOB_POLL_INTERVAL = 1500;
+
 function ReportsManagement() {
   const [dateFrom, setDateFrom] = useState('');
   const [dateTo, setDateTo] = useState('');
@@ -25,6 +27,7 @@ function ReportsManagement() {
   const [reports, setReports] = useState([]);
   const [reportsLoading, setReportsLoading] = useState(true);
   const [message, setMessage] = useState('');
+  const [job, setJob] = useState(null);
 
   useEffect(() => {
     fetchReports();
@@ -46,6 +49,40 @@ function ReportsManagement() {
     }
   };
 
+  // Reports are built by a background worker; poll the job until it finishes
+  const waitForJob = async (queuedJob) => {
+    let current = queuedJob;
+    setJob(current);
+    while (current.status === 'queued' || current.status === 'running') {
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL));
+      const response = await api.get(`/api/admin/report-jobs/${current.id}/`);
+      current = response.data;
+      setJob(current);
+    }
+    setJob(null);
+    return current;
+  };
+
+  const cancelJob = async () => {
+    if (!job) return;
+    try {
+      await api.post(`/api/admin/report-jobs/${job.id}/cancel/`);
+    } catch (error) {
+      console.error('Error cancelling report job:', error);
+    }
+  };
+
+  const jobMessage = (finishedJob, successId, failureId) => {
+    if (finishedJob.status === 'completed') return intl.formatMessage({ id: successId });
+    if (finishedJob.status === 'cancelled') return intl.formatMessage({ id: 'reportCancelled' });
+    return intl.formatMessage({ id: failureId });
+  };
+
+  const generatingLabel = () => {
+    if (!job || job.status === 'queued') return intl.formatMessage({ id: job ? 'reportQueued' : 'generating' });
+    return `${intl.formatMessage({ id: 'generating' })} ${job.progress}%`;
+  };
+
   const generateFinancialReport = async () => {
     if (!dateFrom || !dateTo) {
       setMessage(intl.formatMessage({ id: 'selectDatesError' }));
@@ -58,12 +95,13 @@ function ReportsManagement() {
         date_from: dateFrom,
         date_to: dateTo
       });
-      setMessage(intl.formatMessage({ id: 'financialReportSuccess' }));
+      const finishedJob = await waitForJob(response.data);
+      setMessage(jobMessage(finishedJob, 'financialReportSuccess', 'failedToGenerateFinancialReport'));
       fetchReports(); // Refresh reports list
-      console.log('Financial report generated:', response.data);
     } catch (error) {
       console.error('Error generating financial report:', error);
       setMessage(intl.formatMessage({ id: 'failedToGenerateFinancialReport' }));
+      setJob(null);
     } finally {
       setLoading(false);
     }
@@ -74,12 +112,30 @@ function ReportsManagement() {
     setMessage('');
     try {
       const response = await api.post('/api/admin/reports/generate_overdue/');
-      setMessage(intl.formatMessage({ id: 'overdueReportSuccess' }));
+      const finishedJob = await waitForJob(response.data);
+      setMessage(jobMessage(finishedJob, 'overdueReportSuccess', 'failedToGenerateOverdueReport'));
       fetchReports(); // Refresh reports list
-      console.log('Overdue report generated:', response.data);
     } catch (error) {
       console.error('Error generating overdue report:', error);
       setMessage(intl.formatMessage({ id: 'failedToGenerateOverdueReport' }));
+      setJob(null);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const generateAgingReport = async () => {
+    setLoading(true);
+    setMessage('');
+    try {
+      const response = await api.post('/api/admin/reports/generate_aging/');
+      const finishedJob = await waitForJob(response.data);
+      setMessage(jobMessage(finishedJob, 'agingReportSuccess', 'failedToGenerateAgingReport'));
+      fetchReports(); // Refresh reports list
+    } catch (error) {
+      console.error('Error generating aging report:', error);
+      setMessage(intl.formatMessage({ id: 'failedToGenerateAgingReport' }));
+      setJob(null);
     } finally {
       setLoading(false);
     }
@@ -114,6 +170,7 @@ function ReportsManagement() {
       case 'loan': return BarChart3;
       case 'payment': return CheckCircle;
       case 'overdue': return AlertTriangle;
+      case 'aging': return Clock;
       default: return FileText;
     }
   };
@@ -124,7 +181,8 @@ function ReportsManagement() {
       laureate: 'secondary',
       loan: 'outline',
       payment: 'default',
-      overdue: 'destructive'
+      overdue: 'destructive',
+      aging: 'outline'
     };
     return variants[type] || 'secondary';
   };
@@ -188,8 +246,13 @@ function ReportsManagement() {
               disabled={loading}
             >
               <Download className="h-4 w-4 mr-2" />
-              {loading ? intl.formatMessage({ id: 'generating' }) : intl.formatMessage({ id: 'generateFinancialReport' })}
+              {loading ? generatingLabel() : intl.formatMessage({ id: 'generateFinancialReport' })}
             </Button>
+            {job?.report_type === 'financial' && (
+              <Button onClick={cancelJob} className="w-full" variant="outline">
+                {intl.formatMessage({ id: 'cancelReport' })}
+              </Button>
+            )}
           </CardContent>
         </Card>
         <Card>
@@ -211,8 +274,40 @@ function ReportsManagement() {
               variant="destructive"
             >
               <AlertTriangle className="h-4 w-4 mr-2" />
-              {loading ? intl.formatMessage({ id: 'generating' }) : intl.formatMessage({ id: 'generateOverdueReport' })}
+              {loading ? generatingLabel() : intl.formatMessage({ id: 'generateOverdueReport' })}
+            </Button>
+            {job?.report_type === 'overdue' && (
+              <Button onClick={cancelJob} className="w-full" variant="outline">
+                {intl.formatMessage({ id: 'cancelReport' })}
+              </Button>
+            )}
+          </CardContent>
+        </Card>
+        <Card>
+          <CardHeader>
+            <CardTitle className="flex items-center">
+              <Clock className="h-5 w-5 mr-2 text-orange-600" />
+              {intl.formatMessage({ id: 'agingReport' })}
+            </CardTitle>
+            <CardDescription>{intl.formatMessage({ id: 'generateAgingReportDesc' })}</CardDescription>
+          </CardHeader>
+          <CardContent className="space-y-4">
+            <div className="text-sm text-gray-600 bg-gray-50 p-3 rounded">
+              {intl.formatMessage({ id: 'agingReportInfo' })}
+            </div>
+            <Button
+              onClick={generateAgingReport}
+              className="w-full"
+              disabled={loading}
+            >
+              <Clock className="h-4 w-4 mr-2" />
+              {loading ? generatingLabel() : intl.formatMessage({ id: 'generateAgingReport' })}
             </Button>
+            {job?.report_type === 'aging' && (
+              <Button onClick={cancelJob} className="w-full" variant="outline">
+                {intl.formatMessage({ id: 'cancelReport' })}
+              </Button>
+            )}
           </CardContent>
         </Card>
       </div>
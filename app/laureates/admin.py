@@ -1,9 +1,27 @@
 # laureates/admin.py
+from django import forms
 from django.contrib import admin
 from .models import Laureate
+from .search import search_laureates
+from .student_ids import is_reserved
+
+
+class LaureateAdminForm(forms.ModelForm):
+    class Meta:
+        model = Laureate
+        fields = '__all__'
+    
+    def clean_student_id(self):
+        student_id = self.cleaned_data['student_id']
+        # Same rule as the API: a laureate keeps its generated ID, new hand-entered ones can't use the range
+        if is_reserved(student_id) and student_id != self.instance.student_id:
+            raise forms.ValidationError("Student ID is in the range reserved for generated IDs.")
+        return student_id
+
 
 @admin.register(Laureate)
 class LaureateAdmin(admin.ModelAdmin):
+    form = LaureateAdminForm
     list_display = ['student_id', 'user', 'institution', 'field_of_study', 'graduation_year', 'is_active']
     list_filter = ['is_active', 'graduation_year', 'institution']
     search_fields = ['student_id', 'user__first_name', 'user__last_name', 'user__email', 'institution']
@@ -25,3 +43,7 @@ class LaureateAdmin(admin.ModelAdmin):
     )
     
     readonly_fields = ['created_at', 'updated_at']
+    
+    def get_search_results(self, request, queryset, search_term):
+        # Same indexed search document as the API, also behind the loan admin's laureate autocomplete
+        return search_laureates(queryset, search_term), False
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class LaureatesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'laureates'
+
+    def ready(self):
+        # Keep the laureate search document in step with the linked user's names and email
+        from . import signals
+        signals.connect()
@@ -0,0 +1,176 @@
+# laureates/autocomplete.py
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from .models import Laureate
+
+AUTOCOMPLETE_LIMIT = 10
+MAX_AUTOCOMPLETE_LIMIT = 50
+# updated_at is stamped at save time, not at commit: refreshes re-read this far
+# back so a row committed after the refresh that skipped it is still picked up
+WATERMARK_MARGIN = timedelta(minutes=1)
+INDEXED_FIELDS = ['id', 'student_id', 'institution', 'is_active',
+                  'user__first_name', 'user__last_name', 'user__email']
+
+
+def index_keys(entry):
+    """Lower-cased strings a laureate can be found by the start of"""
+    first = entry['first_name'].strip().lower()
+    last = entry['last_name'].strip().lower()
+    keys = {first, last, f'{first} {last}', f'{last} {first}',
+            entry['email'].lower(), entry['student_id'].lower()}
+    keys.discard('')
+    return keys
+
+
+class LaureatePrefixIndex:
+    """
+    Per-process typeahead index over laureate names, emails and student IDs.
+
+    Keys are kept in a sorted list next to the laureate they belong to, so
+    a prefix lookup is a bisect plus a scan of the matches. Built on the
+    first lookup, which every concurrent lookup waits for; afterwards, at
+    most every `refresh_interval` seconds, only laureates whose updated_at
+    moved past the last refresh (less WATERMARK_MARGIN) are re-read, and a
+    row count that no longer matches the index (deletions, or rows
+    committed too late for the margin) triggers a rebuild. Lookups in
+    between never touch the database.
+    """
+
+    def __init__(self, refresh_interval):
+        self.refresh_interval = refresh_interval
+        self.lock = threading.Lock()
+        # Held while reading from the database, so only one thread refreshes at a time
+        self.refresh_lock = threading.Lock()
+        self.keys = []
+        self.ids = []
+        self.entries = {}
+        self.watermark = None
+        self.checked_at = None
+
+    def search(self, term, limit=AUTOCOMPLETE_LIMIT, active=None):
+        term = ' '.join(term.lower().split())
+        if not term:
+            return []
+        self.refresh()
+        results = []
+        seen = set()
+        with self.lock:
+            position = bisect_left(self.keys, term)
+            while position < len(self.keys) and self.keys[position].startswith(term):
+                laureate_id = self.ids[position]
+                position += 1
+                entry = self.entries[laureate_id]
+                if laureate_id in seen or (active is not None and entry['is_active'] != active):
+                    continue
+                seen.add(laureate_id)
+                results.append(entry)
+                if len(results) >= limit:
+                    break
+        return [self.serialize(entry) for entry in results]
+
+    def is_fresh(self):
+        return self.checked_at is not None and time.monotonic() - self.checked_at < self.refresh_interval
+
+    def refresh(self, force=False):
+        if not force and self.is_fresh():
+            return
+        # Until the first build, lookups wait for it; afterwards they keep
+        # serving the current index while another thread refreshes it
+        if not self.refresh_lock.acquire(blocking=force or self.watermark is None):
+            return
+        try:
+            if not force and self.is_fresh():
+                return
+            if self.watermark is None:
+                self.rebuild()
+            else:
+                self.update()
+            self.checked_at = time.monotonic()
+        finally:
+            self.refresh_lock.release()
+
+    def update(self):
+        """Apply the laureates changed since the last refresh, or rebuild if the row count disagrees (refresh_lock held)"""
+        # Rows read again within the margin are applied twice, which is harmless
+        started = timezone.now()
+        changed = list(
+            Laureate.objects.filter(updated_at__gte=self.watermark - WATERMARK_MARGIN).values(*INDEXED_FIELDS)
+        )
+        added = sum(1 for row in changed if row['id'] not in self.entries)
+        if Laureate.objects.count() != len(self.entries) + added:
+            self.rebuild()
+            return
+        with self.lock:
+            for row in changed:
+                self.put(self.entry(row))
+            self.watermark = started
+
+    def rebuild(self):
+        """Read every laureate into a new index (refresh_lock held)"""
+        started = timezone.now()
+        entries = {}
+        pairs = []
+        for row in Laureate.objects.values(*INDEXED_FIELDS).iterator(chunk_size=2000):
+            entry = self.entry(row)
+            entries[entry['id']] = entry
+            pairs.extend((key, entry['id']) for key in entry['keys'])
+        pairs.sort()
+        with self.lock:
+            self.entries = entries
+            self.keys = [key for key, _ in pairs]
+            self.ids = [laureate_id for _, laureate_id in pairs]
+            self.watermark = started
+
+    def put(self, entry):
+        """Replace the keys of one laureate (lock held)"""
+        previous = self.entries.get(entry['id'])
+        if previous is not None:
+            for key in previous['keys']:
+                position = self.position(key, entry['id'])
+                del self.keys[position]
+                del self.ids[position]
+        self.entries[entry['id']] = entry
+        for key in entry['keys']:
+            position = self.position(key, entry['id'])
+            self.keys.insert(position, key)
+            self.ids.insert(position, entry['id'])
+
+    def position(self, key, laureate_id):
+        """Index of (key, laureate_id) in the (key, id) order rebuild() produces"""
+        low = bisect_left(self.keys, key)
+        high = bisect_right(self.keys, key, low)
+        return bisect_left(self.ids, laureate_id, low, high)
+
+    @staticmethod
+    def entry(row):
+        entry = {
+            'id': row['id'],
+            'student_id': row['student_id'],
+            'first_name': row['user__first_name'],
+            'last_name': row['user__last_name'],
+            'email': row['user__email'],
+            'institution': row['institution'],
+            'is_active': row['is_active'],
+        }
+        entry['keys'] = index_keys(entry)
+        return entry
+
+    @staticmethod
+    def serialize(entry):
+        return {
+            'id': entry['id'],
+            'student_id': entry['student_id'],
+            'full_name': f"{entry['first_name']} {entry['last_name']}".strip(),
+            'email': entry['email'],
+            'institution': entry['institution'],
+            'is_active': entry['is_active'],
+        }
+
+
+laureate_index = LaureatePrefixIndex(
+    refresh_interval=getattr(settings, 'LAUREATE_AUTOCOMPLETE_REFRESH', 5),
+)
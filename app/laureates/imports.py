@@ -0,0 +1,194 @@
+# laureates/imports.py
+import csv
+import io
+from itertools import islice
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from accounts.models import User
+from administration.portfolio import record_created
+from .models import Laureate
+from .search import build_search_document
+from .student_ids import allocate_student_ids, is_reserved
+
+IMPORT_CHUNK_SIZE = 1000
+REQUIRED_COLUMNS = ['username', 'email', 'first_name', 'last_name']
+DEFAULT_PASSWORD = 'TempPassword123!'
+DEFAULT_GRADUATION_YEAR = 2025
+
+
+class LaureateImportError(ValueError):
+    pass
+
+
+def is_undecodable(value):
+    # Bytes that aren't UTF-8 come through surrogateescape as lone surrogates
+    return any('\udc80' <= char <= '\udcff' for char in value)
+
+
+def read_rows(stream):
+    """
+    Yield (line number, row) from a binary CSV upload, decoding incrementally.
+
+    Invalid UTF-8 doesn't stop the reader, since earlier chunks may
+    already be committed: the bytes are kept as surrogates and the row is
+    rejected by LaureateImport.clean.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='surrogateescape', newline='')
+    reader = csv.DictReader(text)
+    if not reader.fieldnames:
+        raise LaureateImportError("CSV file is empty")
+    if any(is_undecodable(name) for name in reader.fieldnames):
+        raise LaureateImportError("CSV header is not valid UTF-8")
+    missing = [column for column in REQUIRED_COLUMNS if column not in reader.fieldnames]
+    if missing:
+        raise LaureateImportError(f"Missing columns: {', '.join(missing)}")
+    for number, row in enumerate(reader, start=2):
+        yield number, {key: (value or '').strip() for key, value in row.items() if key}
+
+
+class LaureateImport:
+    """
+    Create laureate accounts from a CSV upload, a chunk of rows at a time.
+
+    Each chunk costs three lookups (emails, usernames, student IDs) and
+    two bulk INSERTs. Every imported account gets the same temporary
+    password, hashed once. Rows that can't be imported are reported with
+    their line number instead of failing the file.
+    """
+
+    def __init__(self, chunk_size=IMPORT_CHUNK_SIZE, password=DEFAULT_PASSWORD):
+        self.chunk_size = chunk_size
+        self.password_hash = make_password(password)
+        # Values already used earlier in the file
+        self.emails = set()
+        self.usernames = set()
+        self.student_ids = set()
+        self.created = []
+        self.errors = []
+
+    def run(self, stream):
+        rows = read_rows(stream)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self.import_chunk(chunk)
+        return {
+            'created_count': len(self.created),
+            'error_count': len(self.errors),
+            'total_processed': len(self.created) + len(self.errors),
+            'created_laureates': self.created,
+            'errors': self.errors,
+        }
+
+    def import_chunk(self, chunk):
+        valid = []
+        for number, row in chunk:
+            try:
+                valid.append((number, self.clean(row)))
+            except ValueError as e:
+                self.errors.append({'line': number, 'error': str(e)})
+
+        existing_emails = set(User.objects.filter(
+            email__in=[row['email'] for _, row in valid]
+        ).values_list('email', flat=True))
+        existing_usernames = set(User.objects.filter(
+            username__in=[row['username'] for _, row in valid]
+        ).values_list('username', flat=True))
+        existing_student_ids = set(Laureate.objects.filter(
+            student_id__in=[row['student_id'] for _, row in valid if row['student_id']]
+        ).values_list('student_id', flat=True))
+
+        accepted = []
+        for number, row in valid:
+            error = None
+            if row['email'] in existing_emails or row['email'] in self.emails:
+                error = "Email already exists"
+            elif row['username'] in existing_usernames or row['username'] in self.usernames:
+                error = "Username already exists"
+            elif row['student_id'] and (
+                row['student_id'] in existing_student_ids or row['student_id'] in self.student_ids
+            ):
+                error = "Student ID already exists"
+            if error:
+                self.errors.append({'line': number, 'error': error})
+                continue
+            self.emails.add(row['email'])
+            self.usernames.add(row['username'])
+            if row['student_id']:
+                self.student_ids.add(row['student_id'])
+            accepted.append((number, row))
+
+        # One block of IDs for the whole chunk
+        generated = iter(allocate_student_ids(sum(1 for _, row in accepted if not row['student_id'])))
+        for number, row in accepted:
+            row['student_id'] = row['student_id'] or next(generated)
+
+        try:
+            with transaction.atomic():
+                self.insert(accepted)
+        except IntegrityError:
+            # Another writer took one of the values since the lookups; find out which rows row by row
+            for number, row in accepted:
+                try:
+                    with transaction.atomic():
+                        self.insert([(number, row)])
+                except IntegrityError:
+                    self.errors.append({'line': number, 'error': "Email, username or student ID already exists"})
+
+    def clean(self, row):
+        if any(is_undecodable(value) for value in row.values()):
+            raise ValueError("Line is not valid UTF-8")
+        missing = [column for column in REQUIRED_COLUMNS if not row.get(column)]
+        if missing:
+            raise ValueError(f"Missing {', '.join(missing)}")
+        if is_reserved(row.get('student_id', '')):
+            raise ValueError("Student ID is in the range reserved for generated IDs")
+        graduation_year = row.get('graduation_year') or DEFAULT_GRADUATION_YEAR
+        try:
+            graduation_year = int(graduation_year)
+        except ValueError:
+            raise ValueError(f"Invalid graduation year: {graduation_year!r}")
+        return {
+            'username': User.normalize_username(row['username']),
+            'email': User.objects.normalize_email(row['email']),
+            'first_name': row['first_name'],
+            'last_name': row['last_name'],
+            'student_id': row.get('student_id', ''),
+            'institution': row.get('institution', ''),
+            'field_of_study': row.get('field_of_study', ''),
+            'graduation_year': graduation_year,
+        }
+
+    def insert(self, rows):
+        if not rows:
+            return
+        users = User.objects.bulk_create([
+            User(
+                username=row['username'],
+                email=row['email'],
+                first_name=row['first_name'],
+                last_name=row['last_name'],
+                password=self.password_hash,
+            )
+            for _, row in rows
+        ])
+        laureates = Laureate.objects.bulk_create([
+            Laureate(
+                user=user,
+                student_id=row['student_id'],
+                institution=row['institution'],
+                field_of_study=row['field_of_study'],
+                graduation_year=row['graduation_year'],
+                is_active=True,
+                # bulk_create bypasses save(), which fills it otherwise
+                search_document=build_search_document(user, row['student_id'], row['institution']),
+            )
+            for user, (_, row) in zip(users, rows)
+        ])
+        # bulk_create skips the signals that keep the dashboard tallies
+        record_created(laureates)
+        self.created.extend(
+            {'name': user.get_full_name(), 'student_id': laureate.student_id, 'email': user.email}
+            for user, laureate in zip(users, laureates)
+        )
@@ -0,0 +1,33 @@
+# laureates/management/commands/import_laureates.py
+import csv
+from django.core.management.base import BaseCommand, CommandError
+from laureates.imports import IMPORT_CHUNK_SIZE, LaureateImport, LaureateImportError
+
+
+class Command(BaseCommand):
+    help = "Create laureate accounts from a CSV file (same columns as the bulk upload), for cohorts too large for a request"
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help="Path to the laureates CSV")
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE,
+                            help=f"Rows looked up and inserted together (default {IMPORT_CHUNK_SIZE})")
+        parser.add_argument('--errors', help="Write the rejected lines to this CSV file")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['csv_file'], 'rb') as stream:
+                result = LaureateImport(chunk_size=options['chunk_size']).run(stream)
+        except OSError as e:
+            raise CommandError(f"Cannot read CSV file: {e}")
+        except LaureateImportError as e:
+            raise CommandError(str(e))
+
+        if options['errors']:
+            with open(options['errors'], 'w', newline='') as output:
+                writer = csv.DictWriter(output, fieldnames=['line', 'error'])
+                writer.writeheader()
+                writer.writerows(result['errors'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created_count']} laureates created, {result['error_count']} lines rejected"
+        ))
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laureates', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='laureate',
+            index=models.Index(fields=['is_active', '-created_at'], name='laureate_active_created_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:38
+
+import re
+from django.db import migrations, models
+
+SEQUENCE_NAME = 'laureate_student_id_seq'
+FIRST_NUMBER = 1000000
+
+
+def create_allocator(apps, schema_editor):
+    """Start generated IDs above every LAU<number> ID already issued"""
+    Laureate = apps.get_model('laureates', 'Laureate')
+    StudentIdCounter = apps.get_model('laureates', 'StudentIdCounter')
+    start = FIRST_NUMBER
+    issued = Laureate.objects.filter(student_id__startswith='LAU').values_list('student_id', flat=True)
+    for student_id in issued.iterator():
+        match = re.fullmatch(r'LAU(\d+)', student_id)
+        if match:
+            start = max(start, int(match[1]) + 1)
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'CREATE SEQUENCE IF NOT EXISTS "{SEQUENCE_NAME}" START WITH {start}')
+    else:
+        StudentIdCounter.objects.create(name=SEQUENCE_NAME, next_value=start)
+
+
+def drop_allocator(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP SEQUENCE IF EXISTS "{SEQUENCE_NAME}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laureates', '0002_laureate_access_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentIdCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('next_value', models.BigIntegerField()),
+            ],
+        ),
+        migrations.RunPython(create_allocator, drop_allocator),
+    ]
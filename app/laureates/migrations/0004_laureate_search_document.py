@@ -0,0 +1,69 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:40
+
+from django.db import migrations, models
+
+BACKFILL_CHUNK_SIZE = 1000
+SEARCH_CONFIG = 'simple'
+TRIGRAM_INDEX = 'laureate_search_trgm_idx'
+TEXT_INDEX = 'laureate_search_text_idx'
+
+
+def fill_search_documents(apps, schema_editor):
+    Laureate = apps.get_model('laureates', 'Laureate')
+    laureates = Laureate.objects.select_related('user').order_by('pk')
+    chunk = []
+    for laureate in laureates.iterator(chunk_size=BACKFILL_CHUNK_SIZE):
+        user = laureate.user
+        parts = [user.first_name, user.last_name, user.email, laureate.student_id, laureate.institution]
+        laureate.search_document = ' '.join(part.strip().lower() for part in parts if part and part.strip())
+        chunk.append(laureate)
+        if len(chunk) >= BACKFILL_CHUNK_SIZE:
+            Laureate.objects.bulk_update(chunk, ['search_document'])
+            chunk = []
+    if chunk:
+        Laureate.objects.bulk_update(chunk, ['search_document'])
+
+
+def search_indexes():
+    # Built from the expressions laureates.search queries with, so the planner matches them
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+    return [
+        GinIndex(fields=['search_document'], opclasses=['gin_trgm_ops'], name=TRIGRAM_INDEX),
+        GinIndex(SearchVector('search_document', config=SEARCH_CONFIG), name=TEXT_INDEX),
+    ]
+
+
+def create_search_indexes(apps, schema_editor):
+    """PostgreSQL only: trigram index for substring matches, GIN over the tsvector for word matches"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Laureate = apps.get_model('laureates', 'Laureate')
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index in search_indexes():
+        schema_editor.add_index(Laureate, index)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Laureate = apps.get_model('laureates', 'Laureate')
+    for index in search_indexes():
+        schema_editor.remove_index(Laureate, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laureates', '0003_student_id_allocator'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='laureate',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
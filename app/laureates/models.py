@@ -1,8 +1,9 @@
 # laureates/models.py
 from django.db import models
 from accounts.models import User
+from administration.portfolio import LoadedStateMixin
 
-class Laureate(models.Model):
+class Laureate(LoadedStateMixin, models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='laureate_profile')
     student_id = models.CharField(max_length=50, unique=True)
     institution = models.CharField(max_length=200, blank=True)
@@ -12,6 +13,8 @@ class Laureate(models.Model):
     emergency_contact_name = models.CharField(max_length=100, blank=True)
     emergency_contact_phone = models.CharField(max_length=20, blank=True)
     is_active = models.BooleanField(default=True)
+    # Maintained on save and when the user's names or email change; see laureates.search
+    search_document = models.TextField(blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -19,10 +22,31 @@ class Laureate(models.Model):
         # Ensure the linked user is not a superuser
         if self.user.is_superuser:
             raise ValueError("Superusers cannot have laureate profiles")
+        self.search_document = self.build_search_document()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'search_document'}
         super().save(*args, **kwargs)
     
+    def build_search_document(self):
+        from .search import build_search_document
+        return build_search_document(self.user, self.student_id, self.institution)
+    
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.student_id}"
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Management list: ?active= filter with the default newest-first ordering
+            models.Index(fields=['is_active', '-created_at'], name='laureate_active_created_idx'),
+        ]
+
+
+class StudentIdCounter(models.Model):
+    """Next generated student ID number, on databases without sequences (see laureates.student_ids)"""
+    name = models.CharField(max_length=50, unique=True)
+    next_value = models.BigIntegerField()
+    
+    def __str__(self):
+        return f"{self.name}: {self.next_value}"
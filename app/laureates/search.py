@@ -0,0 +1,51 @@
+# laureates/search.py
+from django.db import connection
+from django.db.models import Case, When, Value, IntegerField, FloatField, Q
+from django.db.models.functions import Cast
+
+SEARCH_CONFIG = 'simple'
+
+
+def build_search_document(user, student_id, institution):
+    """Lower-cased names, email, student ID and institution of a laureate, matched by search_laureates"""
+    parts = [user.first_name, user.last_name, user.email, student_id, institution]
+    return ' '.join(part.strip().lower() for part in parts if part and part.strip())
+
+
+def search_laureates(queryset, term, prefix=''):
+    """
+    Filter and rank queryset (laureates, or rows reached through
+    `prefix`, e.g. 'laureate__') by a search term.
+
+    Every word must appear in the search document. On PostgreSQL the
+    trigram and full-text GIN indexes serve the match and results are
+    ranked by exact ID/email hits, then text rank plus trigram
+    similarity; elsewhere the same LIKE filter runs without the indexes.
+    """
+    term = ' '.join(term.lower().split())
+    if not term:
+        return queryset
+    field = f'{prefix}search_document'
+    words = Q()
+    for word in term.split(' '):
+        words &= Q(**{f'{field}__contains': word})
+
+    exact = Case(
+        When(Q(**{f'{prefix}student_id__iexact': term}) | Q(**{f'{prefix}user__email__iexact': term}), then=Value(2)),
+        When(**{f'{field}__startswith': term}, then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    # Ties keep the queryset's own order
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+    if connection.vendor != 'postgresql':
+        return queryset.filter(words).annotate(search_exact=exact).order_by('-search_exact', *ordering)
+
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+    vector = SearchVector(field, config=SEARCH_CONFIG)
+    query = SearchQuery(term, config=SEARCH_CONFIG)
+    return queryset.annotate(
+        search_vector=vector,
+        search_exact=exact,
+        search_rank=Cast(SearchRank(vector, query), FloatField()) + TrigramSimilarity(field, term),
+    ).filter(Q(search_vector=query) | words).order_by('-search_exact', '-search_rank', *ordering)
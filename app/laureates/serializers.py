@@ -2,6 +2,7 @@
 from rest_framework import serializers
 from accounts.serializers import UserSerializer, UserUpdateSerializer
 from .models import Laureate
+from .student_ids import is_reserved
 
 class LaureateSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
@@ -17,6 +18,12 @@ class LaureateSerializer(serializers.ModelSerializer):
                  'is_active', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
     
+    def validate_student_id(self, value):
+        # A laureate keeps the generated ID it was given; only new hand-entered ones are refused
+        if is_reserved(value) and (self.instance is None or value != self.instance.student_id):
+            raise serializers.ValidationError("Student ID is in the range reserved for generated IDs.")
+        return value
+    
     def update(self, instance, validated_data):
         user_data = validated_data.pop('user_data', {})
         
@@ -0,0 +1,29 @@
+# laureates/signals.py
+from django.db.models.signals import post_save
+from django.utils import timezone
+from accounts.models import User
+from .models import Laureate
+from .search import build_search_document
+
+# User fields that go into a laureate's search document
+DOCUMENT_FIELDS = {'first_name', 'last_name', 'email'}
+
+
+def refresh_search_document(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Names and email live on the user; keep the laureate's search document in step
+    if created or raw:
+        return
+    # e.g. last_login on every sign-in: nothing to look up
+    if update_fields is not None and not DOCUMENT_FIELDS.intersection(update_fields):
+        return
+    laureate = Laureate.objects.filter(user=instance).only('student_id', 'institution', 'search_document').first()
+    if laureate is None:
+        return
+    document = build_search_document(instance, laureate.student_id, laureate.institution)
+    if document != laureate.search_document:
+        # updated_at moves too, so the autocomplete index picks the new names up
+        Laureate.objects.filter(pk=laureate.pk).update(search_document=document, updated_at=timezone.now())
+
+
+def connect():
+    post_save.connect(refresh_search_document, sender=User, dispatch_uid='laureate_search_document_user')
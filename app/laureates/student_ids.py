@@ -0,0 +1,62 @@
+# laureates/student_ids.py
+import re
+from django.db import connection, transaction
+from django.db.models import F
+from .models import Laureate, StudentIdCounter
+
+PREFIX = 'LAU'
+# Generated numbers start above the 6-digit IDs issued before the allocator existed
+FIRST_NUMBER = 1000000
+SEQUENCE_NAME = 'laureate_student_id_seq'
+GENERATED_ID = re.compile(rf'^{PREFIX}(\d+)$')
+
+
+def format_student_id(number):
+    return f"{PREFIX}{number}"
+
+
+def is_reserved(student_id):
+    """Whether a hand-entered ID falls in the generated range, where it could collide later"""
+    match = GENERATED_ID.match(student_id)
+    return bool(match) and int(match[1]) >= FIRST_NUMBER
+
+
+def first_free_number():
+    """Number after every generated-looking ID already issued, to (re)start the counter from"""
+    start = FIRST_NUMBER
+    issued = Laureate.objects.filter(student_id__startswith=PREFIX).values_list('student_id', flat=True)
+    for student_id in issued.iterator():
+        match = GENERATED_ID.match(student_id)
+        if match:
+            start = max(start, int(match[1]) + 1)
+    return start
+
+
+def allocate_student_ids(count):
+    """
+    Reserve count new student IDs.
+
+    Backed by a PostgreSQL sequence, or a counter row elsewhere: one
+    statement whatever the block size, and never an ID handed out twice.
+    """
+    if count <= 0:
+        return []
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)", [SEQUENCE_NAME, count]
+            )
+            numbers = [row[0] for row in cursor.fetchall()]
+    else:
+        with transaction.atomic():
+            # The UPDATE locks the row until commit, so blocks never overlap
+            counter = StudentIdCounter.objects.filter(name=SEQUENCE_NAME)
+            if not counter.update(next_value=F('next_value') + count):
+                StudentIdCounter.objects.create(name=SEQUENCE_NAME, next_value=first_free_number() + count)
+            end = counter.values_list('next_value', flat=True).get()
+            numbers = range(end - count, end)
+    return [format_student_id(number) for number in numbers]
+
+
+def allocate_student_id():
+    return allocate_student_ids(1)[0]
@@ -1,3 +1,93 @@
+import io
 from django.test import TestCase
+from accounts.models import User
+from .imports import LaureateImport, LaureateImportError, read_rows
+from .models import Laureate
 
-# Create your tests here.
+HEADER = b'username,email,first_name,last_name,student_id,graduation_year\n'
+
+
+def upload(*lines, header=HEADER):
+    return io.BytesIO(header + b''.join(line + b'\n' for line in lines))
+
+
+class LaureateImportTests(TestCase):
+    """Rows that can't be imported are reported by line number; the rest of the file still goes in"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='taken', email='taken@example.com', password='pw')
+        Laureate.objects.create(user=user, student_id='S00001', graduation_year=2020)
+
+    def run_import(self, stream, chunk_size=2):
+        return LaureateImport(chunk_size=chunk_size).run(stream)
+
+    def test_valid_rows(self):
+        result = self.run_import(upload(
+            b'ada,ada@example.com,Ada,Lovelace,S10001,2021',
+            b'alan,alan@example.com,Alan,Turing,,',
+            b'grace,grace@example.com,Grace,Hopper,,2019',
+        ))
+        self.assertEqual((result['created_count'], result['error_count'], result['total_processed']), (3, 0, 3))
+        self.assertEqual(result['errors'], [])
+        self.assertEqual(Laureate.objects.get(user__username='ada').student_id, 'S10001')
+        self.assertEqual(Laureate.objects.get(user__username='alan').graduation_year, 2025)
+        # Blank student IDs are generated
+        self.assertTrue(Laureate.objects.get(user__username='grace').student_id.startswith('LAU'))
+        self.assertTrue(User.objects.get(username='ada').check_password('TempPassword123!'))
+
+    def test_error_report(self):
+        result = self.run_import(upload(
+            b'ada,ada@example.com,Ada,Lovelace,,2021',
+            b'bob,,Bob,Smith,,2021',
+            b'carol,carol@example.com,Carol,Jones,,soon',
+            b'dave,dave@example.com,Dave,Brown,LAU1000005,2021',
+            b'eve,eve@example.com,Ev\xe9,Adams,,2021',
+            b'taken,frank@example.com,Frank,Miller,,2021',
+            b'gina,taken@example.com,Gina,Lopez,,2021',
+            b'hank,hank@example.com,Hank,Hill,S00001,2021',
+        ))
+        self.assertEqual(result['created_count'], 1)
+        self.assertEqual(result['error_count'], 7)
+        self.assertEqual(result['total_processed'], 8)
+        self.assertEqual(result['errors'], [
+            {'line': 3, 'error': "Missing email"},
+            {'line': 4, 'error': "Invalid graduation year: 'soon'"},
+            {'line': 5, 'error': "Student ID is in the range reserved for generated IDs"},
+            {'line': 6, 'error': "Line is not valid UTF-8"},
+            {'line': 7, 'error': "Username already exists"},
+            {'line': 8, 'error': "Email already exists"},
+            {'line': 9, 'error': "Student ID already exists"},
+        ])
+        self.assertFalse(User.objects.filter(username__in=['bob', 'carol', 'dave', 'eve', 'frank', 'gina', 'hank']).exists())
+
+    def test_duplicates_within_file(self):
+        # The repeats land in a later chunk than the rows they repeat
+        result = self.run_import(upload(
+            b'ada,ada@example.com,Ada,Lovelace,S10001,2021',
+            b'alan,alan@example.com,Alan,Turing,,2021',
+            b'ada2,ada@example.com,Ada,Byron,,2021',
+            b'alan,alan2@example.com,Alan,Kay,,2021',
+            b'bea,bea@example.com,Bea,Smith,S10001,2021',
+        ))
+        self.assertEqual(result['created_count'], 2)
+        self.assertEqual(result['errors'], [
+            {'line': 4, 'error': "Email already exists"},
+            {'line': 5, 'error': "Username already exists"},
+            {'line': 6, 'error': "Student ID already exists"},
+        ])
+
+    def test_header_errors(self):
+        for stream, message in [
+            (io.BytesIO(b''), "CSV file is empty"),
+            (upload(header=b'username,email,first_nam\xe9,last_name\n'), "CSV header is not valid UTF-8"),
+            (upload(header=b'username,email\n'), "Missing columns: first_name, last_name"),
+        ]:
+            with self.subTest(message=message):
+                with self.assertRaisesMessage(LaureateImportError, message):
+                    list(read_rows(stream))
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_byte_order_mark(self):
+        result = self.run_import(upload(b'ada,ada@example.com,Ada,Lovelace,,2021', header=b'\xef\xbb\xbf' + HEADER))
+        self.assertEqual(result['created_count'], 1)
@@ -1,35 +1,59 @@
 # Add these imports at the top
+from decimal import Decimal
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
 from django.db import transaction  # Add this import
+from django.db.models import Count, DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from accounts.permissions import IsAdminUser, IsLaureateUser
 from accounts.models import User  # Add this import
 from .models import Laureate
 from .serializers import LaureateSerializer, LaureateBasicSerializer
+from .imports import LaureateImport, LaureateImportError
+from .student_ids import allocate_student_id, is_reserved
+from .search import search_laureates
+from .autocomplete import laureate_index, AUTOCOMPLETE_LIMIT, MAX_AUTOCOMPLETE_LIMIT
+from administration.audit import audit_request
+from foundation_academy.exports import EXPORT_RENDERERS, export_response
+from payments.models import Payment
 
+EXPORT_FORMATS = ['csv', 'xlsx', 'parquet']
+CENT = Decimal('0.01')
+LAUREATE_EXPORT_HEADER = ['Laureate ID', 'Student ID', 'First Name', 'Last Name', 'Email', 'Phone',
+                          'Institution', 'Field of Study', 'Graduation Year', 'Active',
+                          'Loan Count', 'Total Borrowed', 'Total Repaid', 'Arrears']
 
-import random
-from django.utils import timezone
 
-def generate_unique_student_id(prefix="LAU"):
-    """Generate a unique student ID"""
-    max_attempts = 100
-    for _ in range(max_attempts):
-        # Generate 6-digit number
-        number = random.randint(100000, 999999)
-        student_id = f"{prefix}{number}"
-        
-        # Check if it already exists
-        if not Laureate.objects.filter(student_id=student_id).exists():
-            return student_id
-    
-    # Fallback: use timestamp if we can't generate unique ID
-    timestamp = int(timezone.now().timestamp())
-    return f"{prefix}{str(timestamp)[-6:]}"
+def money_total(expression):
+    return Coalesce(expression, Value(Decimal('0.00')), output_field=DecimalField(max_digits=14, decimal_places=2))
+
+
+def laureate_export_rows(queryset, chunk_size=2000):
+    """
+    Yield laureates with their loan totals as export rows.
 
+    One query: loan count and amounts come from the join on loans (one row
+    each, so no fan-out), arrears from a correlated sum of payments in arrears.
+    """
+    arrears = Payment.objects.in_arrears().filter(loan__laureate=OuterRef('pk')).order_by().values(
+        'loan__laureate'
+    ).annotate(total=Sum('amount')).values('total')
+    rows = queryset.order_by('pk').annotate(
+        loan_count=Count('loans'),
+        total_borrowed=money_total(Sum('loans__amount')),
+        total_repaid=money_total(Sum('loans__total_paid')),
+        arrears=money_total(Subquery(arrears)),
+    ).values_list(
+        'id', 'student_id', 'user__first_name', 'user__last_name', 'user__email', 'user__phone',
+        'institution', 'field_of_study', 'graduation_year', 'is_active',
+        'loan_count', 'total_borrowed', 'total_repaid', 'arrears'
+    )
+    for row in rows.iterator(chunk_size=chunk_size):
+        # Some backends drop the scale of aggregated decimals; keep cents so Parquet column types hold
+        yield row[:-3] + tuple(amount.quantize(CENT) for amount in row[-3:])
 
 
 class LaureateViewSet(viewsets.ModelViewSet):
@@ -42,13 +66,7 @@ class LaureateViewSet(viewsets.ModelViewSet):
         # Search functionality
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(user__first_name__icontains=search) |
-                Q(user__last_name__icontains=search) |
-                Q(student_id__icontains=search) |
-                Q(institution__icontains=search) |
-                Q(user__email__icontains=search)
-            )
+            queryset = search_laureates(queryset, search)
         
         # Filter by active status
         is_active = self.request.query_params.get('active', None)
@@ -93,15 +111,8 @@ class LaureateViewSet(viewsets.ModelViewSet):
         laureate.save()
         
         # Log the approval activity
-        from administration.models import ActivityLog
-        ActivityLog.objects.create(
-            user=request.user,
-            action='approve',
-            model_name='Laureate',
-            object_id=laureate.id,
-            description=f"Approved application for {laureate.user.get_full_name()}",
-            ip_address=request.META.get('REMOTE_ADDR')
-        )
+        audit_request(request, 'approve', 'Laureate', laureate.id,
+                      f"Approved application for {laureate.user.get_full_name()}")
         
         return Response({"message": "Application approved successfully"})
     
@@ -121,18 +132,44 @@ class LaureateViewSet(viewsets.ModelViewSet):
         user.save()
         
         # Log the rejection activity
-        from administration.models import ActivityLog
-        ActivityLog.objects.create(
-            user=request.user,
-            action='reject',
-            model_name='Laureate',
-            object_id=laureate.id,
-            description=f"Rejected application for {laureate.user.get_full_name()}",
-            ip_address=request.META.get('REMOTE_ADDR')
-        )
+        audit_request(request, 'reject', 'Laureate', laureate.id,
+                      f"Rejected application for {laureate.user.get_full_name()}")
         
         return Response({"message": "Application rejected successfully"})
     
+    @action(detail=False, methods=['get'], renderer_classes=EXPORT_RENDERERS)
+    def export(self, request):
+        """Stream every laureate (honouring ?search and ?active) with loan totals as ?format=csv|xlsx|parquet"""
+        file_format = request.query_params.get('format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"Unsupported format: {file_format}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        filename = f"laureates_{timezone.now().strftime('%Y%m%d_%H%M%S')}"
+        try:
+            return export_response(
+                LAUREATE_EXPORT_HEADER, laureate_export_rows(self.get_queryset()), filename, file_format=file_format
+            )
+        except ImportError:
+            return Response(
+                {"error": "Parquet export is not available on this server"},
+                status=status.HTTP_406_NOT_ACCEPTABLE
+            )
+    
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """Typeahead lookup by the start of a name, email or student ID, served from memory"""
+        try:
+            limit = min(int(request.query_params.get('limit', AUTOCOMPLETE_LIMIT)), MAX_AUTOCOMPLETE_LIMIT)
+        except ValueError:
+            return Response({"error": "limit must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+        active = request.query_params.get('active', None)
+        if active is not None:
+            active = active.lower() == 'true'
+        results = laureate_index.search(request.query_params.get('q', ''), max(limit, 1), active)
+        return Response(results)
+    
     @action(detail=False, methods=['get', 'put'])
     def my_profile(self, request):
         """Laureate can get/update their own profile"""
@@ -171,15 +208,8 @@ class LaureateViewSet(viewsets.ModelViewSet):
         status_text = "activated" if laureate.is_active else "deactivated"
         
         # Log the status change
-        from administration.models import ActivityLog
-        ActivityLog.objects.create(
-            user=request.user,
-            action='status_change',
-            model_name='Laureate',
-            object_id=laureate.id,
-            description=f"{status_text.title()} laureate {laureate.user.get_full_name()}",
-            ip_address=request.META.get('REMOTE_ADDR')
-        )
+        audit_request(request, 'status_change', 'Laureate', laureate.id,
+                      f"{status_text.title()} laureate {laureate.user.get_full_name()}")
         
         return Response({"message": f"Laureate {status_text} successfully"})
     
@@ -192,8 +222,10 @@ class LaureateViewSet(viewsets.ModelViewSet):
             with transaction.atomic():
                 # Auto-generate student_id if not provided
                 student_id = data.get('student_id', '').strip()
+                if is_reserved(student_id):
+                    return Response({'error': 'Student ID is in the range reserved for generated IDs'}, status=400)
                 if not student_id:
-                    student_id = generate_unique_student_id()
+                    student_id = allocate_student_id()
                 
                 # Check for existing users
                 if User.objects.filter(email=data['email']).exists():
@@ -230,66 +262,14 @@ class LaureateViewSet(viewsets.ModelViewSet):
         except Exception as e:
             return Response({'error': str(e)}, status=400)
 
-    # Also update your bulk_create_laureates method:
     @action(detail=False, methods=['post'], url_path='bulk_create')
     def bulk_create_laureates(self, request):
-        """Bulk create from CSV"""
+        """Bulk create from CSV, streamed in chunks; rows that fail are listed in `errors`"""
         if 'csv_file' not in request.FILES:
             return Response({'error': 'No CSV file'}, status=400)
         
-        import csv, io
-        csv_file = request.FILES['csv_file']
-        decoded_file = csv_file.read().decode('utf-8')
-        csv_data = csv.DictReader(io.StringIO(decoded_file))
-        
-        created_count = 0
-        error_count = 0
-        created_laureates = []
-        
-        for row in csv_data:
-            try:
-                with transaction.atomic():
-                    # Auto-generate student_id if not provided
-                    student_id = row.get('student_id', '').strip()
-                    if not student_id:
-                        student_id = generate_unique_student_id()
-                    
-                    # Skip if user/student already exists
-                    if (User.objects.filter(email=row['email']).exists() or 
-                        User.objects.filter(username=row['username']).exists() or
-                        Laureate.objects.filter(student_id=student_id).exists()):
-                        error_count += 1
-                        continue
-                    
-                    user = User.objects.create_user(
-                        username=row['username'],
-                        email=row['email'],
-                        first_name=row['first_name'],
-                        last_name=row['last_name'],
-                        password='TempPassword123!'
-                    )
-                    
-                    laureate = Laureate.objects.create(
-                        user=user,
-                        student_id=student_id,  # Use generated ID
-                        institution=row.get('institution', ''),
-                        field_of_study=row.get('field_of_study', ''),
-                        graduation_year=int(row.get('graduation_year', 2025)),
-                        is_active=True
-                    )
-                    
-                    created_laureates.append({
-                        'name': laureate.user.get_full_name(),
-                        'student_id': student_id,
-                        'email': laureate.user.email
-                    })
-                    created_count += 1
-            except Exception as e:
-                error_count += 1
-        
-        return Response({
-            'created_count': created_count,
-            'error_count': error_count,
-            'total_processed': created_count + error_count,
-            'created_laureates': created_laureates
-        })
\ No newline at end of file
+        try:
+            result = LaureateImport().run(request.FILES['csv_file'].file)
+        except LaureateImportError as e:
+            return Response({'error': str(e)}, status=400)
+        return Response(result)
@@ -4,10 +4,13 @@ from .models import Loan
 
 @admin.register(Loan)
 class LoanAdmin(admin.ModelAdmin):
-    list_display = ['id', 'laureate', 'amount', 'monthly_payment', 'status', 'start_date', 'created_at']
+    list_display = ['id', 'laureate', 'amount', 'remaining_balance', 'monthly_payment', 'status', 'start_date', 'created_at']
+    list_select_related = ['laureate__user']
     list_filter = ['status', 'start_date', 'created_at']
     search_fields = ['laureate__user__first_name', 'laureate__user__last_name', 'laureate__student_id']
     ordering = ['-created_at']
+    # Searched as you type instead of rendering every laureate in a select
+    autocomplete_fields = ['laureate']
     
     fieldsets = (
         ('Loan Information', {
@@ -19,6 +22,14 @@ class LoanAdmin(admin.ModelAdmin):
         ('Status & Notes', {
             'fields': ('status', 'notes', 'created_by')
         }),
+        ('Balances', {
+            'fields': ('total_paid', 'remaining_balance', 'next_due_date')
+        }),
     )
     
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['total_paid', 'remaining_balance', 'next_due_date', 'created_at', 'updated_at']
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Amount edits shift the remaining balance
+        obj.refresh_balances()
@@ -0,0 +1,133 @@
+# loans/amortization.py
+from decimal import Decimal
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+CENT = Decimal('0.01')
+
+
+def term_months(start_date, end_date):
+    """Number of monthly installments between two dates"""
+    return (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month)
+
+
+def due_dates(start_date, months):
+    """Monthly due dates, the first one on the start date"""
+    # Offset from the start date so month-end dates don't drift (Jan 31 -> Feb 28 -> Mar 31)
+    return [start_date + relativedelta(months=month) for month in range(months)]
+
+
+def _to_cents(values):
+    return np.round(np.asarray(values, dtype=np.float64) * 100).astype(np.int64)
+
+
+def _round_half_up(values):
+    return np.floor(values + 0.5).astype(np.int64)
+
+
+def annuity_payments(principals, annual_rates, months):
+    """Level monthly payment for each loan, in cents"""
+    principal = _to_cents(principals).astype(np.float64)
+    rate = np.asarray(annual_rates, dtype=np.float64) / 100 / 12
+    months = np.asarray(months, dtype=np.int64)
+    growth = np.power(1 + rate, months)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        payment = np.where(
+            rate == 0,
+            principal / np.maximum(months, 1),
+            principal * rate * growth / (growth - 1),
+        )
+    # No installments, no payment (the annuity formula divides by zero)
+    payment = np.where(months > 0, payment, 0)
+    return _round_half_up(payment)
+
+
+def annuity_payment(principal, annual_rate, months):
+    """Level monthly payment for a single loan"""
+    cents = int(annuity_payments([float(principal)], [float(annual_rate)], [months])[0])
+    return Decimal(cents) * CENT
+
+
+class AmortizationSchedule:
+    """Installment arrays for many loans, in cents, shaped (loans, max term)"""
+
+    def __init__(self, terms, payment, principal, interest, opening, closing):
+        self.terms = terms
+        self.payment = payment
+        self.principal = principal
+        self.interest = interest
+        self.opening = opening
+        self.closing = closing
+
+    def __len__(self):
+        return len(self.terms)
+
+    def installments(self, index):
+        """Installment dicts with Decimal amounts for one loan of the batch"""
+        columns = {
+            'amount': self.payment[index],
+            'principal_amount': self.principal[index],
+            'interest_amount': self.interest[index],
+            'opening_balance': self.opening[index],
+            'closing_balance': self.closing[index],
+        }
+        return [
+            {name: Decimal(int(values[month])) * CENT for name, values in columns.items()}
+            for month in range(self.terms[index])
+        ]
+
+
+def amortize(principals, annual_rates, terms, payments=None):
+    """
+    Amortize many loans at once.
+
+    Interest is charged on the opening balance each month and rounded to
+    the cent; the final installment repays whatever principal is left so
+    every schedule closes at exactly zero. ``payments`` overrides the
+    computed level payment, e.g. with the loan's stored monthly_payment;
+    a payment above the annuity pays the loan off early, and the schedule
+    ends with the installment that clears it.
+    """
+    terms = np.asarray(terms, dtype=np.int64)
+    count = len(terms)
+    max_term = max(int(terms.max()), 0) if count else 0
+    rate = np.asarray(annual_rates, dtype=np.float64) / 100 / 12
+    level = annuity_payments(principals, annual_rates, terms) if payments is None else _to_cents(payments)
+
+    shape = (count, max_term)
+    payment = np.zeros(shape, dtype=np.int64)
+    principal = np.zeros(shape, dtype=np.int64)
+    interest = np.zeros(shape, dtype=np.int64)
+    opening = np.zeros(shape, dtype=np.int64)
+    closing = np.zeros(shape, dtype=np.int64)
+
+    balance = _to_cents(principals)
+    for month in range(max_term):
+        running = month < terms
+        last = month == terms - 1
+        month_interest = np.where(running, _round_half_up(balance * rate), 0)
+        month_principal = np.where(last, balance, np.clip(level - month_interest, 0, balance))
+        month_principal = np.where(running, month_principal, 0)
+
+        opening[:, month] = np.where(running, balance, 0)
+        interest[:, month] = month_interest
+        principal[:, month] = month_principal
+        payment[:, month] = month_principal + month_interest
+        balance = balance - month_principal
+        closing[:, month] = np.where(running, balance, 0)
+
+    # Cut the zero installments after an early payoff
+    paid_off = (closing == 0) & (np.arange(max_term) < terms[:, None])
+    terms = np.where(paid_off.any(axis=1), paid_off.argmax(axis=1) + 1, np.maximum(terms, 0))
+    return AmortizationSchedule(terms, payment, principal, interest, opening, closing)
+
+
+def amortize_loans(loans):
+    """Amortize loan instances using their stored monthly payment"""
+    loans = list(loans)
+    return amortize(
+        [loan.amount for loan in loans],
+        [loan.interest_rate for loan in loans],
+        [term_months(loan.start_date, loan.end_date) for loan in loans],
+        payments=[loan.monthly_payment for loan in loans],
+    )
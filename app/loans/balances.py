@@ -0,0 +1,63 @@
+# loans/balances.py
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Sum, Min, Q, Value, DecimalField
+from django.db.models.functions import Coalesce
+from .models import Loan
+from .summary import invalidate_loan_summaries
+
+BALANCE_FIELDS = ['total_paid', 'remaining_balance', 'next_due_date']
+UNPAID_STATUSES = ['pending', 'overdue']
+
+
+def compute_loan_balances(loan_ids):
+    """Aggregate paid totals and next due dates for many loans in one query"""
+    from payments.models import Payment
+    money = DecimalField(max_digits=12, decimal_places=2)
+    completed = Q(status='completed')
+    rows = Payment.objects.filter(loan_id__in=loan_ids).values('loan_id').annotate(
+        paid=Coalesce(Sum('amount', filter=completed), Value(Decimal('0.00')), output_field=money),
+        # Payments without an amortization split count entirely towards principal
+        principal_repaid=Coalesce(
+            Sum(Coalesce('principal_amount', 'amount'), filter=completed),
+            Value(Decimal('0.00')),
+            output_field=money
+        ),
+        next_due=Min('due_date', filter=Q(status__in=UNPAID_STATUSES)),
+    ).order_by()
+    return {row['loan_id']: (row['paid'], row['principal_repaid'], row['next_due']) for row in rows}
+
+
+def apply_loan_balances(loans, balances):
+    """Set the stored balance columns on each loan, returning the ones that changed"""
+    changed = []
+    for loan in loans:
+        total_paid, principal_repaid, next_due_date = balances.get(loan.id, (Decimal('0.00'), Decimal('0.00'), None))
+        remaining_balance = loan.amount - principal_repaid
+        if (loan.total_paid, loan.remaining_balance, loan.next_due_date) != (total_paid, remaining_balance, next_due_date):
+            loan.total_paid = total_paid
+            loan.remaining_balance = remaining_balance
+            loan.next_due_date = next_due_date
+            changed.append(loan)
+    return changed
+
+
+def refresh_loan_balances(loans):
+    """Recompute and persist the stored balances of the given loans"""
+    loans = list(loans)
+    if not loans:
+        return []
+    with transaction.atomic():
+        balances = compute_loan_balances([loan.id for loan in loans])
+        changed = apply_loan_balances(loans, balances)
+        if changed:
+            Loan.objects.bulk_update(changed, BALANCE_FIELDS)
+    # Payment edits can change the summary even when the balances don't
+    invalidate_loan_summaries(loan.laureate_id for loan in loans)
+    return changed
+
+
+def refresh_loan_balances_for_ids(loan_ids):
+    """Refresh stored balances for loan ids touched by a write"""
+    loans = Loan.objects.filter(id__in=set(loan_ids)).only('id', 'laureate_id', 'amount', *BALANCE_FIELDS)
+    return refresh_loan_balances(loans)
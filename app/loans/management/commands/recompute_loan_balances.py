@@ -0,0 +1,54 @@
+# loans/management/commands/recompute_loan_balances.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from loans.models import Loan
+from loans.balances import BALANCE_FIELDS, compute_loan_balances, apply_loan_balances
+from loans.summary import invalidate_loan_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild the stored total_paid, remaining_balance and next_due_date columns on loans"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without saving")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        checked = 0
+        drifted = 0
+
+        loans = Loan.objects.only('id', 'laureate_id', 'amount', *BALANCE_FIELDS).order_by('id')
+        batch = []
+        for loan in loans.iterator(chunk_size=batch_size):
+            batch.append(loan)
+            if len(batch) >= batch_size:
+                drifted += self.process_batch(batch, dry_run, options['verbosity'])
+                checked += len(batch)
+                batch = []
+        if batch:
+            drifted += self.process_batch(batch, dry_run, options['verbosity'])
+            checked += len(batch)
+
+        action = "would be corrected" if dry_run else "corrected"
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} loans, {drifted} drifted and {action}"
+        ))
+
+    def process_batch(self, batch, dry_run, verbosity):
+        stored = {loan.id: (loan.total_paid, loan.remaining_balance, loan.next_due_date) for loan in batch}
+        with transaction.atomic():
+            changed = apply_loan_balances(batch, compute_loan_balances(list(stored)))
+            if changed and not dry_run:
+                Loan.objects.bulk_update(changed, BALANCE_FIELDS)
+                invalidate_loan_summaries(loan.laureate_id for loan in changed)
+        if verbosity >= 2:
+            for loan in changed:
+                old_paid, old_remaining, old_next = stored[loan.id]
+                self.stdout.write(
+                    f"Loan #{loan.id}: total_paid {old_paid} -> {loan.total_paid}, "
+                    f"remaining_balance {old_remaining} -> {loan.remaining_balance}, "
+                    f"next_due_date {old_next} -> {loan.next_due_date}"
+                )
+        return len(changed)
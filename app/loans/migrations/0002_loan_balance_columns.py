@@ -0,0 +1,51 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:09
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Min, Q, Sum
+
+
+def backfill_balances(apps, schema_editor):
+    Loan = apps.get_model('loans', 'Loan')
+    Payment = apps.get_model('payments', 'Payment')
+    balances = {
+        row['loan_id']: row
+        for row in Payment.objects.values('loan_id').annotate(
+            paid=Sum('amount', filter=Q(status='completed')),
+            next_due=Min('due_date', filter=Q(status='pending')),
+        ).order_by()
+    }
+    loans = list(Loan.objects.only('id', 'amount'))
+    for loan in loans:
+        row = balances.get(loan.id, {})
+        loan.total_paid = row.get('paid') or Decimal('0.00')
+        loan.remaining_balance = loan.amount - loan.total_paid
+        loan.next_due_date = row.get('next_due')
+    Loan.objects.bulk_update(loans, ['total_paid', 'remaining_balance', 'next_due_date'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0001_initial'),
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loan',
+            name='next_due_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='loan',
+            name='remaining_balance',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='loan',
+            name='total_paid',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_balances, migrations.RunPython.noop),
+    ]
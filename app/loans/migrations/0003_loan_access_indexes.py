@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laureates', '0002_laureate_access_indexes'),
+        ('loans', '0002_loan_balance_columns'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['status'], name='loan_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['laureate', 'status'], name='loan_laureate_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['created_at'], name='loan_created_idx'),
+        ),
+    ]
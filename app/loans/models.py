@@ -2,9 +2,10 @@
 from django.db import models
 from laureates.models import Laureate
 from accounts.models import User
+from administration.portfolio import LoadedStateMixin
 from datetime import timedelta
 
-class Loan(models.Model):
+class Loan(LoadedStateMixin, models.Model):
     STATUS_CHOICES = [
         ('active', 'Active'),
         ('completed', 'Completed'),
@@ -24,37 +25,46 @@ class Loan(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
-    @property
-    def remaining_balance(self):
-        from payments.models import Payment
-        total_paid = Payment.objects.filter(
-            loan=self, 
-            status='completed'
-        ).aggregate(total=models.Sum('amount'))['total'] or 0
-        return float(self.amount) - float(total_paid)
+    # Denormalized from the payment schedule, maintained by loans.balances
+    total_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    remaining_balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    next_due_date = models.DateField(null=True, blank=True)
     
     @property
     def next_payment_date(self):
-        from payments.models import Payment
-        next_payment = Payment.objects.filter(
-            loan=self, 
-            status='pending'
-        ).order_by('due_date').first()
-        
-        if next_payment:
-            return next_payment.due_date
-        return None
+        return self.next_due_date
     
-    @property
-    def total_paid(self):
-        from payments.models import Payment
-        return Payment.objects.filter(
-            loan=self, 
-            status='completed'
-        ).aggregate(total=models.Sum('amount'))['total'] or 0
+    def save(self, *args, **kwargs):
+        # New loans start with nothing paid
+        if self._state.adding and not self.total_paid:
+            self.remaining_balance = self.amount
+        super().save(*args, **kwargs)
+        self.invalidate_summary()
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.invalidate_summary()
+        return result
+    
+    def invalidate_summary(self):
+        from .summary import invalidate_loan_summaries
+        invalidate_loan_summaries([self.laureate_id])
+    
+    def refresh_balances(self):
+        """Recompute the stored balance columns from this loan's payments"""
+        from .balances import refresh_loan_balances
+        refresh_loan_balances([self])
     
     def __str__(self):
         return f"Loan #{self.id} - {self.laureate.user.get_full_name()}"
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Status counts/sums on the dashboards and the ?status= filter
+            models.Index(fields=['status'], name='loan_status_idx'),
+            # A laureate's loans by status (summary, my_schedule)
+            models.Index(fields=['laureate', 'status'], name='loan_laureate_status_idx'),
+            # Default ordering and created_at ranges in trends/reports
+            models.Index(fields=['created_at'], name='loan_created_idx'),
+        ]
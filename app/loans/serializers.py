@@ -1,22 +1,25 @@
+from decimal import Decimal
 from rest_framework import serializers
 from .models import Loan
+from .amortization import annuity_payment, term_months
 from laureates.models import Laureate
 from laureates.serializers import LaureateBasicSerializer
 
 class LoanBasicSerializer(serializers.ModelSerializer):
     laureate_name = serializers.CharField(source='laureate.user.get_full_name', read_only=True)
-    remaining_balance = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    remaining_balance = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    total_paid = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
 
     class Meta:
         model = Loan
-        fields = ['id', 'laureate_name', 'amount', 'remaining_balance',
-                  'monthly_payment', 'status', 'start_date', 'end_date']
+        fields = ['id', 'laureate_name', 'amount', 'remaining_balance', 'total_paid',
+                  'next_due_date', 'monthly_payment', 'status', 'start_date', 'end_date']
 
 class LoanSerializer(serializers.ModelSerializer):
     laureate_info = LaureateBasicSerializer(source='laureate', read_only=True)
     laureate_id = serializers.IntegerField(write_only=True, required=False)
-    remaining_balance = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
-    total_paid = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    remaining_balance = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    total_paid = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
     next_payment_date = serializers.DateField(read_only=True)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
 
@@ -25,12 +28,18 @@ class LoanSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'laureate_info', 'laureate_id', 'amount', 'interest_rate',
             'start_date', 'end_date', 'monthly_payment', 'status', 'notes',
-            'remaining_balance', 'total_paid', 'next_payment_date',
+            'remaining_balance', 'total_paid', 'next_payment_date', 'next_due_date',
             'created_by_name', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['remaining_balance', 'total_paid', 'next_payment_date', 'created_at', 'updated_at']
+        read_only_fields = ['remaining_balance', 'total_paid', 'next_payment_date', 'next_due_date', 'created_at', 'updated_at']
 
     def validate_laureate_id(self, value):
+        # Batch creation preloads the active laureates in one query
+        active_laureate_ids = self.context.get('active_laureate_ids')
+        if active_laureate_ids is not None:
+            if value not in active_laureate_ids:
+                raise serializers.ValidationError("Invalid or inactive laureate.")
+            return value
         try:
             Laureate.objects.get(id=value, is_active=True)
         except Laureate.DoesNotExist:
@@ -54,18 +63,16 @@ class LoanSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({"monthly_payment": "Monthly payment must be positive."})
 
         # Validate monthly_payment during creation
-        if self.instance is None and all(field in data for field in ['amount', 'interest_rate', 'start_date', 'end_date', 'monthly_payment']):
-            principal = float(data['amount'])
-            annual_rate = float(data['interest_rate']) / 100
-            monthly_rate = annual_rate / 12
+        if self.instance is None and all(field in data for field in ['amount', 'start_date', 'end_date', 'monthly_payment']):
             start_date = data['start_date']
             end_date = data['end_date']
-            months_diff = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month)
+            months_diff = term_months(start_date, end_date)
             if months_diff <= 0:
                 raise serializers.ValidationError({"end_date": "End date must result in a positive loan term."})
-            expected_payment = principal / months_diff if monthly_rate == 0 else \
-                (principal * monthly_rate * (1 + monthly_rate) ** months_diff) / ((1 + monthly_rate) ** months_diff - 1)
-            if abs(float(data['monthly_payment']) - expected_payment) > 0.01:  # Allow small floating-point differences
+            # An omitted rate is saved as the model default, so check against that
+            interest_rate = data.get('interest_rate', Loan._meta.get_field('interest_rate').get_default())
+            expected_payment = annuity_payment(data['amount'], interest_rate, months_diff)
+            if abs(data['monthly_payment'] - expected_payment) > Decimal('0.01'):  # Allow rounding differences
                 raise serializers.ValidationError({
                     "monthly_payment": f"Monthly payment must be approximately {expected_payment:.2f} based on amount, interest rate, and duration."
                 })
@@ -0,0 +1,93 @@
+# loans/summary.py
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Sum, Min, Q, OuterRef, Subquery
+from laureates.models import Laureate
+
+SUMMARY_CACHE_KEY = 'loan_summary:{}'
+SUMMARY_CACHE_TIMEOUT = 60 * 60 * 24
+
+EMPTY_SUMMARY = {
+    'totalAmount': 0,
+    'remainingBalance': 0,
+    'totalPaid': 0,
+    'nextPaymentDate': None,
+    'nextPaymentAmount': 0,
+    'status': 'no_loan',
+    'loanCount': 0,
+    'activeLoanCount': 0
+}
+
+
+def _as_float(value):
+    return float(value) if value is not None else 0
+
+
+def compute_loan_summary(laureate_id):
+    """Aggregate every loan of a laureate with one conditional-aggregation query"""
+    from payments.models import Payment
+    next_payment = Payment.objects.filter(
+        loan__laureate_id=OuterRef('pk'),
+        loan__status__in=['active', 'overdue'],
+        status__in=['pending', 'overdue']
+    ).order_by('due_date')
+    row = Laureate.objects.filter(pk=laureate_id).annotate(
+        loan_count=Count('loans'),
+        active_count=Count('loans', filter=Q(loans__status='active')),
+        completed_count=Count('loans', filter=Q(loans__status='completed')),
+        overdue_count=Count('loans', filter=Q(loans__status='overdue')),
+        suspended_count=Count('loans', filter=Q(loans__status='suspended')),
+        total_amount=Sum('loans__amount'),
+        remaining_balance=Sum('loans__remaining_balance'),
+        total_paid=Sum('loans__total_paid'),
+        next_payment_date=Min('loans__next_due_date', filter=Q(loans__status__in=['active', 'overdue'])),
+        next_payment_amount=Subquery(next_payment.values('amount')[:1]),
+    ).values(
+        'loan_count', 'active_count', 'completed_count', 'overdue_count', 'suspended_count',
+        'total_amount', 'remaining_balance', 'total_paid', 'next_payment_date', 'next_payment_amount'
+    ).first()
+
+    if not row or not row['loan_count']:
+        return dict(EMPTY_SUMMARY)
+
+    if row['overdue_count']:
+        overall_status = 'overdue'
+    elif row['active_count']:
+        overall_status = 'active'
+    else:
+        overall_status = 'completed'
+
+    return {
+        'totalAmount': _as_float(row['total_amount']),
+        'remainingBalance': _as_float(row['remaining_balance']),
+        'totalPaid': _as_float(row['total_paid']),
+        'nextPaymentDate': row['next_payment_date'],
+        'nextPaymentAmount': _as_float(row['next_payment_amount']),
+        'status': overall_status,
+        'loanCount': row['loan_count'],
+        'activeLoanCount': row['active_count'],
+        'loanBreakdown': {
+            'active': row['active_count'],
+            'completed': row['completed_count'],
+            'overdue': row['overdue_count'],
+            'suspended': row['suspended_count']
+        }
+    }
+
+
+def get_loan_summary(laureate_id):
+    """Cached loan summary for the laureate dashboard"""
+    key = SUMMARY_CACHE_KEY.format(laureate_id)
+    summary = cache.get(key)
+    if summary is None:
+        summary = compute_loan_summary(laureate_id)
+        cache.set(key, summary, SUMMARY_CACHE_TIMEOUT)
+    return summary
+
+
+def invalidate_loan_summaries(laureate_ids):
+    """Drop cached summaries after a laureate's loans or payments change"""
+    keys = [SUMMARY_CACHE_KEY.format(laureate_id) for laureate_id in set(laureate_ids) if laureate_id]
+    if keys:
+        # After commit, so a concurrent read can't re-cache the old figures
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -1,3 +1,74 @@
-from django.test import TestCase
+import warnings
+from datetime import date
+from decimal import Decimal
+from django.test import SimpleTestCase, TestCase
+from accounts.models import User
+from laureates.models import Laureate
+from .amortization import amortize, annuity_payment
+from .serializers import LoanSerializer
 
-# Create your tests here.
+
+class AmortizationTests(SimpleTestCase):
+    """Schedules are rounded to the cent and close at exactly zero"""
+
+    def test_level_payment_rounding(self):
+        self.assertEqual(annuity_payment(1000, 5, 12), Decimal('85.61'))
+        self.assertEqual(annuity_payment(1000, 0, 3), Decimal('333.33'))
+
+    def test_schedule_closes_at_zero(self):
+        installments = amortize([1000], [5], [12]).installments(0)
+        self.assertEqual(len(installments), 12)
+        self.assertEqual([item['amount'] for item in installments[:11]], [Decimal('85.61')] * 11)
+        # The last installment absorbs the rounding of the others
+        self.assertEqual(installments[-1]['amount'], Decimal('85.59'))
+        self.assertEqual(sum(item['principal_amount'] for item in installments), Decimal('1000.00'))
+        self.assertEqual(installments[-1]['closing_balance'], Decimal('0.00'))
+        for item in installments:
+            self.assertEqual(item['amount'], item['principal_amount'] + item['interest_amount'])
+            self.assertEqual(item['opening_balance'] - item['principal_amount'], item['closing_balance'])
+
+    def test_interest_rounds_half_up(self):
+        # 0.25 at 6% a month is 1.5 cents
+        installments = amortize([Decimal('0.25')], [72], [1]).installments(0)
+        self.assertEqual(installments[0]['interest_amount'], Decimal('0.02'))
+
+    def test_zero_rate_splits_evenly(self):
+        installments = amortize([1000], [0], [3]).installments(0)
+        self.assertEqual([item['amount'] for item in installments], [Decimal('333.33'), Decimal('333.33'), Decimal('333.34')])
+
+    def test_payment_above_annuity_ends_early(self):
+        installments = amortize([1000], [0], [12], payments=[200]).installments(0)
+        self.assertEqual([item['amount'] for item in installments], [Decimal('200.00')] * 5)
+        self.assertEqual(installments[-1]['closing_balance'], Decimal('0.00'))
+
+    def test_zero_term(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            self.assertEqual(annuity_payment(1000, 5, 0), Decimal('0.00'))
+            self.assertEqual(amortize([1000, 1000], [5, 5], [0, 2]).installments(0), [])
+
+
+class LoanSerializerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='laureate', email='laureate@example.com', password='pw')
+        cls.laureate = Laureate.objects.create(user=user, student_id='S00001', graduation_year=2020)
+
+    def loan_data(self, **overrides):
+        data = {
+            'laureate_id': self.laureate.id, 'amount': '1000.00',
+            'start_date': date(2024, 1, 1), 'end_date': date(2025, 1, 1), 'monthly_payment': '83.33',
+        }
+        data.update(overrides)
+        return data
+
+    def test_payment_checked_against_default_rate(self):
+        self.assertTrue(LoanSerializer(data=self.loan_data()).is_valid())
+        serializer = LoanSerializer(data=self.loan_data(monthly_payment='200.00'))
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('monthly_payment', serializer.errors)
+
+    def test_payment_checked_against_given_rate(self):
+        self.assertTrue(LoanSerializer(data=self.loan_data(interest_rate='5.00', monthly_payment='85.61')).is_valid())
+        self.assertFalse(LoanSerializer(data=self.loan_data(interest_rate='5.00')).is_valid())
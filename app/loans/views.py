@@ -1,13 +1,19 @@
+from decimal import Decimal
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum, Count, Q
+from django.db.models import Sum, Count
+from django.db import transaction
 from accounts.permissions import IsAdminUser, IsLaureateUser
 from .models import Loan
+from .amortization import amortize_loans, due_dates
+from .summary import get_loan_summary
 from .serializers import LoanSerializer, LoanBasicSerializer
-from payments.models import Payment
-from dateutil.relativedelta import relativedelta
+from laureates.models import Laureate
+from laureates.search import search_laureates
+from payments.schedule import create_schedules
+from administration.portfolio import record_created, PortfolioStats
 
 class LoanViewSet(viewsets.ModelViewSet):
     serializer_class = LoanSerializer
@@ -23,11 +29,7 @@ class LoanViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(laureate_id=laureate_id)
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(laureate__user__first_name__icontains=search) |
-                Q(laureate__user__last_name__icontains=search) |
-                Q(laureate__student_id__icontains=search)
-            )
+            queryset = search_laureates(queryset, search, prefix='laureate__')
         return queryset
 
     def get_permissions(self):
@@ -50,17 +52,42 @@ class LoanViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     def perform_create(self, serializer):
-        loan = serializer.save(created_by=self.request.user)
-        # Auto-generate payment schedule
-        current_date = loan.start_date
-        while current_date <= loan.end_date:
-            Payment.objects.create(
-                loan=loan,
-                amount=loan.monthly_payment,
-                due_date=current_date,
-                status='pending'
+        with transaction.atomic():
+            loan = serializer.save(created_by=self.request.user)
+            # Auto-generate payment schedule
+            create_schedules([loan])
+
+    @action(detail=False, methods=['post'], url_path='bulk_create')
+    def bulk_create_loans(self, request):
+        """Create a batch of loans and their payment schedules in one request"""
+        data = request.data.get('loans') if isinstance(request.data, dict) else request.data
+        if not isinstance(data, list) or not data:
+            return Response(
+                {"error": "Expected a non-empty list of loans"},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            current_date += relativedelta(months=1)
+        laureate_ids = {item.get('laureate_id') for item in data if isinstance(item, dict)}
+        active_laureate_ids = set(Laureate.objects.filter(
+            id__in=[laureate_id for laureate_id in laureate_ids if str(laureate_id).isdigit()],
+            is_active=True
+        ).values_list('id', flat=True))
+        serializer = LoanSerializer(
+            data=data,
+            many=True,
+            context={**self.get_serializer_context(), 'active_laureate_ids': active_laureate_ids}
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            loans = Loan.objects.bulk_create([
+                Loan(created_by=request.user, remaining_balance=item['amount'], **item)
+                for item in serializer.validated_data
+            ])
+            record_created(loans)
+            payments = create_schedules(loans)
+        return Response({
+            "message": f"Created {len(loans)} loans with {len(payments)} scheduled payments",
+            "loan_ids": [loan.id for loan in loans],
+        }, status=status.HTTP_201_CREATED)
 
     @action(detail=False, methods=['get'])
     def my_loans(self, request):
@@ -72,7 +99,9 @@ class LoanViewSet(viewsets.ModelViewSet):
             )
         try:
             laureate = request.user.laureate_profile
-            loans = Loan.objects.filter(laureate=laureate).order_by('-created_at')
+            loans = Loan.objects.filter(laureate=laureate).select_related(
+                'laureate__user', 'created_by'
+            ).order_by('-created_at')
             serializer = LoanSerializer(loans, many=True)
             return Response(serializer.data)
         except:
@@ -91,49 +120,13 @@ class LoanViewSet(viewsets.ModelViewSet):
             )
         try:
             laureate = request.user.laureate_profile
-            all_loans = Loan.objects.filter(laureate=laureate)
-            active_loans = all_loans.filter(status='active')
-            if not all_loans.exists():
-                return Response({
-                    'totalAmount': 0,
-                    'remainingBalance': 0,
-                    'totalPaid': 0,
-                    'nextPaymentDate': None,
-                    'nextPaymentAmount': 0,
-                    'status': 'no_loan',
-                    'loanCount': 0,
-                    'activeLoanCount': 0
-                })
-            total_amount = sum(float(loan.amount) for loan in all_loans)
-            total_remaining_balance = sum(float(loan.remaining_balance) for loan in all_loans)
-            total_paid = total_amount - total_remaining_balance
-            next_payment = Payment.objects.filter(
-                loan__in=active_loans,
-                status='pending'
-            ).order_by('due_date').first()
-            if not active_loans.exists():
-                overall_status = 'completed'
-            elif all_loans.filter(status='overdue').exists():
-                overall_status = 'overdue'
-            else:
-                overall_status = 'active'
-            summary = {
-                'totalAmount': total_amount,
-                'remainingBalance': total_remaining_balance,
-                'totalPaid': total_paid,
-                'nextPaymentDate': next_payment.due_date if next_payment else None,
-                'nextPaymentAmount': float(next_payment.amount) if next_payment else 0,
-                'status': overall_status,
-                'loanCount': all_loans.count(),
-                'activeLoanCount': active_loans.count(),
-                'loanBreakdown': {
-                    'active': active_loans.count(),
-                    'completed': all_loans.filter(status='completed').count(),
-                    'overdue': all_loans.filter(status='overdue').count(),
-                    'suspended': all_loans.filter(status='suspended').count()
-                }
-            }
-            return Response(summary)
+        except Laureate.DoesNotExist:
+            return Response(
+                {"error": "Laureate profile not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        try:
+            return Response(get_loan_summary(laureate.id))
         except Exception as e:
             return Response(
                 {"error": f"Error fetching loan summary: {str(e)}"},
@@ -143,14 +136,31 @@ class LoanViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         """Admin dashboard statistics"""
+        portfolio = PortfolioStats()
         stats = {
-            'active_loans': Loan.objects.filter(status='active').count(),
-            'total_amount': Loan.objects.filter(status='active').aggregate(total=Sum('amount'))['total'] or 0,
-            'completed_loans': Loan.objects.filter(status='completed').count(),
-            'overdue_loans': Loan.objects.filter(status='overdue').count(),
+            'active_loans': portfolio.count('loan', 'active'),
+            'total_amount': portfolio.amount('loan', 'active'),
+            'completed_loans': portfolio.count('loan', 'completed'),
+            'overdue_loans': portfolio.count('loan', 'overdue'),
         }
         return Response(stats)
 
+    @action(detail=True, methods=['get'])
+    def amortization(self, request, pk=None):
+        """Full amortization table of a loan with principal/interest split"""
+        loan = self.get_object()
+        installments = amortize_loans([loan]).installments(0)
+        dates = due_dates(loan.start_date, len(installments))
+        return Response({
+            'loan_id': loan.id,
+            'term_months': len(installments),
+            'total_interest': sum((item['interest_amount'] for item in installments), Decimal('0.00')),
+            'installments': [
+                {'number': number, 'due_date': due_date, **item}
+                for number, (due_date, item) in enumerate(zip(dates, installments), start=1)
+            ],
+        })
+
     @action(detail=True, methods=['post'])
     def update_status(self, request, pk=None):
         """Update loan status"""
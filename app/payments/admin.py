@@ -1,6 +1,8 @@
 
 # payments/admin.py
 from django.contrib import admin
+from django.db import transaction
+from loans.balances import refresh_loan_balances_for_ids
 from .models import Payment
 
 @admin.register(Payment)
@@ -19,4 +21,23 @@ class PaymentAdmin(admin.ModelAdmin):
         }),
     )
     
-    readonly_fields = ['created_at', 'updated_at']
\ No newline at end of file
+    readonly_fields = ['created_at', 'updated_at']
+    
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            loan_ids = {obj.loan_id}
+            if change and 'loan' in form.changed_data:
+                loan_ids.add(form.initial.get('loan'))
+            refresh_loan_balances_for_ids(loan_ids)
+    
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            refresh_loan_balances_for_ids([obj.loan_id])
+    
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            loan_ids = list(queryset.order_by().values_list('loan_id', flat=True).distinct())
+            super().delete_queryset(request, queryset)
+            refresh_loan_balances_for_ids(loan_ids)
\ No newline at end of file
@@ -0,0 +1,52 @@
+# payments/management/commands/reconcile_statement.py
+import csv
+from django.core.management.base import BaseCommand, CommandError
+from payments.reconciliation import Reconciliation, StatementError
+
+
+class Command(BaseCommand):
+    help = "Match a bank statement CSV against unpaid payments and mark the matches as paid"
+
+    def add_arguments(self, parser):
+        parser.add_argument('statement', help="Path to the bank statement CSV")
+        parser.add_argument('--window', type=int, default=10,
+                            help="Days either side of the due date a credit may land (default 10)")
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help="Statement lines matched per query and transaction (default 5000)")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Report matches without posting any payment")
+        parser.add_argument('--output', help="Write the unmatched lines to this CSV file")
+
+    def handle(self, *args, **options):
+        reconciliation = Reconciliation(
+            window_days=options['window'],
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        try:
+            with open(options['statement'], 'rb') as stream:
+                report = reconciliation.run(stream)
+        except OSError as e:
+            raise CommandError(f"Cannot read statement: {e}")
+        except StatementError as e:
+            raise CommandError(str(e))
+
+        if options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                writer = csv.DictWriter(
+                    output, fieldnames=['line', 'date', 'amount', 'reference', 'description', 'reason']
+                )
+                writer.writeheader()
+                writer.writerows(report['unmatched_lines'])
+
+        rules = ', '.join(f"{rule}: {count}" for rule, count in sorted(report['matches_by_rule'].items()))
+        prefix = "[dry run] " if options['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{report['lines']} lines, {report['matched']} matched "
+            f"({report['matched_amount']:.2f}), {report['unmatched']} unmatched, "
+            f"{report['completed_loans']} loans completed"
+        ))
+        if rules:
+            self.stdout.write(f"Matches by rule: {rules}")
+        if 'error' in report:
+            raise CommandError(f"{report['error']}; the lines before it are posted and reported above")
@@ -0,0 +1,46 @@
+# payments/management/commands/sweep_overdue.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from administration.models import ActivityLog
+from administration.portfolio import update_status
+from loans.models import Loan
+from loans.summary import invalidate_loan_summaries
+from payments.models import Payment
+
+
+class Command(BaseCommand):
+    help = "Move pending payments past their due date to overdue and sync loan statuses (run nightly)"
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        today = now.date()
+
+        with transaction.atomic():
+            payments_marked = update_status(
+                Payment.objects.filter(status='pending', due_date__lt=today),
+                'overdue', updated_at=now
+            )
+
+            overdue_loan_ids = Payment.objects.filter(status='overdue').values('loan_id')
+            to_overdue = Loan.objects.filter(status='active', id__in=overdue_loan_ids)
+            # Loans whose arrears have all been settled go back to active
+            to_active = Loan.objects.filter(status='overdue').exclude(id__in=overdue_loan_ids)
+            laureate_ids = set(to_overdue.values_list('laureate_id', flat=True))
+            laureate_ids.update(to_active.values_list('laureate_id', flat=True))
+            loans_overdue = update_status(to_overdue, 'overdue', updated_at=now)
+            loans_restored = update_status(to_active, 'active', updated_at=now)
+
+            summary = (
+                f"Overdue sweep for {today}: {payments_marked} payments marked overdue, "
+                f"{loans_overdue} loans marked overdue, {loans_restored} loans back to active"
+            )
+            ActivityLog.objects.create(
+                user=None,
+                action='status_change',
+                model_name='Payment',
+                description=summary
+            )
+            invalidate_loan_summaries(laureate_ids)
+
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0002_loan_balance_columns'),
+        ('payments', '0002_payment_amortization_split'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['due_date'], name='payment_pending_due_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-17 20:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0003_loan_access_indexes'),
+        ('payments', '0004_payment_access_indexes'),
+    ]
+
+    operations = [
+        # payment_loan_status_idx leads with loan_id and serves the same lookups.
+        # AlterField would drop and re-add (and re-validate) the foreign key, so
+        # only the index Django created for it in 0001 is dropped.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='payment',
+                    name='loan',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='loans.loan'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    'DROP INDEX IF EXISTS "payments_payment_loan_id_4826729b"',
+                    reverse_sql='CREATE INDEX "payments_payment_loan_id_4826729b" ON "payments_payment" ("loan_id")',
+                ),
+            ],
+        ),
+    ]
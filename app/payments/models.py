@@ -1,8 +1,30 @@
 # payments/models.py
 from django.db import models
+from django.utils import timezone
 from loans.models import Loan
+from administration.portfolio import LoadedStateMixin
 
-class Payment(models.Model):
+# Unpaid statuses counted as arrears, with pending payments past their due date
+ARREARS_STATUSES = ['overdue', 'missed']
+
+class PaymentQuerySet(models.QuerySet):
+    def overdue(self, today=None):
+        """Swept overdue payments plus pending ones that fell due since the last sweep"""
+        today = today or timezone.now().date()
+        return self.filter(
+            models.Q(status='overdue') |
+            models.Q(status='pending', due_date__lt=today)
+        )
+    
+    def in_arrears(self, today=None):
+        """Everything past due and unpaid: overdue() plus payments written off as missed"""
+        today = today or timezone.now().date()
+        return self.filter(
+            models.Q(status__in=ARREARS_STATUSES) |
+            models.Q(status='pending', due_date__lt=today)
+        )
+
+class Payment(LoadedStateMixin, models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('completed', 'Completed'),
@@ -10,8 +32,14 @@ class Payment(models.Model):
         ('missed', 'Missed'),
     ]
     
-    loan = models.ForeignKey(Loan, on_delete=models.CASCADE, related_name='payments')
+    # Indexed by payment_loan_status_idx, which leads with loan_id
+    loan = models.ForeignKey(Loan, on_delete=models.CASCADE, related_name='payments', db_index=False)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
+    # Amortization split, empty for payments recorded before schedules carried it
+    principal_amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    interest_amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    opening_balance = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    closing_balance = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
     due_date = models.DateField()
     paid_date = models.DateField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
@@ -21,20 +49,36 @@ class Payment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = PaymentQuerySet.as_manager()
+    
     @property
     def is_overdue(self):
-        from django.utils import timezone
+        if self.status == 'overdue':
+            return True
         return self.status == 'pending' and self.due_date < timezone.now().date()
     
     @property
     def days_overdue(self):
-        from django.utils import timezone
         if self.is_overdue:
             return (timezone.now().date() - self.due_date).days
         return 0
     
     class Meta:
         ordering = ['due_date']
+        indexes = [
+            # Balance refreshes, per-loan schedules and the ?loan=&status= filters
+            models.Index(fields=['loan', 'status'], name='payment_loan_status_idx'),
+            # Overdue lists/counts and date-ranged report aggregates
+            models.Index(fields=['status', 'due_date'], name='payment_status_due_idx'),
+            # Collections by paid date (monthly trends, financial report)
+            models.Index(fields=['status', 'paid_date'], name='payment_status_paid_idx'),
+            # Serves the overdue sweep and the "pending past due" half of overdue()
+            models.Index(
+                fields=['due_date'],
+                name='payment_pending_due_idx',
+                condition=models.Q(status='pending'),
+            ),
+        ]
     
     def __str__(self):
         return f"Payment #{self.id} - {self.loan.laureate.user.get_full_name()}"
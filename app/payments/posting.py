@@ -0,0 +1,36 @@
+# payments/posting.py
+from django.db import transaction
+from django.utils import timezone
+from administration.portfolio import record_saved, update_status
+from administration.trends import invalidate_trends
+from loans.balances import refresh_loan_balances_for_ids
+from loans.models import Loan
+from .models import Payment
+
+POSTED_FIELDS = ['status', 'paid_date', 'payment_method', 'transaction_id', 'notes', 'updated_at']
+
+
+def post_payments(payments, batch_size=500):
+    """
+    Persist payments already set to completed in memory.
+
+    One bulk UPDATE for the payments, one balance refresh for the loans
+    they belong to, and one UPDATE closing the loans now fully repaid.
+    Returns the number of loans completed.
+    """
+    if not payments:
+        return 0
+    now = timezone.now()
+    with transaction.atomic():
+        for payment in payments:
+            payment.updated_at = now
+        Payment.objects.bulk_update(payments, POSTED_FIELDS, batch_size=batch_size)
+        record_saved(payments)
+        # Backdated paid dates land in periods the trends may have cached
+        invalidate_trends(payment.paid_date for payment in payments)
+        loan_ids = {payment.loan_id for payment in payments}
+        refresh_loan_balances_for_ids(loan_ids)
+        return update_status(
+            Loan.objects.filter(id__in=loan_ids, remaining_balance__lte=0),
+            'completed', updated_at=now
+        )
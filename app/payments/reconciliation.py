@@ -0,0 +1,318 @@
+# payments/reconciliation.py
+import csv
+import io
+import logging
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+from django.db.models import F
+from .models import Payment
+from .posting import post_payments
+
+logger = logging.getLogger(__name__)
+
+UNPAID_STATUSES = ['pending', 'overdue']
+
+# Accepted header names for each statement column, compared lower-cased
+COLUMN_ALIASES = {
+    'date': ['date', 'value_date', 'transaction_date', 'operation_date', 'date_valeur'],
+    'amount': ['amount', 'credit', 'montant'],
+    'reference': ['reference', 'ref', 'transaction_id', 'transaction_reference'],
+    'description': ['description', 'label', 'libelle', 'details'],
+}
+DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y']
+TOKEN_RE = re.compile(r'[A-Za-z0-9-]+')
+
+
+class StatementError(ValueError):
+    pass
+
+
+class StatementLine:
+    __slots__ = ['number', 'date', 'amount', 'reference', 'description']
+
+    def __init__(self, number, date, amount, reference, description):
+        self.number = number
+        self.date = date
+        self.amount = amount
+        self.reference = reference
+        self.description = description
+
+    def tokens(self):
+        """Upper-cased words of the reference and description, to look up transaction ids and student ids"""
+        return {token.upper() for token in TOKEN_RE.findall(f"{self.reference} {self.description}")}
+
+    def as_dict(self):
+        return {
+            'line': self.number,
+            'date': self.date.isoformat() if self.date else None,
+            'amount': float(self.amount) if self.amount is not None else None,
+            'reference': self.reference,
+            'description': self.description,
+        }
+
+
+def parse_amount(value):
+    """
+    Amount of a statement cell, written 1,234.56 or 1.234,56.
+
+    The last separator is the decimal one when the other separator also
+    appears or when it is not followed by three digits; a lone separator
+    followed by three digits (1,234 or 1.234) could be either and is
+    rejected, as are thousands groups that aren't three digits.
+    """
+    value = (value or '').replace('\xa0', '').replace(' ', '')
+    separators = [char for char in value if char in ',.']
+    whole, fraction, thousands = value, '', None
+    if separators:
+        last = separators[-1]
+        other = ',' if last == '.' else '.'
+        if other in separators or (separators.count(last) == 1 and len(value.rpartition(last)[2]) != 3):
+            whole, _, fraction = value.rpartition(last)
+            thousands = other
+        elif separators.count(last) > 1:
+            thousands = last
+        else:
+            raise ValueError(f"Ambiguous amount: {value!r}")
+    if thousands and thousands in whole:
+        groups = whole.lstrip('+-').split(thousands)
+        if not 1 <= len(groups[0]) <= 3 or any(len(group) != 3 for group in groups[1:]):
+            raise ValueError(f"Unrecognized amount: {value!r}")
+        whole = whole.replace(thousands, '')
+    return Decimal(f"{whole}.{fraction}" if fraction else whole).quantize(Decimal('0.01'))
+
+
+def parse_date(value):
+    value = (value or '').strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date: {value!r}")
+
+
+def is_undecodable(value):
+    # Bytes that aren't UTF-8 come through surrogateescape as lone surrogates
+    return any('\udc80' <= char <= '\udcff' for char in value)
+
+
+def read_statement(stream):
+    """
+    Yield statement lines from a binary CSV stream, decoding incrementally.
+
+    Returns (line, error) pairs; unparseable lines carry an error message
+    instead of being dropped so they show up in the report. Invalid UTF-8
+    makes only its own line unparseable, since earlier batches may already
+    be posted when it is reached.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='surrogateescape', newline='')
+    reader = csv.DictReader(text)
+    if not reader.fieldnames:
+        raise StatementError("Statement is empty")
+    if any(is_undecodable(name) for name in reader.fieldnames if name):
+        raise StatementError("Statement header is not valid UTF-8")
+    headers = {name.strip().lower(): name for name in reader.fieldnames if name}
+    columns = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        columns[column] = next((headers[alias] for alias in aliases if alias in headers), None)
+    if not columns['date'] or not columns['amount']:
+        raise StatementError("Statement needs at least a date and an amount column")
+
+    for number, row in enumerate(reader, start=2):
+        if any(is_undecodable(value) for value in row.values() if isinstance(value, str)):
+            yield StatementLine(number, None, None, '', ''), "Unreadable line: not valid UTF-8"
+            continue
+        reference = (row.get(columns['reference']) or '').strip() if columns['reference'] else ''
+        description = (row.get(columns['description']) or '').strip() if columns['description'] else ''
+        try:
+            line = StatementLine(number, parse_date(row.get(columns['date'])),
+                                 parse_amount(row.get(columns['amount'])), reference, description)
+        except (ValueError, InvalidOperation) as e:
+            yield StatementLine(number, None, None, reference, description), f"Unreadable line: {e}"
+            continue
+        if line.amount <= 0:
+            yield line, "Not a credit"
+            continue
+        yield line, None
+
+
+class CandidateIndex:
+    """In-memory hash indexes over the unpaid payments that could match a batch of lines"""
+
+    def __init__(self, payments, posted_references=()):
+        self.posted_references = set(posted_references)
+        self.by_transaction = {}
+        self.by_student = defaultdict(list)
+        self.by_amount = defaultdict(list)
+        for payment in payments:
+            if payment.transaction_id:
+                self.by_transaction[payment.transaction_id.upper()] = payment
+            self.by_student[payment.student_id.upper()].append(payment)
+            self.by_amount[payment.amount].append(payment)
+        for payments_by_due in (*self.by_student.values(), *self.by_amount.values()):
+            payments_by_due.sort(key=lambda payment: (payment.due_date, payment.id))
+
+    @staticmethod
+    def in_window(payments, line, window, claimed):
+        """Unclaimed payments due within the window around the line date, nearest first"""
+        dates = [payment.due_date for payment in payments]
+        start = bisect_left(dates, line.date - window)
+        found = []
+        for payment in payments[start:]:
+            if payment.due_date > line.date + window:
+                break
+            if payment.id not in claimed:
+                found.append(payment)
+        found.sort(key=lambda payment: abs((payment.due_date - line.date).days))
+        return found
+
+    def match(self, line, window, claimed):
+        """Best payment for a line and how it matched, or (None, reason)"""
+        if line.reference and line.reference.upper() in self.posted_references:
+            return None, "Already reconciled"
+        tokens = line.tokens()
+        for token in tokens:
+            payment = self.by_transaction.get(token)
+            if payment and payment.id not in claimed and payment.amount == line.amount:
+                return payment, 'reference'
+        for token in tokens:
+            if token in self.by_student:
+                same_amount = [payment for payment in self.by_student[token] if payment.amount == line.amount]
+                found = self.in_window(same_amount, line, window, claimed)
+                if found:
+                    return found[0], 'student_id'
+        found = self.in_window(self.by_amount.get(line.amount, []), line, window, claimed)
+        if len(found) == 1:
+            return found[0], 'amount_date'
+        if found:
+            return None, f"Ambiguous: {len(found)} payments of this amount due in the window"
+        return None, "No unpaid payment matches"
+
+
+def load_candidates(lines, window):
+    """One query for every unpaid payment a batch of lines could match"""
+    dates = [line.date for line in lines]
+    # Every matching rule requires the exact amount, so it bounds the candidate set
+    return list(
+        Payment.objects.filter(
+            status__in=UNPAID_STATUSES,
+            due_date__gte=min(dates) - window,
+            due_date__lte=max(dates) + window,
+            amount__in={line.amount for line in lines},
+        ).annotate(
+            student_id=F('loan__laureate__student_id')
+        ).select_for_update(of=('self',)).order_by()
+    )
+
+
+def load_posted_references(lines):
+    """Statement references already recorded on completed payments, so re-imports don't double-post"""
+    references = {line.reference for line in lines if line.reference}
+    if not references:
+        return set()
+    return {
+        reference.upper() for reference in Payment.objects.filter(
+            status='completed', transaction_id__in=references
+        ).values_list('transaction_id', flat=True)
+    }
+
+
+class Reconciliation:
+    """Streams a statement, matches it in batches and posts the matches in bulk"""
+
+    def __init__(self, window_days=10, batch_size=5000, dry_run=False, payment_method='bank_transfer'):
+        self.window = timedelta(days=window_days)
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.payment_method = payment_method
+        self.claimed = set()
+        # Upper-cased reference -> first statement line carrying it in this run
+        self.seen_references = {}
+        self.report = {
+            'lines': 0,
+            'matched': 0,
+            'unmatched': 0,
+            'matched_amount': Decimal('0.00'),
+            'completed_loans': 0,
+            'matches_by_rule': defaultdict(int),
+            'unmatched_lines': [],
+        }
+
+    def run(self, stream):
+        """
+        Report of the reconciliation.
+
+        Batches commit one by one, so a failure part-way through still
+        returns the report of what was posted, with `error` naming the
+        first line of the batch that failed; that batch and the rest of
+        the statement are not posted. A bad header raises StatementError
+        before anything is posted.
+        """
+        batch = []
+        line = None
+        try:
+            for line, error in read_statement(stream):
+                self.report['lines'] += 1
+                if error:
+                    self.unmatched(line, error)
+                    continue
+                batch.append(line)
+                if len(batch) >= self.batch_size:
+                    self.process_batch(batch)
+                    batch = []
+            if batch:
+                self.process_batch(batch)
+        except StatementError:
+            raise
+        except Exception as e:
+            failed_at = batch[0].number if batch else (line.number + 1 if line else 2)
+            logger.exception("Reconciliation stopped at statement line %s", failed_at)
+            self.report['error'] = f"Stopped at line {failed_at}: {e}"
+            self.report['failed_line'] = failed_at
+        report = self.report
+        report['matched_amount'] = float(report['matched_amount'])
+        report['matches_by_rule'] = dict(report['matches_by_rule'])
+        report['dry_run'] = self.dry_run
+        return report
+
+    def unmatched(self, line, reason):
+        self.report['unmatched'] += 1
+        self.report['unmatched_lines'].append({**line.as_dict(), 'reason': reason})
+
+    def process_batch(self, lines):
+        unmatched = []
+        matched = []
+        rules = defaultdict(int)
+        with transaction.atomic():
+            index = CandidateIndex(load_candidates(lines, self.window), load_posted_references(lines))
+            for line in lines:
+                reference = line.reference.upper()
+                if reference in self.seen_references:
+                    unmatched.append((line, f"Duplicate of line {self.seen_references[reference]}"))
+                    continue
+                if reference:
+                    self.seen_references[reference] = line.number
+                payment, rule = index.match(line, self.window, self.claimed)
+                if payment is None:
+                    unmatched.append((line, rule))
+                    continue
+                self.claimed.add(payment.id)
+                payment.status = 'completed'
+                payment.paid_date = line.date
+                payment.payment_method = self.payment_method
+                payment.transaction_id = (line.reference or payment.transaction_id)[:100]
+                matched.append((payment, line))
+                rules[rule] += 1
+            completed_loans = 0 if self.dry_run else post_payments([payment for payment, _ in matched])
+        # Counted once the batch is committed, so a failed batch leaves the report as it was
+        for line, reason in unmatched:
+            self.unmatched(line, reason)
+        self.report['matched'] += len(matched)
+        self.report['matched_amount'] += sum((line.amount for _, line in matched), Decimal('0.00'))
+        for rule, count in rules.items():
+            self.report['matches_by_rule'][rule] += count
+        self.report['completed_loans'] += completed_loans
@@ -0,0 +1,31 @@
+# payments/schedule.py
+from django.db import transaction
+from administration.portfolio import record_created
+from loans.amortization import amortize_loans, due_dates
+from loans.balances import refresh_loan_balances
+from .models import Payment
+
+
+def build_schedules(loans):
+    """Unsaved pending payments for many loans, amortized in one vectorized pass"""
+    loans = list(loans)
+    schedule = amortize_loans(loans)
+    payments = []
+    for index, loan in enumerate(loans):
+        installments = schedule.installments(index)
+        for due_date, installment in zip(due_dates(loan.start_date, len(installments)), installments):
+            payments.append(Payment(loan=loan, due_date=due_date, status='pending', **installment))
+    return payments
+
+
+def create_schedules(loans, replace=False, batch_size=1000):
+    """Write the payment schedules of many loans with a single bulk insert"""
+    loans = list(loans)
+    with transaction.atomic():
+        if replace:
+            Payment.objects.filter(loan__in=loans).delete()
+        payments = build_schedules(loans)
+        Payment.objects.bulk_create(payments, batch_size=batch_size)
+        record_created(payments)
+        refresh_loan_balances(loans)
+    return payments
@@ -12,10 +12,12 @@ class PaymentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Payment
         fields = ['id', 'loan_id', 'laureate_name', 'laureate_id', 'amount', 
+                 'principal_amount', 'interest_amount', 'opening_balance', 'closing_balance',
                  'due_date', 'paid_date', 'status', 'payment_method', 
                  'transaction_id', 'notes', 'is_overdue', 'days_overdue',
                  'created_at', 'updated_at']
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['principal_amount', 'interest_amount', 'opening_balance',
+                            'closing_balance', 'created_at', 'updated_at']
     
     def validate(self, data):
         if data.get('paid_date') and data.get('status') != 'completed':
@@ -33,3 +35,17 @@ class PaymentCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Payment
         fields = ['amount', 'due_date', 'notes']
+
+class BulkMarkPaidItemSerializer(serializers.Serializer):
+    """One entry of a bulk_mark_paid batch"""
+    id = serializers.IntegerField()
+    payment_method = serializers.CharField(max_length=50, required=False, allow_blank=True, default='')
+    transaction_id = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+    paid_date = serializers.DateField(required=False)
+    notes = serializers.CharField(required=False, allow_blank=True)
+    
+    def validate_paid_date(self, value):
+        from django.utils import timezone
+        if value > timezone.now().date():
+            raise serializers.ValidationError("Paid date cannot be in the future")
+        return value
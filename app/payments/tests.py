@@ -1,3 +1,166 @@
-from django.test import TestCase
+import io
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from unittest import skipUnless
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from accounts.models import User
+from laureates.models import Laureate
+from loans.models import Loan
+from .models import Payment
+from .reconciliation import Reconciliation, parse_amount
 
-# Create your tests here.
+
+class AccessIndexPlanTests(TestCase):
+    """The hot-path querysets are planned on the composite indexes added for them"""
+
+    @classmethod
+    def setUpTestData(cls):
+        laureates = []
+        for i in range(20):
+            user = User.objects.create_user(username=f'laureate{i}', email=f'laureate{i}@example.com', password='pw')
+            laureates.append(Laureate.objects.create(
+                user=user, student_id=f'S{i:05d}', graduation_year=2020, is_active=i % 3 != 0,
+            ))
+        loans = Loan.objects.bulk_create([
+            Loan(laureate=laureate, amount=1200, start_date=date(2024, 1, 1), end_date=date(2025, 1, 1),
+                 monthly_payment=100, status=loan_status)
+            for laureate in laureates for loan_status in ['active', 'active', 'completed', 'overdue', 'suspended']
+        ])
+        # Five-year schedules, mostly paid off, so each status is a fraction of a loan's payments
+        def payment_status(month):
+            return 'completed' if month < 40 else 'overdue' if month < 44 else 'missed' if month < 46 else 'pending'
+        Payment.objects.bulk_create([
+            Payment(
+                loan=loan, amount=100, due_date=date(2020, 1, 1) + timedelta(days=30 * m),
+                paid_date=date(2020, 1, 1) + timedelta(days=30 * m) if payment_status(m) == 'completed' else None,
+                status=payment_status(m),
+            )
+            for loan in loans for m in range(60)
+        ])
+        cls.laureate = laureates[0]
+        cls.loan = loans[0]
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            if connection.vendor == 'postgresql':
+                # A test-sized table is cheaper to scan; make the planner show which index it would use
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def test_payment_indexes(self):
+        today = date(2024, 1, 1)
+        self.assertUsesIndex(Payment.objects.filter(loan=self.loan, status='pending').order_by(), 'payment_loan_status_idx')
+        self.assertUsesIndex(Payment.objects.filter(status='overdue', due_date__lt=today), 'payment_status_due_idx')
+        self.assertUsesIndex(
+            Payment.objects.filter(status='completed', paid_date__gte=date(2022, 6, 1)).order_by(), 'payment_status_paid_idx'
+        )
+
+    def test_loan_foreign_key_lookups(self):
+        # Migration 0005 dropped the single-column loan_id index; the composite one serves these
+        self.assertUsesIndex(self.loan.payments.order_by(), 'payment_loan_status_idx')
+        self.assertUsesIndex(Payment.objects.filter(loan__in=[self.loan]).order_by(), 'payment_loan_status_idx')
+
+    def test_loan_foreign_key_kept(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Payment._meta.db_table).values()
+        loan_indexes = [constraint['columns'] for constraint in constraints
+                        if constraint['index'] and constraint['columns'][:1] == ['loan_id']]
+        self.assertEqual(loan_indexes, [['loan_id', 'status']])
+        self.assertIn(
+            ('loans_loan', 'id'),
+            [constraint['foreign_key'] for constraint in constraints if constraint['columns'] == ['loan_id']],
+        )
+
+    def test_loan_delete_cascades(self):
+        loan_id = self.loan.id
+        self.loan.delete()
+        self.assertFalse(Payment.objects.filter(loan_id=loan_id).exists())
+
+    def test_loan_indexes(self):
+        self.assertUsesIndex(Loan.objects.filter(status='completed').order_by(), 'loan_status_idx')
+        self.assertUsesIndex(Loan.objects.filter(laureate=self.laureate, status='active'), 'loan_laureate_status_idx')
+        self.assertUsesIndex(Loan.objects.filter(created_at__gte=timezone.now() - timedelta(days=30)).order_by(), 'loan_created_idx')
+
+    # Django renders filter(is_active=True) as a bare `WHERE is_active`, which
+    # SQLite does not match against an index; PostgreSQL does
+    @skipUnless(connection.vendor == 'postgresql', 'SQLite plans boolean filters as a scan')
+    def test_laureate_index(self):
+        self.assertUsesIndex(Laureate.objects.filter(is_active=True)[:10], 'laureate_active_created_idx')
+
+
+class ParseAmountTests(SimpleTestCase):
+
+    def test_decimal_separator_is_the_last_one(self):
+        self.assertEqual(parse_amount('1.234,56'), Decimal('1234.56'))
+        self.assertEqual(parse_amount('1,234.56'), Decimal('1234.56'))
+        self.assertEqual(parse_amount('1 234,5'), Decimal('1234.50'))
+        self.assertEqual(parse_amount('1,234,567.89'), Decimal('1234567.89'))
+        self.assertEqual(parse_amount('1.234.567'), Decimal('1234567.00'))
+        self.assertEqual(parse_amount('-12,5'), Decimal('-12.50'))
+        self.assertEqual(parse_amount('100'), Decimal('100.00'))
+
+    def test_ambiguous_and_malformed_amounts_are_rejected(self):
+        for value in ['1,234', '1.234', '12,34,567.00', '1.234,56,7', '']:
+            with self.subTest(value=value):
+                with self.assertRaises((ValueError, InvalidOperation)):
+                    parse_amount(value)
+
+
+class ReconciliationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='laureate', email='laureate@example.com', password='pw')
+        laureate = Laureate.objects.create(user=user, student_id='STU001', graduation_year=2020)
+        cls.loan = Loan.objects.create(
+            laureate=laureate, amount=1200, start_date=date(2024, 1, 1), end_date=date(2025, 1, 1), monthly_payment=100,
+        )
+        cls.by_reference = Payment.objects.create(loan=cls.loan, amount=100, due_date=date(2024, 1, 1), transaction_id='TRX-1')
+        cls.by_student = Payment.objects.create(loan=cls.loan, amount=100, due_date=date(2024, 2, 1))
+        cls.by_amount = Payment.objects.create(loan=cls.loan, amount='123.45', due_date=date(2024, 3, 1))
+
+    def reconcile(self, *lines, **options):
+        statement = 'date,amount,reference,description\n' + ''.join(f'{line}\n' for line in lines)
+        return Reconciliation(**options).run(io.BytesIO(statement.encode()))
+
+    def test_matching_rules(self):
+        report = self.reconcile(
+            '2024-01-03,100.00,TRX-1,',
+            '2024-02-02,"100,00",,Repayment STU001',
+            '01/03/2024,"123,45",BANK-9,',
+            '2024-03-01,-50.00,BANK-10,refund',
+        )
+        self.assertEqual(report['matched'], 3)
+        self.assertEqual(report['matches_by_rule'], {'reference': 1, 'student_id': 1, 'amount_date': 1})
+        self.assertEqual([line['reason'] for line in report['unmatched_lines']], ['Not a credit'])
+        self.by_amount.refresh_from_db()
+        self.assertEqual((self.by_amount.status, self.by_amount.transaction_id), ('completed', 'BANK-9'))
+
+    def test_ambiguous_amount_is_not_matched(self):
+        Payment.objects.create(loan=self.loan, amount='123.45', due_date=date(2024, 3, 3))
+        report = self.reconcile('2024-03-02,123.45,BANK-9,')
+        self.assertEqual(report['matched'], 0)
+        self.assertTrue(report['unmatched_lines'][0]['reason'].startswith('Ambiguous'))
+
+    def test_repeated_reference_is_a_duplicate(self):
+        report = self.reconcile('2024-01-03,100.00,TRX-1,', '2024-02-02,100.00,trx-1,STU001', batch_size=1)
+        self.assertEqual(report['matched'], 1)
+        self.assertEqual(report['unmatched_lines'][0]['reason'], 'Duplicate of line 2')
+
+    def test_reimport_is_already_reconciled(self):
+        self.reconcile('2024-01-03,100.00,TRX-1,')
+        report = self.reconcile('2024-01-03,100.00,TRX-1,')
+        self.assertEqual(report['matched'], 0)
+        self.assertEqual(report['unmatched_lines'][0]['reason'], 'Already reconciled')
+
+    def test_dry_run_posts_nothing(self):
+        report = self.reconcile('2024-01-03,100.00,TRX-1,', dry_run=True)
+        self.assertEqual(report['matched'], 1)
+        self.by_reference.refresh_from_db()
+        self.assertEqual(self.by_reference.status, 'pending')
@@ -3,12 +3,42 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
-from django.db.models import Q, Sum
+from django.db.models import Sum, Count
+from django.db import transaction
 from accounts.permissions import IsAdminUser, IsLaureateUser
+from foundation_academy.pagination import KeysetPagination
+from foundation_academy.exports import export_response
 from .models import Payment
-from .serializers import PaymentSerializer, PaymentCreateSerializer
+from .serializers import PaymentSerializer, PaymentCreateSerializer, BulkMarkPaidItemSerializer
 from loans.models import Loan
-from dateutil.relativedelta import relativedelta
+from loans.amortization import term_months
+from .schedule import create_schedules
+from .posting import post_payments
+from .reconciliation import Reconciliation, StatementError
+from administration.portfolio import PortfolioStats
+
+class OverduePagination(KeysetPagination):
+    ordering = ('due_date', 'id')
+    page_size = 50
+
+
+OVERDUE_EXPORT_HEADER = ['Payment ID', 'Loan ID', 'Laureate ID', 'Laureate Name', 'Amount',
+                         'Due Date', 'Days Overdue', 'Status']
+
+
+def overdue_export_rows(queryset, chunk_size=2000):
+    """Yield overdue payments as export rows without holding the result set in memory"""
+    today = timezone.now().date()
+    rows = queryset.values_list(
+        'id', 'loan_id', 'loan__laureate_id', 'loan__laureate__user__first_name',
+        'loan__laureate__user__last_name', 'amount', 'due_date', 'status'
+    )
+    for payment_id, loan_id, laureate_id, first_name, last_name, amount, due_date, payment_status in rows.iterator(chunk_size=chunk_size):
+        yield [
+            payment_id, loan_id, laureate_id, f"{first_name} {last_name}".strip(), amount,
+            due_date.isoformat(), (today - due_date).days, payment_status
+        ]
+
 
 class PaymentViewSet(viewsets.ModelViewSet):
     queryset = Payment.objects.all().select_related('loan__laureate__user')
@@ -35,12 +65,25 @@ class PaymentViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(loan__laureate_id=laureate_id)
         overdue = self.request.query_params.get('overdue', None)
         if overdue == 'true':
-            queryset = queryset.filter(
-                status='pending',
-                due_date__lt=timezone.now().date()
-            )
+            queryset = queryset.overdue()
         return queryset
 
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            payment = serializer.save()
+            payment.loan.refresh_balances()
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            payment = serializer.save()
+            payment.loan.refresh_balances()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            loan = instance.loan
+            instance.delete()
+            loan.refresh_balances()
+
     @action(detail=False, methods=['get'])
     def my_payments(self, request):
         """Laureate sees only their own payment history"""
@@ -86,34 +129,49 @@ class PaymentViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def overdue(self, request):
-        """Admin sees all overdue payments"""
-        from django.utils import timezone
-        
-        # Get ALL overdue payments (both pending past due date AND already marked as overdue)
-        today = timezone.now().date()
-        
-        overdue_payments = Payment.objects.filter(
-            Q(status='pending', due_date__lt=today) |  # Pending past due date
-            Q(status='overdue')                        # Already marked as overdue
-        ).select_related('loan__laureate__user').order_by('due_date')
-        
-        serializer = PaymentSerializer(overdue_payments, many=True)
-        return Response(serializer.data)
+        """
+        Admin sees all overdue payments, keyset-paginated with summary
+        totals (API version 2) or streamed as CSV with ?export=csv
+        """
+        # Marked overdue by sweep_overdue, plus pending payments that fell due since it last ran
+        overdue_payments = Payment.objects.overdue()
+
+        if request.query_params.get('export') == 'csv':
+            return export_response(
+                OVERDUE_EXPORT_HEADER,
+                overdue_export_rows(overdue_payments.order_by('due_date', 'id')),
+                f"overdue_payments_{timezone.now().strftime('%Y%m%d_%H%M%S')}"
+            )
+
+        if request.version == '1':
+            # The full list the bundle in dist/ was built against; version 2 pages it
+            overdue_payments = overdue_payments.select_related('loan__laureate__user').order_by('due_date', 'id')
+            return Response(PaymentSerializer(overdue_payments, many=True).data)
+
+        paginator = OverduePagination()
+        page = paginator.paginate_queryset(
+            overdue_payments.select_related('loan__laureate__user'), request, view=self
+        )
+        serializer = PaymentSerializer(page, many=True)
+        response = paginator.get_paginated_response(serializer.data)
+        if paginator.cursor_query_param not in request.query_params:
+            # Totals for the summary cards, only with the first page
+            response.data['summary'] = overdue_payments.aggregate(
+                count=Count('id'),
+                total_amount=Sum('amount'),
+                laureate_count=Count('loan__laureate', distinct=True)
+            )
+        return response
 
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         """Admin payment statistics"""
-        today = timezone.now().date()
+        portfolio = PortfolioStats()
         stats = {
-            'overdue_payments': Payment.objects.filter(
-                status__in=['pending', 'overdue'],
-                due_date__lt=today
-            ).count(),
-            'pending_payments': Payment.objects.filter(status='pending').count(),
-            'completed_payments': Payment.objects.filter(status='completed').count(),
-            'total_collected': Payment.objects.filter(
-                status='completed'
-            ).aggregate(total=Sum('amount'))['total'] or 0,
+            'overdue_payments': portfolio.overdue_payments(),
+            'pending_payments': portfolio.count('payment', 'pending'),
+            'completed_payments': portfolio.count('payment', 'completed'),
+            'total_collected': portfolio.amount('payment', 'completed'),
         }
         return Response(stats)
 
@@ -121,25 +179,109 @@ class PaymentViewSet(viewsets.ModelViewSet):
     def mark_paid(self, request, pk=None):
         """Mark a payment as completed"""
         payment = self.get_object()
-        payment.status = 'completed'
-        payment.paid_date = timezone.now().date()
-        payment.payment_method = request.data.get('payment_method', '')
-        payment.transaction_id = request.data.get('transaction_id', '')
-        payment.notes = request.data.get('notes', payment.notes)
-        payment.save()
-        loan = payment.loan
-        if loan.remaining_balance <= 0:
-            loan.status = 'completed'
-            loan.save()
+        with transaction.atomic():
+            payment.status = 'completed'
+            payment.paid_date = timezone.now().date()
+            payment.payment_method = request.data.get('payment_method', '')
+            payment.transaction_id = request.data.get('transaction_id', '')
+            payment.notes = request.data.get('notes', payment.notes)
+            payment.save()
+            loan = Loan.objects.select_for_update().get(pk=payment.loan_id)
+            loan.refresh_balances()
+            if loan.remaining_balance <= 0:
+                loan.status = 'completed'
+                loan.save(update_fields=['status', 'updated_at'])
         return Response({"message": "Payment marked as completed"})
 
+    @action(detail=False, methods=['post'])
+    def bulk_mark_paid(self, request):
+        """Mark a batch of payments as completed in one transaction, with per-item results"""
+        items = request.data.get('payments') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"error": "Expected a non-empty list of payments"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = [None] * len(items)
+        valid = {}
+        for index, item in enumerate(items):
+            serializer = BulkMarkPaidItemSerializer(data=item)
+            if not serializer.is_valid():
+                results[index] = {'id': item.get('id') if isinstance(item, dict) else None,
+                                  'success': False, 'errors': serializer.errors}
+            elif serializer.validated_data['id'] in valid:
+                results[index] = {'id': serializer.validated_data['id'], 'success': False,
+                                  'errors': {'id': ["Duplicate payment in batch"]}}
+            else:
+                valid[serializer.validated_data['id']] = (index, serializer.validated_data)
+
+        today = timezone.now().date()
+        with transaction.atomic():
+            payments = Payment.objects.select_for_update().filter(id__in=list(valid)).order_by()
+            payments = {payment.id: payment for payment in payments}
+            to_update = []
+            for payment_id, (index, data) in valid.items():
+                payment = payments.get(payment_id)
+                if payment is None:
+                    results[index] = {'id': payment_id, 'success': False, 'errors': {'id': ["Payment not found"]}}
+                    continue
+                if payment.status == 'completed':
+                    results[index] = {'id': payment_id, 'success': False, 'errors': {'id': ["Payment already completed"]}}
+                    continue
+                payment.status = 'completed'
+                payment.paid_date = data.get('paid_date', today)
+                payment.payment_method = data['payment_method']
+                payment.transaction_id = data['transaction_id']
+                payment.notes = data.get('notes', payment.notes)
+                to_update.append(payment)
+                results[index] = {'id': payment_id, 'success': True}
+            completed_loans = post_payments(to_update)
+
+        return Response({
+            'paid_count': len(to_update),
+            'error_count': len(items) - len(to_update),
+            'completed_loans': completed_loans,
+            'results': results,
+        })
+
+    @action(detail=False, methods=['post'])
+    def reconcile(self, request):
+        """Match a bank statement CSV against unpaid payments and post the matches"""
+        statement = request.FILES.get('statement')
+        if statement is None:
+            return Response(
+                {"error": "Upload the bank statement CSV as 'statement'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            window_days = int(request.data.get('window_days', 10))
+        except (TypeError, ValueError):
+            return Response(
+                {"error": "window_days must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+
+        reconciliation = Reconciliation(window_days=max(window_days, 0), dry_run=dry_run)
+        try:
+            report = reconciliation.run(statement.file)
+        except StatementError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        # Stopped part-way: the lines before the failing batch are posted and reported
+        if 'error' in report:
+            return Response(report, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response(report)
+
     @action(detail=True, methods=['post'])
     def mark_missed(self, request, pk=None):
         """Mark a payment as missed"""
         payment = self.get_object()
-        payment.status = 'missed'
-        payment.notes = request.data.get('notes', payment.notes)
-        payment.save()
+        with transaction.atomic():
+            payment.status = 'missed'
+            payment.notes = request.data.get('notes', payment.notes)
+            payment.save()
+            payment.loan.refresh_balances()
         return Response({"message": "Payment marked as missed"})
 
     @action(detail=False, methods=['post'])
@@ -153,30 +295,12 @@ class PaymentViewSet(viewsets.ModelViewSet):
                     {"error": "Cannot regenerate payment schedule after payments are recorded"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            Payment.objects.filter(loan=loan).delete()
-            principal = float(loan.amount)
-            annual_rate = float(loan.interest_rate) / 100
-            monthly_rate = annual_rate / 12
-            start_date = loan.start_date
-            end_date = loan.end_date
-            months_diff = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month)
-            if months_diff <= 0:
+            if term_months(loan.start_date, loan.end_date) <= 0:
                 return Response(
                     {"error": "End date must be after start date"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            monthly_payment = float(loan.monthly_payment)
-            current_date = start_date
-            payments_created = 0
-            while current_date <= end_date:
-                Payment.objects.create(
-                    loan=loan,
-                    amount=monthly_payment,
-                    due_date=current_date,
-                    status='pending'
-                )
-                current_date += relativedelta(months=1)
-                payments_created += 1
+            payments_created = len(create_schedules([loan], replace=True))
             return Response({
                 "message": f"Generated {payments_created} payments for loan #{loan.id}"
             })
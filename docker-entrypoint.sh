@@ -0,0 +1,52 @@
+#!/bin/bash
+# Container entrypoint: `web`, `worker`, or (default) `all`.
+#
+# all    - release steps, then Gunicorn and the report worker side by side.
+#          If either process exits, the other is stopped and the container
+#          exits non-zero, so the platform restarts it (railway.toml).
+# web    - release steps and Gunicorn only, for a deployment that runs the
+#          worker as its own service.
+# worker - the report worker only (python manage.py run_report_worker).
+set -euo pipefail
+
+release() {
+    python manage.py migrate --noinput
+    python manage.py createcachetable
+    python manage.py collectstatic --noinput
+}
+
+web() {
+    exec gunicorn foundation_academy.wsgi:application --bind "0.0.0.0:${PORT:-8000}" --workers 3
+}
+
+worker() {
+    exec python manage.py run_report_worker
+}
+
+case "${1:-all}" in
+    web)
+        release
+        web
+        ;;
+    worker)
+        worker
+        ;;
+    all)
+        release
+        web &
+        web_pid=$!
+        worker &
+        worker_pid=$!
+        trap 'kill -TERM "$web_pid" "$worker_pid" 2>/dev/null' TERM INT
+        # Whichever stops first takes the container down with it
+        status=0
+        wait -n "$web_pid" "$worker_pid" || status=$?
+        kill -TERM "$web_pid" "$worker_pid" 2>/dev/null || true
+        wait || true
+        exit $(( status == 0 ? 1 : status ))
+        ;;
+    *)
+        echo "usage: $0 [all|web|worker]" >&2
+        exit 2
+        ;;
+esac